@@ -142,43 +142,30 @@ class RectWall():
         # Step through each node in the model
         for node in self.fem.Nodes:
 
-            # Plate elements don't have the following degrees of freedom, so they'll need to be supported
-            node.RZ = 0.0
-            node.SupportRZ = True
-
             # Determine if the node falls on any of the boundaries
             # Left edge
             if np.isclose(node.X, 0.0):
-                if self.left_support == "Fixed":
-                    node.DX, node.DY, node.DZ, node.RX, node.RY = 0.0, 0.0, 0.0, 0.0, 0.0
-                    node.SupportDX, node.SupportDY, node.SupportDZ, node.SupportRX, node.SupportRY = True, True, True, True, True
-                elif self.left_support == "Pinned":
-                    node.DX, node.DY, node.DZ = 0.0, 0.0, 0.0
-                    node.SupportDX, node.SupportDY, node.SupportDZ = True, True, True
+                support = self.left_support
             # Right edge
             elif np.isclose(node.X, self.width):
-                if self.right_support == "Fixed":
-                    node.DX, node.DY, node.DZ, node.RX, node.RY = 0.0, 0.0, 0.0, 0.0, 0.0
-                    node.SupportDX, node.SupportDY, node.SupportDZ, node.SupportRX, node.SupportRY = True, True, True, True, True
-                elif self.right_support == "Pinned":
-                    node.DX, node.DY, node.DZ = 0.0, 0.0, 0.0
-                    node.SupportDX, node.SupportDY, node.SupportDZ = True, True, True
+                support = self.right_support
             # Bottom edge
             elif np.isclose(node.Y, 0.0):
-                if self.bot_support == "Fixed":
-                    node.DX, node.DY, node.DZ, node.RX, node.RY = 0.0, 0.0, 0.0, 0.0, 0.0
-                    node.SupportDX, node.SupportDY, node.SupportDZ, node.SupportRX, node.SupportRY = True, True, True, True, True
-                elif self.bot_support == "Pinned":
-                    node.DX, node.DY, node.DZ = 0.0, 0.0, 0.0
-                    node.SupportDX, node.SupportDY, node.SupportDZ = True, True, True
+                support = self.bot_support
             # Top edge
             elif np.isclose(node.Y, self.height):
-                if self.top_support == "Fixed":
-                    node.DX, node.DY, node.DZ, node.RX, node.RY = 0.0, 0.0, 0.0, 0.0, 0.0
-                    node.SupportDX, node.SupportDY, node.SupportDZ, node.SupportRX, node.SupportRY = True, True, True, True, True
-                elif self.top_support == "Pinned":
-                    node.DX, node.DY, node.DZ = 0.0, 0.0, 0.0
-                    node.SupportDX, node.SupportDY, node.SupportDZ = True, True, True
+                support = self.top_support
+            else:
+                support = None
+
+            # Plate elements don't have a rotational degree of freedom about their normal (RZ), so
+            # every node is supported against it
+            if support == "Fixed":
+                self.fem.DefineSupport(node.Name, True, True, True, True, True, True)
+            elif support == "Pinned":
+                self.fem.DefineSupport(node.Name, True, True, True, False, False, True)
+            else:
+                self.fem.DefineSupport(node.Name, False, False, False, False, False, True)
 
     # Analyzes the wall
     def analyze(self):
@@ -219,10 +206,10 @@ class RectWall():
                     area = (j_node.Y - i_node.Y) * (n_node.X - i_node.X)
 
                     # Add the plate's load to each of its four nodes
-                    i_node.NodeLoads.append(('FZ', pressure*area/4))
-                    j_node.NodeLoads.append(('FZ', pressure*area/4))
-                    m_node.NodeLoads.append(('FZ', pressure*area/4))
-                    n_node.NodeLoads.append(('FZ', pressure*area/4))
+                    self.fem.AddNodeLoad(i_node.Name, 'FZ', pressure*area/4)
+                    self.fem.AddNodeLoad(j_node.Name, 'FZ', pressure*area/4)
+                    self.fem.AddNodeLoad(m_node.Name, 'FZ', pressure*area/4)
+                    self.fem.AddNodeLoad(n_node.Name, 'FZ', pressure*area/4)
 
         # Analyze the model
         self.fem.Analyze()
@@ -3,6 +3,9 @@ from PyNite.BeamSegZ import BeamSegZ
 # %%
 class BeamSegY(BeamSegZ):
 
+    # BeamSegY adds no attributes to BeamSegZ
+    __slots__ = ()
+
 #%% 
     # Returns the moment at a location on the segment
     def Moment(self, x):
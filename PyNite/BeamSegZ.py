@@ -58,6 +58,10 @@ class BeamSegZ():
     
     """
 
+    # Every member has 3 sets of segments, so segments are stored without a '__dict__' to keep
+    # large models compact
+    __slots__ = ('x1', 'x2', 'w1', 'w2', 'p1', 'p2', 'V1', 'M1', 'P1', 'T1', 'theta1', 'delta1', 'delta_x1', 'EI', 'EA')
+
 #%%
     def __init__(self):
         """
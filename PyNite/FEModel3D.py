@@ -1,10 +1,19 @@
 # %%
-from numpy import matrix, zeros, delete, insert, matmul, divide, add, subtract, nanmax, seterr, shape
-from numpy.linalg import solve, matrix_rank
-from math import isclose
-from PyNite.Node3D import Node3D
-from PyNite.Member3D import Member3D
+from numpy import matrix, array_equal, zeros, delete, insert, matmul, divide, add, subtract, nanmax, seterr, shape, array, asarray, repeat, tile, finfo, arange, bincount, concatenate, isin, unique, searchsorted, eye, ix_, cross, broadcast_to, isfinite, isnan, nan, empty, where, argsort, inf
+from numpy.linalg import solve, LinAlgError, norm as Norm
+from scipy.sparse import coo_matrix, issparse
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+from scipy.sparse.linalg import eigsh, LinearOperator, ArpackError
+from scipy.linalg import eigh
+from PyNite.Node3D import Node3D, NodeArrays
+from PyNite.Member3D import Member3D, BatchK, BatchKg, BatchGeometry
 from PyNite.Plate3D import Plate3D
+import PyNite.Plate3D
+from PyNite.LoadCombo import LoadCombo
+from PyNite.StaticsCheck import StaticsCheck
+from PyNite.SuperElement3D import SuperElement3D
+from PyNite.Solvers import Factor, SingularMatrixError, MinimumDegree
+from concurrent.futures import ProcessPoolExecutor
 
 # %%
 class FEModel3D():
@@ -18,11 +27,45 @@ class FEModel3D():
         Initializes a new 3D finite element model.
         '''
         
-        self.Nodes = []    # A list of the structure's nodes
-        self.auxNodes = [] # A list of the structure's auxiliary nodes
+        self.__NodeArrays = NodeArrays()    # The coordinates, displacements, supports and reactions of the structure's nodes
+        self.__AuxNodeArrays = NodeArrays() # The coordinates of the structure's auxiliary nodes
+        self.Nodes = self.__NodeArrays.Nodes       # A list of the structure's nodes
+        self.auxNodes = self.__AuxNodeArrays.Nodes # A list of the structure's auxiliary nodes
         self.Members = []  # A list of the structure's members
         self.Plates = []   # A list of the structure's plates
-        self.__D = []      # A list of the structure's nodal displacements
+        self.SuperElements = [] # A list of the structure's superelements
+        self.__NodeNames = {}    # The structure's nodes by name
+        self.__AuxNodeNames = {} # The structure's auxiliary nodes by name
+        self.__MemberNames = {}  # The structure's members by name
+        self.__PlateNames = {}   # The structure's plates by name
+        self.__SENames = {}      # The structure's superelements by name
+        self.LoadCombos = {} # A dictionary of the structure's load combinations
+        self.__D = {}      # A dictionary of the structure's global displacement vectors by load combination
+        self.__Combos = {} # A dictionary of the load combinations used in the last analysis
+        self.ActiveCombo = None # The name of the load combination whose results are stored in the nodes and members
+        self.BoundaryNodes = [] # A list of the names of the boundary nodes if the model has been condensed
+        self.__Condensed = None # The results of condensing the model to its boundary nodes
+        self.__Factored = None  # The factored stiffness matrix from the last analysis, used by 'Reanalyze'
+        self.__LastAnalysis = None # The name and options of the analysis method last run, repeated by 'Reanalyze' when it can't update it
+        self.__ElementKs = {}   # Cached global stiffness matrices of the elements, with the state they were calculated for
+        self.__MemberCache = {} # Stiffness matrices shared by members with the same properties, length, releases and orientation
+        self.__Reactions = None # The stiffness matrix partitions K21 and K22 used to calculate reactions
+        self.__Statics = None   # The nodal loads and reactions for the active load combination, used to check statics
+        self.__Ordered = False  # True if the nodes were last numbered to reduce fill-in (see 'Analyze')
+        self.SolverHistory = None # The iterations, residuals and convergence of each solve by the 'pcg' solver in the last analysis
+
+#%%
+    def __getstate__(self):
+        '''
+        Returns the model's attributes for pickling (e.g. to send the model to another process).
+        The factored stiffness matrix can't be pickled, so it's left out and 'Reanalyze' will
+        analyze the copy from scratch.
+        '''
+
+        state = self.__dict__.copy()
+        state['_FEModel3D__Factored'] = None
+
+        return state
 
 #%%
     def AddNode(self, Name, X, Y, Z):
@@ -44,8 +87,9 @@ class FEModel3D():
         # Create a new node
         newNode = Node3D(Name, X, Y, Z)
         
-        # Add the new node to the list
-        self.Nodes.append(newNode)
+        # Add the new node to the list, moving its data into the model's node arrays
+        self.__Register(self.__NodeNames, newNode, 'node')
+        self.__NodeArrays.Add(newNode)
 
 #%%
     def AddAuxNode(self, Name, X, Y, Z):
@@ -67,8 +111,9 @@ class FEModel3D():
         # Create a new node
         newNode = Node3D(Name, X, Y, Z)
         
-        # Add the new node to the list
-        self.auxNodes.append(newNode)
+        # Add the new node to the list, moving its data into the model's auxiliary node arrays
+        self.__Register(self.__AuxNodeNames, newNode, 'auxiliary node')
+        self.__AuxNodeArrays.Add(newNode)
   
 #%%
     def AddMember(self, Name, iNode, jNode, E, G, Iy, Iz, J, A, auxNode=None):
@@ -103,7 +148,11 @@ class FEModel3D():
         else:
             newMember = Member3D(Name, self.GetNode(iNode), self.GetNode(jNode), E, G, Iy, Iz, J, A, self.GetAuxNode(auxNode))
         
+        # Members with the same stiffness share their stiffness matrices through the model's cache
+        newMember.SharedCache = self.__MemberCache
+
         # Add the new member to the list
+        self.__Register(self.__MemberNames, newMember, 'member')
         self.Members.append(newMember)
 
 #%%
@@ -135,8 +184,232 @@ class FEModel3D():
         newPlate = Plate3D(Name, self.GetNode(iNode), self.GetNode(jNode), self.GetNode(mNode), self.GetNode(nNode), t, E, nu)
         
         # Add the new member to the list
+        self.__Register(self.__PlateNames, newPlate, 'plate')
         self.Plates.append(newPlate)
 
+#%%
+    def AddSuperElement(self, Name, Model, Nodes):
+        '''
+        Adds a superelement to the model. A superelement is a substructure (another `FEModel3D`)
+        that has been condensed to its boundary nodes using `Condense`. The same condensed
+        substructure can be added to the model any number of times.
+
+        The substructure's stiffness and loads are included in the analysis. Its load cases are
+        factored by the model's load combinations like any other loads. Results inside the
+        superelement can be recovered after the analysis using `RecoverSuperElement`.
+        
+        Parameters
+        ----------
+        Name : string
+            A unique user-defined name for the superelement.
+        Model : FEModel3D
+            The condensed substructure. Each copy of the substructure must have the same
+            orientation as the substructure model itself.
+        Nodes : list
+            The names of the nodes the superelement connects to, listed in the same order as the
+            substructure's boundary nodes (`Model.BoundaryNodes`).
+        '''
+
+        # Create a new superelement
+        newSuperElement = SuperElement3D(Name, Model, [self.GetNode(Node) for Node in Nodes])
+
+        # Add the new superelement to the list
+        self.__Register(self.__SENames, newSuperElement, 'superelement')
+        self.SuperElements.append(newSuperElement)
+
+#%%
+    def AddNodes(self, Names, XYZ):
+        '''
+        Adds any number of new nodes to the model at once.
+        
+        Parameters
+        ----------
+        Names : list
+            A unique user-defined name for each node.
+        XYZ : array
+            The (n, 3) global coordinates of the nodes, one row per node.
+        '''
+
+        # Check the coordinates
+        XYZ = asarray(XYZ, dtype=float).reshape(-1, 3)
+        if len(XYZ) != len(Names):
+            raise ValueError('Got ' + str(len(Names)) + ' node names for ' + str(len(XYZ)) + ' sets of coordinates.')
+        if not isfinite(XYZ).all():
+            raise ValueError('Nodal coordinates must be finite numbers.')
+
+        # Create the new nodes as views into new rows of the model's node arrays
+        self.__CheckNames(self.__NodeNames, Names, 'node')
+        newNodes = self.__NodeArrays.New(Names, XYZ)
+        self.__NodeNames.update(zip(Names, newNodes))
+
+#%%
+    def AddMembers(self, Names, iNodes, jNodes, E, G, Iy, Iz, J, A, auxNodes=None, by_index=False):
+        '''
+        Adds any number of new members to the model at once.
+        
+        Parameters
+        ----------
+        Names : list
+            A unique user-defined name for each member.
+        iNodes : array
+            The name of each member's i-node, or its index in the model's list of nodes (`Nodes`)
+            if `by_index` is True.
+        jNodes : array
+            The name or index of each member's j-node.
+        E, G, Iy, Iz, J, A : number or array
+            The member properties (see `AddMember`). Each can be given as a single value shared by
+            every member, or as one value per member.
+        auxNodes : array
+            The name of each member's auxiliary node, or None for members without one. If None,
+            no member has an auxiliary node.
+        by_index : boolean
+            If True, the i-nodes and j-nodes are given by index rather than by name. Defaults to
+            False.
+        '''
+
+        n = len(Names)
+
+        # Look up the nodes and check the properties
+        iNodes = self.__Lookup(self.Nodes, self.__NodeNames, iNodes, n, 'node', by_index)
+        jNodes = self.__Lookup(self.Nodes, self.__NodeNames, jNodes, n, 'node', by_index)
+        if auxNodes is None:
+            auxNodes = [None]*n
+        else:
+            auxNodes = [None if Name is None else self.__Lookup(self.auxNodes, self.__AuxNodeNames, [Name], 1, 'auxiliary node', False)[0] for Name in auxNodes]
+        props = [self.__Values(values, n, name) for values, name in zip([E, G, Iy, Iz, J, A], ['E', 'G', 'Iy', 'Iz', 'J', 'A'])]
+
+        # Create the new members
+        newMembers = [Member3D(*member) for member in zip(Names, iNodes, jNodes, *props, auxNodes)]
+
+        # Members with the same stiffness share their stiffness matrices through the model's cache
+        for member in newMembers:
+            member.SharedCache = self.__MemberCache
+
+        # Add the new members to the list
+        self.__RegisterAll(self.__MemberNames, newMembers, 'member')
+        self.Members.extend(newMembers)
+
+#%%
+    def AddPlates(self, Names, iNodes, jNodes, mNodes, nNodes, t, E, nu, by_index=False):
+        '''
+        Adds any number of new plates to the model at once.
+        
+        Parameters
+        ----------
+        Names : list
+            A unique user-defined name for each plate.
+        iNodes, jNodes, mNodes, nNodes : array
+            The nodes of each plate in counter-clockwise order, given by name, or by index in the
+            model's list of nodes (`Nodes`) if `by_index` is True.
+        t, E, nu : number or array
+            The plate properties (see `AddPlate`). Each can be given as a single value shared by
+            every plate, or as one value per plate.
+        by_index : boolean
+            If True, the nodes are given by index rather than by name. Defaults to False.
+        '''
+
+        n = len(Names)
+
+        # Look up the nodes and check the properties
+        nodes = [self.__Lookup(self.Nodes, self.__NodeNames, Nodes, n, 'node', by_index) for Nodes in [iNodes, jNodes, mNodes, nNodes]]
+        props = [self.__Values(values, n, name) for values, name in zip([t, E, nu], ['t', 'E', 'nu'])]
+
+        # Create the new plates
+        newPlates = [Plate3D(*plate) for plate in zip(Names, *nodes, *props)]
+
+        # Add the new plates to the list
+        self.__RegisterAll(self.__PlateNames, newPlates, 'plate')
+        self.Plates.extend(newPlates)
+
+#%%
+    def __RegisterAll(self, registry, items, kind):
+        '''
+        Adds any number of items to one of the model's registries of names, making sure every name
+        is unique. Nothing is added if any name is already in use.
+
+        Parameters
+        ----------
+        registry : dict
+            The registry the items are being added to.
+        items : list
+            The items being added.
+        kind : string
+            The kind of items being added, used in the error message.
+        '''
+
+        self.__CheckNames(registry, [item.Name for item in items], kind)
+        registry.update((item.Name, item) for item in items)
+
+#%%
+    def __CheckNames(self, registry, Names, kind):
+        '''
+        Raises a NameError if any of a list of new names is repeated, or is already in use.
+        '''
+
+        if len(set(Names)) != len(Names):
+            duplicates = unique(Names, return_counts=True)
+            raise NameError("More than one " + kind + " is named '" + str(duplicates[0][duplicates[1] > 1][0]) + "'. Names must be unique.")
+        for Name in Names:
+            if Name in registry:
+                raise NameError("The model already has a " + kind + " named '" + str(Name) + "'. Names must be unique.")
+
+#%%
+    def __Lookup(self, items, registry, keys, n, kind, by_index):
+        '''
+        Returns a list of items given by name or by index. Names may be integers, so keys are only
+        treated as indices when asked to.
+
+        Parameters
+        ----------
+        items : list
+            The model's list of items, used to look up items by index.
+        registry : dict
+            The model's registry of items by name.
+        keys : array
+            The names or the indices of the items.
+        n : int
+            The number of items expected.
+        kind : string
+            The kind of items being looked up, used in error messages.
+        by_index : boolean
+            If True, the items are given by index. Otherwise they're given by name.
+        '''
+
+        if len(keys) != n:
+            raise ValueError('Expected ' + str(n) + ' ' + kind + 's, but got ' + str(len(keys)) + '.')
+
+        # Items given by index
+        if by_index == True:
+            keys = asarray(keys)
+            if keys.dtype.kind not in 'iu':
+                raise IndexError('The ' + kind + 's must be given by integer index when \'by_index\' is True.')
+            if len(keys) > 0 and (keys.min() < -len(items) or keys.max() >= len(items)):
+                raise IndexError('The model only has ' + str(len(items)) + ' ' + kind + 's.')
+            return [items[i] for i in keys.tolist()]
+
+        # Items given by name. Names are looked up as given, so a name isn't converted to another
+        # type (e.g. a mixed list of integer and string names converted to strings by numpy).
+        keys = keys.tolist() if hasattr(keys, 'tolist') else list(keys)
+        found = [registry.get(key) for key in keys]
+        if None in found:
+            raise NameError("The model has no " + kind + " named '" + str(keys[found.index(None)]) + "'.")
+        return found
+
+#%%
+    def __Values(self, values, n, name):
+        '''
+        Returns a list of 'n' values of a property given either as a single value or as one value
+        per item.
+        '''
+
+        values = asarray(values, dtype=float)
+        if values.ndim > 0 and values.shape != (n,):
+            raise ValueError("Expected " + str(n) + " values of '" + name + "', but got " + str(values.size) + ".")
+        if not isfinite(values).all():
+            raise ValueError("Values of '" + name + "' must be finite numbers.")
+
+        return broadcast_to(values, (n,)).tolist()
+
 #%%
     def RemoveNode(self, Node):
         '''
@@ -151,10 +424,19 @@ class FEModel3D():
         
         # Remove the node. Nodal loads are stored within the node, so they
         # will be deleted automatically when the node is deleted.
-        self.Nodes.remove(self.GetNode(Node))
+        self.__NodeArrays.Remove(self.__NodeNames.pop(Node))
         
         # Find any members attached to the node and remove them
         self.Members = [member for member in self.Members if member.iNode.Name != Node and member.jNode.Name != Node]
+        self.__MemberNames = {member.Name: member for member in self.Members}
+
+        # Discard the cached stiffness matrices of the removed members
+        elements = set(self.Members) | set(self.Plates)
+        self.__ElementKs = {element: cached for element, cached in self.__ElementKs.items() if element in elements}
+
+        # Find any superelements attached to the node and remove them
+        self.SuperElements = [SE for SE in self.SuperElements if Node not in [node.Name for node in SE.Nodes]]
+        self.__SENames = {SE.Name: SE for SE in self.SuperElements}
         
 #%%
     def RemoveMember(self, Member):
@@ -170,7 +452,11 @@ class FEModel3D():
         
         # Remove the member. Member loads are stored within the member, so they
         # will be deleted automatically when the member is deleted.
-        self.Members.remove(self.GetMember(Member))
+        member = self.__MemberNames.pop(Member)
+        self.Members.remove(member)
+
+        # Discard the member's cached stiffness matrix
+        self.__ElementKs.pop(member, None)
         
 #%%
     def DefineSupport(self, Node, SupportDX=False, SupportDY=False, SupportDZ=False, SupportRX=False, SupportRY=False, SupportRZ=False):
@@ -202,40 +488,71 @@ class FEModel3D():
                 
         # Set the node's support conditions
         if SupportDX == True:
-            node.DX = 0.0
+            node.EnforcedDX = 0.0
             node.SupportDX = True
         elif SupportDX != False:
-            node.DX = SupportDX
+            node.EnforcedDX = SupportDX
         
         if SupportDY == True:
-            node.DY = 0.0
+            node.EnforcedDY = 0.0
             node.SupportDY = True
         elif SupportDY != False:
-            node.DY = SupportDY
+            node.EnforcedDY = SupportDY
 
         if SupportDZ == True:
-            node.DZ = 0.0
+            node.EnforcedDZ = 0.0
             node.SupportDZ = True
         elif SupportDZ != False:
-            node.DZ = SupportDZ
+            node.EnforcedDZ = SupportDZ
 
         if SupportRX == True:
-            node.RX = 0.0
+            node.EnforcedRX = 0.0
             node.SupportRX = True
         elif SupportRX != False:
-            node.RX = SupportRX
+            node.EnforcedRX = SupportRX
 
         if SupportRY == True:
-            node.RY = 0.0
+            node.EnforcedRY = 0.0
             node.SupportRY = True
         elif SupportRY != False:
-            node.RY = SupportRY
+            node.EnforcedRY = SupportRY
 
         if SupportRZ == True:
-            node.RZ = 0.0
+            node.EnforcedRZ = 0.0
             node.SupportRZ = True
         elif SupportRZ != False:
-            node.RZ = SupportRZ
+            node.EnforcedRZ = SupportRZ
+
+#%%
+    def DefineSupports(self, Nodes, Supports, by_index=False):
+        '''
+        Defines the support conditions at any number of nodes at once.
+        
+        Parameters
+        ----------
+        Nodes : array
+            The supported nodes, given by name, or by index in the model's list of nodes (`Nodes`)
+            if `by_index` is True.
+        Supports : array
+            An (n, 6) array of booleans, one row per node, indicating which of the node's degrees
+            of freedom (DX, DY, DZ, RX, RY, RZ) are supported. Use `DefineSupport` or
+            `AddNodeDisplacement` for support settlements.
+        by_index : boolean
+            If True, the nodes are given by index rather than by name. Defaults to False.
+        '''
+
+        # Check the support conditions
+        Supports = asarray(Supports)
+        if Supports.dtype != bool:
+            raise ValueError('Supports must be given as an array of booleans. Use \'DefineSupport\' for support settlements.')
+        Supports = Supports.reshape(-1, 6)
+        nodes = self.__Lookup(self.Nodes, self.__NodeNames, Nodes, len(Supports), 'node', by_index)
+        rows = array([node.Row for node in nodes], dtype=int)
+
+        # Set each supported degree of freedom in the model's node arrays
+        store = self.__NodeArrays
+        store.Enforced[rows] = where(Supports, 0.0, store.Enforced[rows])
+        store.Support[rows] |= Supports
 
 #%%            
     def AddNodeDisplacement (self, Node, Direction, Magnitude): 
@@ -255,17 +572,17 @@ class FEModel3D():
         node = self.GetNode(Node)
 
         if Direction == 'DX':
-            node.DX = Magnitude
+            node.EnforcedDX = Magnitude
         if Direction == 'DY':
-            node.DY = Magnitude
+            node.EnforcedDY = Magnitude
         if Direction == 'DZ':
-            node.DZ = Magnitude
+            node.EnforcedDZ = Magnitude
         if Direction == 'RX':
-            node.RX = Magnitude
+            node.EnforcedRX = Magnitude
         if Direction == 'RY':
-            node.RY = Magnitude
+            node.EnforcedRY = Magnitude
         if Direction == 'RZ':
-            node.RZ = Magnitude
+            node.EnforcedRZ = Magnitude
 
 #%%
     def DefineReleases(self, Member, Dxi=False, Dyi=False, Dzi=False, Rxi=False, Ryi=False, Rzi=False, Dxj=False, Dyj=False, Dzj=False, Rxj=False, Ryj=False, Rzj=False):
@@ -308,7 +625,7 @@ class FEModel3D():
         self.GetMember(Member).Releases = [Dxi, Dyi, Dzi, Rxi, Ryi, Rzi, Dxj, Dyj, Dzj, Rxj, Ryj, Rzj]     
             
 #%%
-    def AddNodeLoad(self, Node, Direction, P):
+    def AddNodeLoad(self, Node, Direction, P, case='Case 1'):
         '''
         Adds a nodal load to the model.
         
@@ -320,13 +637,15 @@ class FEModel3D():
             The global direction the load is being applied in. Forces are 'FX', 'FY', and 'FZ'. Moments are 'MX', 'MY', and 'MZ'.
         P : number
             The numeric value (magnitude) of the load.
+        case : string
+            The name of the load case the load belongs to. Defaults to 'Case 1'.
         '''
         
         # Add the node load to the model
-        self.GetNode(Node).NodeLoads.append((Direction, P))
+        self.GetNode(Node).NodeLoads.append((Direction, P, case))
 
 #%%      
-    def AddMemberPtLoad(self, Member, Direction, P, x):
+    def AddMemberPtLoad(self, Member, Direction, P, x, case='Case 1'):
         '''
         Adds a member point load to the model.
         
@@ -344,13 +663,15 @@ class FEModel3D():
             The numeric value (magnitude) of the load.
         x : number
             The load's location along the member's local x-axis.
+        case : string
+            The name of the load case the load belongs to. Defaults to 'Case 1'.
         '''
         
         # Add the point load to the member
-        self.GetMember(Member).PtLoads.append((Direction, P, x))
+        self.GetMember(Member).PtLoads.append((Direction, P, x, case))
 
 #%%
-    def AddMemberDistLoad(self, Member, Direction, w1, w2, x1=None, x2=None):
+    def AddMemberDistLoad(self, Member, Direction, w1, w2, x1=None, x2=None, case='Case 1'):
         '''
         Adds a member distributed load to the model.
         
@@ -372,6 +693,8 @@ class FEModel3D():
         x2 : number
             The load's end location along the member's local x-axis. If this argument
             is not specified, the end of the member will be used.
+        case : string
+            The name of the load case the load belongs to. Defaults to 'Case 1'.
         '''
         
         # Determine if a starting and ending points for the load have been specified.
@@ -387,7 +710,47 @@ class FEModel3D():
             end = x2
 
         # Add the distributed load to the member
-        self.GetMember(Member).DistLoads.append((Direction, w1, w2, start, end))
+        self.GetMember(Member).DistLoads.append((Direction, w1, w2, start, end, case))
+
+#%%
+    def AddLoadCombo(self, Name, factors):
+        '''
+        Adds a load combination to the model.
+
+        Every load combination is solved using a single factorization of the stiffness matrix.
+        If no load combinations are defined, the model is analyzed with every load case applied
+        at a factor of 1.0.
+
+        Parameters
+        ----------
+        Name : string
+            A unique user-defined name for the load combination.
+        factors : dictionary
+            A dictionary of load case names (keys) and the factors applied to them (values).
+            e.g. {'D': 1.2, 'L': 1.6}
+        '''
+
+        # Create the load combination and add it to the dictionary
+        self.LoadCombos[Name] = LoadCombo(Name, factors)
+
+#%%
+    def LoadCases(self):
+        '''
+        Returns a sorted list of the names of all the load cases that have loads applied to the model.
+        '''
+
+        # Collect the load case of every load in the model
+        cases = set()
+        for node in self.Nodes:
+            cases.update(load[2] for load in node.NodeLoads)
+        for member in self.Members:
+            cases.update(load[3] for load in member.PtLoads)
+            cases.update(load[5] for load in member.DistLoads)
+        for SE in self.SuperElements:
+            cases.update(SE.Model.__Condensed['cases'])
+
+        # Return the load cases in alphabetical order
+        return sorted(cases)
 
 #%%
     def ClearLoads(self):
@@ -403,26 +766,41 @@ class FEModel3D():
             member.SegmentsY = []
             member.SegmentsX = []
         
-        # Clear out the nodal loads and the nodal displacements
+        # Clear out the nodal loads and the calculated nodal displacements. Supports and enforced
+        # displacements are stored separately and are left in place.
         for node in self.Nodes:
             node.NodeLoads = []
-            if not isclose(node.DX, 0.0):
-                node.DX = None
-            if not isclose(node.DY, 0.0):
-                node.DY = None
-            if not isclose(node.DZ, 0.0):
-                node.DZ = None
-            if not isclose(node.RX, 0.0):
-                node.RX = None
-            if not isclose(node.RY, 0.0):
-                node.RY = None
-            if not isclose(node.RZ, 0.0):
-                node.RZ = None       
+        self.__NodeArrays.D[:len(self.Nodes)] = nan
+
+        # Clear out the results for each load combination
+        self.__D = {}
+        self.__Combos = {}
+        self.ActiveCombo = None
+
+#%%
+    def __Register(self, registry, item, kind):
+        '''
+        Adds an item to one of the model's registries of names, making sure its name is unique.
+
+        Parameters
+        ----------
+        registry : dict
+            The registry the item is being added to.
+        item : Node3D, Member3D, Plate3D or SuperElement3D
+            The item being added.
+        kind : string
+            The kind of item being added, used in the error message.
+        '''
+
+        if item.Name in registry:
+            raise NameError("The model already has a " + kind + " named '" + str(item.Name) + "'. Names must be unique.")
+
+        registry[item.Name] = item
 
 #%%
     def GetNode(self, Name):
         '''
-        Returns the node with the given name.
+        Returns the node with the given name, or None if there is no such node.
         
         Parameters
         ----------
@@ -430,19 +808,13 @@ class FEModel3D():
             The name of the node to be returned.
         '''
         
-        # Step through each node in the 'Nodes' list
-        for node in self.Nodes:
-            
-            # Check the name of the node
-            if node.Name == Name:
-                
-                # Return the node of interest
-                return node
+        # Look up the node by name
+        return self.__NodeNames.get(Name)
 
-            
+#%%
     def GetAuxNode(self, Name):
         '''
-        Returns the auxiliary node with the given name.
+        Returns the auxiliary node with the given name, or None if there is no such node.
         
         Parameters
         ----------
@@ -450,19 +822,13 @@ class FEModel3D():
             The name of the auxiliary node to be returned.
         '''
         
-        # Step through each node in the 'Nodes' list
-        for node in self.auxNodes:
-            
-            # Check the name of the node
-            if node.Name == Name:
-                
-                # Return the node of interest
-                return node            
+        # Look up the auxiliary node by name
+        return self.__AuxNodeNames.get(Name)
             
 #%%
     def GetMember(self, Name):
         '''
-        Returns the member with the given name.
+        Returns the member with the given name, or None if there is no such member.
         
         Parameters
         ----------
@@ -470,19 +836,13 @@ class FEModel3D():
             The name of the member to be returned.
         '''
         
-        # Step through each member in the 'Members' list
-        for member in self.Members:
-            
-            # Check the name of the member
-            if member.Name == Name:
-                
-                # Return the member of interest
-                return member
+        # Look up the member by name
+        return self.__MemberNames.get(Name)
 
 #%%
     def GetPlate(self, Name):
         '''
-        Returns the plate with the given name.
+        Returns the plate with the given name, or None if there is no such plate.
         
         Parameters
         ----------
@@ -490,29 +850,64 @@ class FEModel3D():
             The name of the plate to be returned.
         '''
         
-        # Step through each plate in the 'Plates' list
-        for plate in self.Plates:
-            
-            # Check the name of the plate
-            if plate.Name == Name:
-                
-                # Return the plate of interest
-                return plate
+        # Look up the plate by name
+        return self.__PlateNames.get(Name)
+
+#%%
+    def GetSuperElement(self, Name):
+        '''
+        Returns the superelement with the given name, or None if there is no such superelement.
+        
+        Parameters
+        ----------
+        Name : string
+            The name of the superelement to be returned.
+        '''
+        
+        # Look up the superelement by name
+        return self.__SENames.get(Name)
 
 #%%
-    def __Renumber(self):
+    def __Renumber(self, reorder=None):
         '''
         Assigns node, plate, and member ID numbers to be used internally by the
         program. Numbers are assigned according to the order nodes, members, and plates
-        were added to the model.
-        
+        were added to the model, unless the nodes are reordered.
+
+        Parameters
+        ----------
+        reorder : {None, 'rcm', 'amd'}
+            The node reordering applied to reduce the bandwidth or fill-in of the global stiffness
+            matrix. See `Analyze`.
         '''
+
+        # The degrees of freedom are about to be renumbered, so a saved factorization no longer
+        # matches them
+        self.__Factored = None
         
         # Number each node in the model
         i = 0
         for node in self.Nodes:
             node.ID = i
             i += 1
+
+        # Keep track of whether the stiffness matrix is ordered to reduce fill-in
+        self.__Ordered = reorder == 'amd'
+
+        # Renumber the nodes if requested. Each node's 6 degrees of freedom stay together, so
+        # the graph of node connectivity is reordered rather than the (6 times larger) graph of
+        # degrees of freedom.
+        if reorder != None:
+
+            print('...Reordering nodes')
+            order = self.__NodeOrder(reorder)
+
+            # 'order[i]' is the original ID of the node that is numbered 'i'
+            for new_ID, old_ID in enumerate(order):
+                self.Nodes[old_ID].ID = new_ID
+
+        # The ID of the node in each row of the model's node arrays
+        self.__NodeIDs = array([node.ID for node in self.Nodes], dtype=int)
         
         # Number each member in the model
         i = 0
@@ -526,267 +921,358 @@ class FEModel3D():
             plate.ID = i
             i += 1
 
+        # Number each superelement in the model
+        i = 0
+        for SE in self.SuperElements:
+            SE.ID = i
+            i += 1
+
+        # Now that the topology has been numbered, build the maps from each element's local
+        # degrees of freedom to the global degrees of freedom. These are reused every time a
+        # global matrix or vector is assembled.
+        self.__MemberDOFs = self.__DOFMap([[member.iNode.ID, member.jNode.ID] for member in self.Members], 2)
+        self.__PlateDOFs = self.__DOFMap([[plate.iNode.ID, plate.jNode.ID, plate.mNode.ID, plate.nNode.ID] for plate in self.Plates], 4)
+        self.__SuperElementDOFs = [self.__DOFMap([node.ID for node in SE.Nodes], len(SE.Nodes)) for SE in self.SuperElements]
+
+#%%
+    def __NodeOrder(self, reorder):
+        '''
+        Returns a new order for the model's nodes, as a list of node ID numbers, that reduces the
+        bandwidth or the fill-in of the global stiffness matrix.
+
+        Parameters
+        ----------
+        reorder : {'rcm', 'amd'}
+            The reordering algorithm:
+                'rcm' = Reverse Cuthill-McKee. Minimizes the bandwidth of the matrix. Best suited
+                        to the 'banded' and 'dense' solvers.
+                'amd' = Minimum degree (see `Solvers.MinimumDegree`). Minimizes the fill-in
+                        created when the matrix is factored. Best suited to the sparse Cholesky
+                        solvers, which factor the matrix in this order.
+        '''
+
+        # Build the graph of node connectivity. Two nodes are connected if they share an element.
+        rows, cols = [], []
+        for member in self.Members:
+            rows += [member.iNode.ID, member.jNode.ID]
+            cols += [member.jNode.ID, member.iNode.ID]
+        for plate in self.Plates:
+            plate_IDs = [plate.iNode.ID, plate.jNode.ID, plate.mNode.ID, plate.nNode.ID]
+            rows += [ID for ID in plate_IDs for other_ID in plate_IDs]
+            cols += [other_ID for ID in plate_IDs for other_ID in plate_IDs]
+        for SE in self.SuperElements:
+            SE_IDs = [node.ID for node in SE.Nodes]
+            rows += [ID for ID in SE_IDs for other_ID in SE_IDs]
+            cols += [other_ID for ID in SE_IDs for other_ID in SE_IDs]
+        
+        num_nodes = len(self.Nodes)
+        graph = coo_matrix(([1.0]*len(rows), (rows, cols)), shape=(num_nodes, num_nodes)).tocsr()
+
+        # Reorder the graph
+        if reorder == 'rcm':
+            return reverse_cuthill_mckee(graph, symmetric_mode=True)
+        elif reorder == 'amd':
+            return MinimumDegree(graph)
+        else:
+            raise ValueError("Unknown reordering '" + str(reorder) + "'. Use None, 'rcm' or 'amd'.")
+
+#%%
+    def __DOFMap(self, node_IDs, num_nodes):
+        '''
+        Returns an array of global degree of freedom indices for a group of elements. Row 'e'
+        of the array holds the global index of each local degree of freedom of element 'e'.
+
+        Parameters
+        ----------
+        node_IDs : list
+            A list of the node ID numbers for each element, in the element's node order.
+        num_nodes : number
+            The number of nodes per element (2 for members and 4 for plates).
+        '''
+
+        # Convert the node ID numbers to an (n_elements, num_nodes) array
+        node_IDs = array(node_IDs, dtype=int).reshape(-1, num_nodes)
+
+        # Each node contributes 6 consecutive global degrees of freedom starting at ID*6
+        return (node_IDs[:, :, None]*6 + arange(6)).reshape(-1, num_nodes*6)
+
 #%%
     def __AuxList(self):
         '''
-        Builds a list with known nodal displacements and with the positions in global stiffness matrix of known 
-        and unknown nodal displacements
+        Builds arrays with known nodal displacements and with the positions in global stiffness
+        matrix of known and unknown nodal displacements
 
         Returns
         -------
-        D1_indices : number
-            A list of the global matrix indices for the unknown nodal displacements
-        D2_indices : number
-            A list of the global matrix indices for the known nodal displacements
-        D2 : number
-            A list of the known nodal displacements
+        D1_indices : array
+            An array of the global matrix indices for the unknown nodal displacements
+        D2_indices : array
+            An array of the global matrix indices for the known nodal displacements
+        D2 : array
+            An array of the known nodal displacements
         '''
 
-        D1_indices = [] # A list of the indices for the unknown nodal displacements
-        D2_indices = [] # A list of the indices for the known nodal displacements
-        D2 = []         # A list of the values of the known nodal displacements (D != None)
+        # Create the auxiliary table. The enforced displacements are put in the order the nodes
+        # were numbered so the partitioned matrices keep any bandwidth reducing order the nodes
+        # were given. Row 'i' holds the 6 degrees of freedom of the node with ID 'i'.
+        enforced = empty((len(self.Nodes), 6))
+        enforced[self.__NodeIDs] = self.__NodeArrays.Enforced[:len(self.Nodes)]
 
-        # Create the auxiliary table
-        for node in self.Nodes:
-            
-            # Known displacement
-            if node.DX != None:
-                D2_indices.append((node.ID*6) + 0)
-                D2.append(node.DX)
-            # Unknown displacement
-            else:
-                D1_indices.append((node.ID*6) + 0)
+        # A displacement is known (supported or enforced) if its value is not NaN
+        known = ~isnan(enforced)
 
-            # Known displacement
-            if node.DY != None:
-                D2_indices.append((node.ID*6) + 1)
-                D2.append(node.DY)
-            # Unknown displacement
-            else:
-                D1_indices.append((node.ID*6) + 1)
+        # Each node has 6 consecutive global degrees of freedom starting at ID*6
+        DOFs = arange(len(self.Nodes)*6).reshape(-1, 6)
 
-            # Known displacement
-            if node.DZ != None:
-                D2_indices.append((node.ID*6) + 2)
-                D2.append(node.DZ)
-            # Unknown displacement
-            else:
-                D1_indices.append((node.ID*6) + 2)
+        D1_indices = DOFs[~known]                 # The indices for the unknown nodal displacements
+        D2_indices = DOFs[known]                  # The indices for the known nodal displacements
+        D2 = enforced[known]                      # The values of the known nodal displacements
 
-            # Known displacement
-            if node.RX != None:
-                D2_indices.append((node.ID*6) + 3)
-                D2.append(node.RX)
-            # Unknown displacement
-            else:
-                D1_indices.append((node.ID*6) + 3)
+        # Return the indices and the known displacements
+        return D1_indices, D2_indices, D2
 
-            # Known displacement
-            if node.RY != None:
-                D2_indices.append((node.ID*6) + 4)
-                D2.append(node.RY)
-            # Unknown displacement
-            else:
-                D1_indices.append((node.ID*6) + 4)
+#%%
+    def __Assemble(self, element_groups, sparse=False):
+        '''
+        Assembles a global matrix from stacks of element matrices in a single scatter-add.
+        Terms landing on the same global row and column are summed together.
+
+        Parameters
+        ----------
+        element_groups : list
+            A list of (DOF_map, element_matrices) pairs, one for each type of element. 'DOF_map'
+            is an (n_elements, n) array of global degree of freedom indices for each element, and
+            'element_matrices' is the matching (n_elements, n, n) array of element global matrices.
+        sparse : boolean
+            If True a `scipy.sparse` CSR matrix is returned. Otherwise a dense array is returned.
+        '''
+
+        # Get the size of the global matrix
+        size = len(self.Nodes)*6
+
+        # Term (a, b) of element 'e' belongs at row DOF_map[e, a] and column DOF_map[e, b]
+        rows = concatenate([repeat(DOF_map, DOF_map.shape[1], axis=1).ravel() for DOF_map, element_matrices in element_groups])
+        cols = concatenate([tile(DOF_map, (1, DOF_map.shape[1])).ravel() for DOF_map, element_matrices in element_groups])
+        data = concatenate([asarray(element_matrices).ravel() for DOF_map, element_matrices in element_groups])
+
+        if sparse == True:
+            # Build a coordinate (COO) format sparse matrix. Duplicate entries are summed when
+            # the matrix is converted to CSR format.
+            return coo_matrix((data, (rows, cols)), shape=(size, size)).tocsr()
+        else:
+            # Sum the terms into a dense matrix using their flattened global positions
+            return bincount(rows*size + cols, weights=data, minlength=size*size).reshape(size, size)
+
+#%%
+    def __AssemblePartitioned(self, element_groups, D1_indices, D2_indices, sparse=False):
+        '''
+        Assembles the partitions [m11] and [m12] of a global matrix directly from stacks of element
+        matrices, without forming the unpartitioned matrix. See `__Assemble` and `__Partition`.
+        '''
 
-            # Known displacement
-            if node.RZ != None:
-                D2_indices.append((node.ID*6) + 5)
-                D2.append(node.RZ)
-            # Unknown displacement
+        # Get the size of each partition
+        size = len(self.Nodes)*6
+        n1, n2 = len(D1_indices), len(D2_indices)
+
+        # Find the position of each global degree of freedom in its partition
+        position = zeros(size, dtype=int)
+        position[D1_indices] = arange(n1)
+        position[D2_indices] = arange(n2)
+        unknown = zeros(size, dtype=bool)
+        unknown[D1_indices] = True
+
+        # Term (a, b) of element 'e' belongs at row DOF_map[e, a] and column DOF_map[e, b]
+        rows = concatenate([repeat(DOF_map, DOF_map.shape[1], axis=1).ravel() for DOF_map, element_matrices in element_groups])
+        cols = concatenate([tile(DOF_map, (1, DOF_map.shape[1])).ravel() for DOF_map, element_matrices in element_groups])
+        data = concatenate([asarray(element_matrices).ravel() for DOF_map, element_matrices in element_groups])
+
+        partitions = []
+        for in_11, shape in [(unknown[rows] & unknown[cols], (n1, n1)), (unknown[rows] & ~unknown[cols], (n1, n2))]:
+            r, c, d = position[rows[in_11]], position[cols[in_11]], data[in_11]
+            if sparse == True:
+                partitions.append(coo_matrix((d, (r, c)), shape=shape).tocsr())
             else:
-                D1_indices.append((node.ID*6) + 5)
+                partitions.append(bincount(r*shape[1] + c, weights=d, minlength=shape[0]*shape[1]).reshape(shape))
+
+        return partitions
 
-        # Return the indices and the known displacements
-        return D1_indices, D2_indices, D2
-            
 #%%    
-    def K(self):
+    def K(self, sparse=False):
         '''
         Assembles and returns the global stiffness matrix.
+
+        Parameters
+        ----------
+        sparse : boolean
+            If True the matrix is assembled as a `scipy.sparse` CSR matrix. Memory used by a
+            sparse matrix grows with the number of elements rather than the square of the
+            number of degrees of freedom. Defaults to False (dense array).
         '''
         
-        # Initialize a zero matrix to hold all the stiffness terms
-        K = zeros((len(self.Nodes)*6, len(self.Nodes)*6))
-        
-        # Add stiffness terms for each member in the model
+        # Stack the global stiffness matrices of the members and plates into
+        # (n_members, 12, 12) and (n_plates, 24, 24) arrays. Only the elements that have changed
+        # since the last time the matrix was assembled are recalculated.
         print('...Adding member stiffness terms to global stiffness matrix')
-        for member in self.Members:
-            
-            # Get the member's global stiffness matrix
-            # Storing it as a local variable eliminates the need to rebuild it every time a term is needed
-            member_K = member.K()
-
-            # Step through each term in the member's stiffness matrix
-            # 'a' & 'b' below are row/column indices in the member's stiffness matrix
-            # 'm' & 'n' are corresponding row/column indices in the global stiffness matrix
-            for a in range(12):
-                
-                # Determine if index 'a' is related to the i-node or j-node
-                if a < 6:
-                    # Find the corresponding index 'm' in the global stiffness matrix
-                    m = member.iNode.ID*6 + a
-                else:
-                    # Find the corresponding index 'm' in the global stiffness matrix
-                    m = member.jNode.ID*6 + (a-6)
-                    
-                for b in range(12):
-                    
-                    # Determine if index 'b' is related to the i-node or j-node
-                    if b < 6:
-                        # Find the corresponding index 'n' in the global stiffness matrix
-                        n = member.iNode.ID*6 + b
-                    else:
-                        # Find the corresponding index 'n' in the global stiffness matrix
-                        n = member.jNode.ID*6 + (b-6)
-                    
-                    # Now that 'm' and 'n' are known, place the term in the global stiffness matrix
-                    K.itemset((m, n), K.item((m, n)) + member_K.item((a, b)))
-        
-        # Add stiffness terms for each plate in the model
+
+        # Keep the shared member cache from growing without limit as members are edited
+        if len(self.__MemberCache) > 4*len(self.Members):
+            self.__MemberCache.clear()
+
+        member_Ks = self.__CachedKs(self.Members, ['iNode', 'jNode', 'auxNode'], 12, BatchK)
+
+        # Keep the member stiffness matrices used in this assembly. 'Reanalyze' compares them to
+        # the members' current stiffness matrices to find the changes in stiffness.
+        self.__MemberKs = member_Ks
+
         print('...Adding plate stiffness terms to global stiffness matrix')
-        for plate in self.Plates:
-            
-            # Get the plate's global stiffness matrix
-            # Storing it as a local variable eliminates the need to rebuild it every time a term is needed
-            plate_K = plate.K()
-
-            # Step through each term in the plate's stiffness matrix
-            # 'a' & 'b' below are row/column indices in the plate's stiffness matrix
-            # 'm' & 'n' are corresponding row/column indices in the global stiffness matrix
-            for a in range(24):
-
-                # Determine which node the index 'a' is related to
-                if a < 6:
-                    # Find the corresponding index 'm' in the global stiffness matrix
-                    m = plate.iNode.ID*6 + a
-                elif a < 12:
-                    # Find the corresponding index 'm' in the global stiffness matrix
-                    m = plate.jNode.ID*6 + (a-6)
-                elif a < 18:
-                    # Find the corresponding index 'm' in the global stiffness matrix
-                    m = plate.mNode.ID*6 + (a-12)
-                else:
-                    # Find the corresponding index 'm' in the global stiffness matrix
-                    m = plate.nNode.ID*6 + (a-18)
-
-                for b in range(24):
-
-                    # Determine which node the index 'b' is related to
-                    if b < 6:
-                        # Find the corresponding index 'n' in the global stiffness matrix
-                        n = plate.iNode.ID*6 + b
-                    elif b < 12:
-                        # Find the corresponding index 'n' in the global stiffness matrix
-                        n = plate.jNode.ID*6 + (b-6)
-                    elif b < 18:
-                        # Find the corresponding index 'n' in the global stiffness matrix
-                        n = plate.mNode.ID*6 + (b-12)
-                    else:
-                        # Find the corresponding index 'n' in the global stiffness matrix
-                        n = plate.nNode.ID*6 + (b-18)
-                    
-                    # Now that 'm' and 'n' are known, place the term in the global stiffness matrix
-                    K.itemset((m, n), K.item((m, n)) + plate_K.item((a, b)))
-
-        # Return the global stiffness matrix
-        return K      
+        plate_Ks = self.__CachedKs(self.Plates, ['iNode', 'jNode', 'mNode', 'nNode'], 24, PyNite.Plate3D.BatchK)
+        element_groups = [(self.__MemberDOFs, member_Ks), (self.__PlateDOFs, plate_Ks)]
+
+        # Each superelement has its own size, so each one is a group of its own
+        if len(self.SuperElements) > 0:
+            print('...Adding superelement stiffness terms to global stiffness matrix')
+            element_groups += [(SE_DOFs, SE.K()[None, :, :]) for SE_DOFs, SE in zip(self.__SuperElementDOFs, self.SuperElements)]
+
+        # Scatter the element stiffness terms into the global stiffness matrix and return it
+        return self.__Assemble(element_groups, sparse)
+
+#%%
+    def __CachedKs(self, elements, node_names, size, batch):
+        '''
+        Returns the global stiffness matrices of the elements stacked into an (n, size, size)
+        array. The matrix of an element is only recalculated if the element or one of its nodes
+        has been edited since the matrix was last calculated. Otherwise the cached matrix is used.
+
+        Parameters
+        ----------
+        elements : list
+            The members or plates.
+        node_names : list
+            The names of the attributes that hold the element's nodes.
+        size : number
+            The size of the element's stiffness matrix.
+        batch : function
+            A function that returns the stacked global stiffness matrices for a list of elements.
+        '''
+
+        Ks = zeros((len(elements), size, size))
+        stale = []
+        for i, element in enumerate(elements):
+
+            # The state of the element is given by the number of times it and its nodes have changed
+            nodes = [getattr(element, name) for name in node_names]
+            state = (element.Version,) + tuple(None if node is None else node.Version for node in nodes)
+
+            # Use the cached stiffness matrix unless the element has changed
+            cached = self.__ElementKs.get(element)
+            if cached is None or cached[0] != state:
+                stale.append((i, state))
+            else:
+                Ks[i] = cached[1]
+
+        # Recalculate the stiffness matrices of the elements that have changed, all at once
+        if len(stale) > 0:
+            new_Ks = batch([elements[i] for i, state in stale]).reshape(-1, size, size)
+            for (i, state), K in zip(stale, new_Ks):
+                self.__ElementKs[elements[i]] = (state, K)
+                Ks[i] = K
+
+        return Ks
 
 #%%    
-    def Kg(self):
+    def Kg(self, sparse=False):
         '''
         Assembles and returns the global geometric stiffness matrix.
 
         The model must have a static solution prior to obtaining the geometric stiffness matrix.
-        Geometric stiffness of plates is not included.
+        Geometric stiffness of plates and superelements is not included.
+
+        Parameters
+        ----------
+        sparse : boolean
+            If True the matrix is assembled as a `scipy.sparse` CSR matrix. Defaults to False
+            (dense array).
         '''
         
-        # Initialize a zero matrix to hold all the stiffness terms
-        Kg = zeros((len(self.Nodes) * 6, len(self.Nodes) * 6))
-        
         # Add stiffness terms for each member in the model
         print('...Adding member geometric stiffness terms to global geometric stiffness matrix')
-        for member in self.Members:
-            
-            # Calculate the axial force in the member
-            E = member.E
-            A = member.A
-            L = member.L()
-            d = member.d()
-            P = E*A/L*(d[6, 0] - d[0, 0])
-
-            # Get the member's global stiffness matrix
-            # Storing it as a local variable eliminates the need to rebuild it every time a term is needed
-            member_Kg = member.Kg(P)
-
-            # Step through each term in the member's stiffness matrix
-            # 'a' & 'b' below are row/column indices in the member's stiffness matrix
-            # 'm' & 'n' are corresponding row/column indices in the global stiffness matrix
-            for a in range(12):
-                
-                # Determine if index 'a' is related to the i-node or j-node
-                if a < 6:
-                    # Find the corresponding index 'm' in the global stiffness matrix
-                    m = member.iNode.ID*6 + a
-                else:
-                    # Find the corresponding index 'm' in the global stiffness matrix
-                    m = member.jNode.ID*6 + (a-6)
-                    
-                for b in range(12):
-                    
-                    # Determine if index 'b' is related to the i-node or j-node
-                    if b < 6:
-                        # Find the corresponding index 'n' in the global stiffness matrix
-                        n = member.iNode.ID*6 + b
-                    else:
-                        # Find the corresponding index 'n' in the global stiffness matrix
-                        n = member.jNode.ID*6 + (b-6)
-                    
-                    # Now that 'm' and 'n' are known, place the term in the global stiffness matrix
-                    Kg.itemset((m, n), Kg.item((m, n)) + member_Kg.item((a, b)))
-
-        # Return the global geometric stiffness matrix
-        return Kg
+
+        # Gather the nodal displacements into a global displacement vector
+        D = empty((len(self.Nodes), 6))
+        D[self.__NodeIDs] = self.__NodeArrays.D[:len(self.Nodes)]
+
+        # Calculate the axial force in each member, and get the members' global geometric
+        # stiffness matrices, all at once
+        geometry = BatchGeometry(self.Members)
+        member_Kgs = BatchKg(self.Members, self.__AxialForces(D.reshape(-1, 1), geometry), geometry)
+
+        # Scatter the member geometric stiffness terms into the global geometric stiffness matrix
+        return self.__Assemble([(self.__MemberDOFs, member_Kgs)], sparse)
+
+#%%
+    def __AxialForces(self, D, geometry):
+        '''
+        Returns the axial force in each member for a global displacement vector, calculated for
+        all the members at once. Only the change in length of each member is needed, so the
+        displacements along each member's local x-axis are calculated without forming the full
+        local displacement vectors.
+
+        Parameters
+        ----------
+        D : array
+            The global displacement vector.
+        geometry : tuple
+            The lengths and direction cosines of the members, as returned by `BatchGeometry`.
+        '''
+
+        L, dirCos = geometry
+
+        # Get the global translations at each end of each member
+        Dm = asarray(D).ravel()[self.__MemberDOFs]
+
+        # Project the relative translation of the ends onto each member's local x-axis
+        elongation = ((Dm[:, 6:9] - Dm[:, 0:3])*dirCos[:, 0, :]).sum(axis=1)
+
+        E = array([member.E for member in self.Members], dtype=float)
+        A = array([member.A for member in self.Members], dtype=float)
+
+        return E*A/L*elongation
      
 #%%    
-    def FER(self):
+    def FER(self, combo=None):
         '''
         Assembles and returns the global fixed end reaction vector.
+
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination used to factor the member loads. If None, every load is used
+            unfactored.
         '''
         
-        # Initialize a zero vector to hold all the terms
-        FER = zeros((len(self.Nodes) * 6, 1))
-        
-        # Add terms for each member in the model
-        for member in self.Members:
-            
-            # Get the member's global fixed end reaction vector
-            # Storing it as a local variable eliminates the need to rebuild it every time a term is needed
-            member_FER = member.FER()
-
-            # Step through each term in the member's fixed end reaction vector
-            # 'a' below is the row index in the member's fixed end reaction vector
-            # 'm' below is the corresponding row index in the global fixed end reaction vector
-            for a in range(12):
-                
-                # Determine if index 'a' is related to the i-node or j-node
-                if a < 6:
-                    # Find the corresponding index 'm' in the global fixed end reaction vector
-                    m = member.iNode.ID * 6 + a
-                else:
-                    # Find the corresponding index 'm' in the global fixed end reaction vector
-                    m = member.jNode.ID * 6 + (a - 6)
-                
-                # Now that 'm' is known, place the term in the global fixed end reaction vector
-                FER.itemset((m, 0), FER[m, 0] + member_FER[a, 0])
-        
+        # Stack the global fixed end reaction vectors of the members into an (n_members, 12) array
+        member_FERs = array([member.FER(combo) for member in self.Members]).reshape(-1, 12)
+
+        # Sum each term into the global fixed end reaction vector in a single pass
+        FER = bincount(self.__MemberDOFs.ravel(), weights=member_FERs.ravel(), minlength=len(self.Nodes)*6)
+
+        # Add the fixed end reactions of the superelements
+        for SE_DOFs, SE in zip(self.__SuperElementDOFs, self.SuperElements):
+            add.at(FER, SE_DOFs.ravel(), SE.FER(combo).ravel())
+
         # Return the global fixed end reaction vector
-        return FER
+        return FER.reshape(-1, 1)
     
 #%%
-    def P(self):
+    def P(self, combo=None):
         '''
         Assembles and returns the global nodal force vector.
+
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination used to factor the nodal loads. If None, every load is used
+            unfactored.
         '''
             
         # Initialize a zero vector to hold all the terms
@@ -800,31 +1286,47 @@ class FEModel3D():
             
             # Add the node's loads to the global nodal load vector
             for load in node.NodeLoads:
+
+                # Get the load factor for the load's load case
+                if combo is None:
+                    factor = 1
+                else:
+                    factor = combo.Factor(load[2])
                 
                 if load[0] == 'FX':
-                    P.itemset((ID*6 + 0, 0), P[ID*6 + 0, 0] + load[1])
+                    P.itemset((ID*6 + 0, 0), P[ID*6 + 0, 0] + factor*load[1])
                 elif load[0] == 'FY':
-                    P.itemset((ID*6 + 1, 0), P[ID*6 + 1, 0] + load[1])
+                    P.itemset((ID*6 + 1, 0), P[ID*6 + 1, 0] + factor*load[1])
                 elif load[0] == 'FZ':
-                    P.itemset((ID*6 + 2, 0), P[ID*6 + 2, 0] + load[1])
+                    P.itemset((ID*6 + 2, 0), P[ID*6 + 2, 0] + factor*load[1])
                 elif load[0] == 'MX':
-                    P.itemset((ID*6 + 3, 0), P[ID*6 + 3, 0] + load[1])
+                    P.itemset((ID*6 + 3, 0), P[ID*6 + 3, 0] + factor*load[1])
                 elif load[0] == 'MY':
-                    P.itemset((ID*6 + 4, 0), P[ID*6 + 4, 0] + load[1])
+                    P.itemset((ID*6 + 4, 0), P[ID*6 + 4, 0] + factor*load[1])
                 elif load[0] == 'MZ':
-                    P.itemset((ID*6 + 5, 0), P[ID*6 + 5, 0] + load[1])
+                    P.itemset((ID*6 + 5, 0), P[ID*6 + 5, 0] + factor*load[1])
         
         # Return the global nodal force vector
         return P
 
 #%%
-    def D(self):
+    def D(self, combo_name=None):
         '''
         Returns the global displacement vector for the model.
+
+        Parameters
+        ----------
+        combo_name : string
+            The name of the load combination to get the displacements for. If None, the
+            displacements for the active load combination are returned.
         '''
         
+        # Default to the active load combination
+        if combo_name == None:
+            combo_name = self.ActiveCombo
+
         # Return the global displacement vector
-        return self.__D
+        return self.__D[combo_name]
 
 #%%
     def __Partition(self, unp_matrix, D1_indices, D2_indices):
@@ -848,126 +1350,728 @@ class FEModel3D():
             m22 = unp_matrix[D2_indices, :][:, D2_indices]
             return m11, m12, m21, m22
 
+#%%
+    def __Factor(self, K11, D1_indices, solver, solver_options=None):
+        '''
+        Factors the partitioned stiffness matrix 'K11' and returns a function that solves for the
+        unknown displacements. If a zero or negative pivot is found during the factorization the
+        structure is unstable. In that case a message identifying the offending node and degree
+        of freedom is printed and None is returned.
+
+        Parameters
+        ----------
+        K11 : array or scipy.sparse matrix
+            The stiffness matrix for the unknown displacements.
+        D1_indices : array
+            The global indices of the unknown displacements.
+        solver : string
+            The linear solver to use. See `Solvers.Factor`.
+        solver_options : dictionary
+            Additional options for the 'pcg' solver. See `Solvers.PCG`.
+        '''
+
+        # Get the options for the solver
+        options = {} if solver_options == None else dict(solver_options)
+
+        # The block-Jacobi preconditioner groups the degrees of freedom of each node together
+        if solver == 'pcg':
+            options.setdefault('blocks', D1_indices//6)
+
+        try:
+            K11_solve = Factor(K11, solver, ordered=self.__Ordered, **options)
+        except SingularMatrixError as error:
+            self.__Unstable(error, D1_indices)
+            return None
+
+        # Keep the iteration counts and residuals of the iterative solver where they can be
+        # checked after the analysis. The lists grow as load vectors are solved.
+        if solver == 'pcg':
+            self.SolverHistory = {'iterations': K11_solve.iterations, 'residuals': K11_solve.residuals,
+                                  'converged': K11_solve.converged}
+        else:
+            self.SolverHistory = None
+
+        return K11_solve
+
+#%%
+    def __Solve(self, K11_solve, b, D1_indices):
+        '''
+        Solves for the unknown displacements using a factored stiffness matrix. Returns None if the
+        structure is found to be unstable. Iterative solvers only detect instability while solving.
+
+        Parameters
+        ----------
+        K11_solve : function
+            The function returned by `__Factor`.
+        b : array
+            The partitioned load vector(s).
+        D1_indices : array
+            The global indices of the unknown displacements.
+        '''
+
+        try:
+            return K11_solve(b)
+        except SingularMatrixError as error:
+            self.__Unstable(error, D1_indices)
+            return None
+
+#%%
+    def __Unstable(self, error, D1_indices):
+        '''
+        Prints a message explaining why the structure is unstable.
+
+        Parameters
+        ----------
+        error : SingularMatrixError
+            The error raised by the solver.
+        D1_indices : array
+            The global indices of the unknown displacements.
+        '''
+
+        # Build an error message
+        message = 'The stiffness matrix is singular, which implies rigid body motion. The structure is unstable.'
+
+        # Identify the node and degree of freedom where the instability was detected
+        if error.index is not None:
+            DOF = int(D1_indices[error.index])
+            node = [node for node in self.Nodes if node.ID == DOF//6][0]
+            message += ' Node ' + str(node.Name) + ' ' + ['DX', 'DY', 'DZ', 'RX', 'RY', 'RZ'][DOF % 6] + ' is unrestrained.'
+
+        # Print the error message
+        print(message + ' Aborting analysis.')
+
+#%%
+    def __LoadCombos(self):
+        '''
+        Returns a list of the load combinations to be analyzed. If no load combinations have been
+        defined, a single load combination named 'Combo 1' with every load case at a factor of 1.0
+        is returned.
+        '''
+
+        if len(self.LoadCombos) > 0:
+            return list(self.LoadCombos.values())
+        else:
+            return [LoadCombo('Combo 1', {case: 1.0 for case in self.LoadCases()})]
+
+#%%
+    def __FormD(self, D1, D2, D1_indices, D2_indices):
+        '''
+        Forms the global displacement vector, D, from the unknown displacements D1 and the known
+        displacements D2.
+        '''
+
+        # Form the global displacement vector, D, from D1 and D2
+        D = zeros((len(self.Nodes)*6, 1))
+        D[D1_indices, :] = D1
+        D[D2_indices, :] = D2
+
+        # Return the global displacement vector
+        return D
+
+#%%
+    def __StoreD(self, D):
+        '''
+        Stores the displacements in a global displacement vector into each node.
+        '''
+
+        # Reshape the global displacement vector to one row of 6 displacements per node, and store
+        # them in the model's node arrays in row order
+        self.__NodeArrays.D[:len(self.Nodes)] = asarray(D).reshape(-1, 6)[self.__NodeIDs]
+
 #%%  
-    def Analyze(self, check_statics=True):
+    def Analyze(self, check_statics=True, sparse=False, solver='auto', reorder=None, solver_options=None):
         '''
         Analyzes the model.
+
+        Every load combination is solved using a single factorization of the stiffness matrix.
+        Each load case is solved as one column of a multi-column load vector, and the results for
+        each load combination are formed by superposition of the load case results. Enforced
+        displacements (support settlements) are applied unfactored in every load combination.
+
+        When the analysis is complete the results for the first load combination are stored in
+        the nodes and members. Use `ActivateCombo` to switch to another load combination.
+
+        Parameters
+        ----------
+        check_statics : boolean
+            If True, the sums of the applied loads and the reactions are printed to the console.
+        sparse : boolean
+            If True, the global stiffness matrix is assembled and solved in `scipy.sparse`
+            format. This is recommended for large models. Defaults to False.
+        solver : {'auto', 'dense', 'sparse', 'cholesky', 'banded', 'pcg'}
+            The linear solver used to calculate the displacements. See `Solvers.Factor` for a
+            description of each option. Defaults to 'auto'. The 'pcg' iterative solver is
+            intended for very large plate models that are too big to factor, and should be used
+            with `sparse=True`.
+        reorder : {None, 'rcm', 'amd'}
+            Renumbers the nodes internally to reduce the cost of factoring the stiffness matrix.
+            Results are still reported by node name. Defaults to None (nodes are numbered in the
+            order they were added to the model).
+                'rcm' = Reverse Cuthill-McKee ordering. Minimizes the bandwidth of the stiffness
+                        matrix. Recommended for the 'banded' solver.
+                'amd' = Minimum degree ordering. Minimizes fill-in during sparse factorization.
+                        The sparse Cholesky solvers ('auto' and 'cholesky') use this ordering
+                        instead of reordering the (6 times larger) stiffness matrix themselves.
+        solver_options : dictionary
+            Options for the 'pcg' solver: 'preconditioner' ('jacobi', 'block-jacobi', 'ic' or
+            None), 'tol' (relative residual), and 'maxiter'. See `Solvers.PCG`. e.g.
+            {'preconditioner': 'block-jacobi', 'tol': 1e-8, 'maxiter': 5000}
+            The number of iterations, the final relative residual and whether it converged are
+            kept for each load vector solved in the model's `SolverHistory` dictionary, under
+            'iterations', 'residuals' and 'converged'. A `Solvers.ConvergenceWarning` is issued
+            for each load vector that doesn't converge.
         '''
         
         print('**Analyzing**')
 
+        # Keep the options so the analysis can be repeated by 'Reanalyze'
+        self.__LastAnalysis = ('Analyze', {'sparse': sparse, 'solver': solver, 'reorder': reorder, 'solver_options': solver_options})
+
         # Assign an ID to all nodes and elements in the model
-        self.__Renumber()
+        self.__Renumber(reorder)
 
         # Get the auxiliary list used to determine how the matrices will be partitioned
         D1_indices, D2_indices, D2 = self.__AuxList()
 
-        # Convert D2 from a list to a matrix
+        # Convert D2 to a column matrix
         D2 = matrix(D2).T
 
-        # Get the partitioned global stiffness matrix K11, K12, K21, K22
-        K11, K12, K21, K22 = self.__Partition(self.K(), D1_indices, D2_indices)
+        # Get the load cases and the load combinations to be solved
+        cases = self.LoadCases()
+        combos = self.__LoadCombos()
 
-        # Get the partitioned global fixed end reaction vector
-        FER1, FER2 = self.__Partition(self.FER(), D1_indices, D2_indices)
+        # Get the partitioned global stiffness matrix K11, K12, K21, K22
+        K11, K12, K21, K22 = self.__Partition(self.K(sparse), D1_indices, D2_indices)
+        self.__Reactions = {'K21': K21, 'K22': K22, 'D1_indices': D1_indices, 'D2_indices': D2_indices}
 
-        # Get the partitioned global nodal force vector       
-        P1, P2 = self.__Partition(self.P(), D1_indices, D2_indices)          
+        # Build the partitioned load vector for each load case (P1 - FER1), with one column per
+        # load case. The last column holds the effect of the enforced displacements (-K12*D2).
+        RHS = concatenate([self.__CaseLoads(cases, D1_indices, D2_indices), -asarray(K12 @ D2)], axis=1)
 
-        # Check for global stability by determining if 'K11' is singular
+        # Check for global stability while factoring 'K11'
         print('...Checking global stability')
         if K11.shape == (0, 0):
-            # All displacements are known, so D1 is an empty vector
-            D1 = []
-        elif matrix_rank(K11) < min(K11.shape):
-            # Return out of the method if 'K' is singular and provide an error message
-            print('The stiffness matrix is singular, which implies rigid body motion. The structure is unstable. Aborting analysis.')
-            return
+            # All displacements are known, so there are no unknown displacements to solve for
+            X = zeros((0, len(cases) + 1))
         else:
-            # Calculate the unknown displacements D1
-            print('...Calculating global displacement vector')
-            D1 = solve(K11, subtract(subtract(P1, FER1), matmul(K12, D2)))
+            # Factor the stiffness matrix. Stability is checked as the matrix is factored.
+            K11_solve = self.__Factor(K11, D1_indices, solver, solver_options)
 
-        # Form the global displacement vector, D, from D1 and D2
-        D = zeros((len(self.Nodes)*6, 1))
+            # Return out of the method if 'K' is singular
+            if K11_solve is None:
+                return
 
-        for node in self.Nodes:
+            # Calculate the unknown displacements for every load case at once, using the same factorization
+            print('...Calculating global displacement vectors')
+            X = self.__Solve(K11_solve, RHS, D1_indices)
 
-            if D2_indices.count(node.ID*6 + 0) == 1:
-                D.itemset((node.ID*6 + 0, 0), D2[D2_indices.index(node.ID*6 + 0), 0])
-            else:
-                D.itemset((node.ID*6 + 0, 0), D1[D1_indices.index(node.ID*6 + 0), 0]) 
+            # Return out of the method if 'K' was found to be singular while solving
+            if X is None:
+                return
 
-            if D2_indices.count(node.ID*6 + 1) == 1:
-                D.itemset((node.ID*6 + 1, 0), D2[D2_indices.index(node.ID*6 + 1), 0])
-            else:
-                D.itemset((node.ID*6 + 1, 0), D1[D1_indices.index(node.ID*6 + 1), 0]) 
+        # Save the factored stiffness matrix so the model can be reanalyzed quickly after changes
+        # to a few members (see 'Reanalyze'), along with the state of the model it was factored for
+        if K11.shape != (0, 0):
+            self.__Factored = {'K11_solve': K11_solve, 'K12': K12, 'K21': K21, 'K22': K22, 'member_Ks': self.__MemberKs,
+                               'D1_indices': D1_indices, 'D2_indices': D2_indices, 'D2': D2,
+                               'state': self.__Snapshot(), 'Z': {}}
 
-            if D2_indices.count(node.ID*6 + 2) == 1:
-                D.itemset((node.ID*6 + 2, 0), D2[D2_indices.index(node.ID*6 + 2), 0])
-            else:
-                D.itemset((node.ID*6 + 2, 0), D1[D1_indices.index(node.ID*6 + 2), 0]) 
+        # Form and save the displacements for each load combination
+        self.__StoreCombos(X, D2, D1_indices, D2_indices, cases, combos)
 
-            if D2_indices.count(node.ID*6 + 3) == 1:
-                D.itemset((node.ID*6 + 3, 0), D2[D2_indices.index(node.ID*6 + 3), 0])
-            else:
-                D.itemset((node.ID*6 + 3, 0), D1[D1_indices.index(node.ID*6 + 3), 0]) 
+        # Check statics if requested
+        if check_statics == True:
+            print(self.CheckStatics())
 
-            if D2_indices.count(node.ID*6 + 4) == 1:
-                D.itemset((node.ID*6 + 4, 0), D2[D2_indices.index(node.ID*6 + 4), 0])
-            else:
-                D.itemset((node.ID*6 + 4, 0), D1[D1_indices.index(node.ID*6 + 4), 0]) 
+#%%
+    def __Snapshot(self):
+        '''
+        Returns the state of the model a factorization of its stiffness matrix is valid for: its
+        nodes, elements and supports, and the version of each of them.
+        '''
 
-            if D2_indices.count(node.ID*6 + 5) == 1:
-                D.itemset((node.ID*6 + 5, 0), D2[D2_indices.index(node.ID*6 + 5), 0])
-            else:
-                D.itemset((node.ID*6 + 5, 0), D1[D1_indices.index(node.ID*6 + 5), 0]) 
+        store = self.__NodeArrays
 
-        # Save the global displacement vector
-        self.__D = D
+        return {'nodes': list(self.Nodes),
+                'node_versions': [node.Version for node in self.Nodes],
+                'members': [(member, member.iNode, member.jNode) for member in self.Members],
+                'member_versions': array([member.Version for member in self.Members], dtype=int),
+                'plates': list(self.Plates),
+                'plate_versions': [plate.Version for plate in self.Plates],
+                'superelements': list(self.SuperElements),
+                'enforced': store.Enforced[:len(self.Nodes)].copy()}
+
+#%%
+    def __ModifiedMembers(self, state):
+        '''
+        Returns the IDs of the members whose properties have changed since the model was in the
+        given state, or None if anything else about the model has changed (nodes, elements,
+        supports or enforced displacements added, removed, moved or modified).
+
+        Parameters
+        ----------
+        state : dictionary
+            The state of the model, from '__Snapshot'.
+        '''
+
+        current = self.__Snapshot()
+
+        # Check that the same nodes, plates and superelements are in the model, unchanged
+        for name in ('nodes', 'node_versions', 'plates', 'plate_versions', 'superelements'):
+            if len(current[name]) != len(state[name]) or any(a is not b and a != b for a, b in zip(current[name], state[name])):
+                return None
+
+        # Check that the same members connect the same nodes
+        if len(current['members']) != len(state['members']):
+            return None
+        for old, new in zip(state['members'], current['members']):
+            if any(a is not b for a, b in zip(old, new)):
+                return None
+
+        # Check that the supports and enforced displacements are unchanged
+        if not array_equal(current['enforced'], state['enforced'], equal_nan=True):
+            return None
+
+        # The members whose versions have changed are the modified members
+        return where(current['member_versions'] != state['member_versions'])[0]
+
+#%%
+    def Reanalyze(self, members=None, max_rank=60, check_statics=True):
+        '''
+        Reanalyzes the model after the properties (E, G, Iy, Iz, J, A) of a few members have
+        changed, without factoring the stiffness matrix again.
+
+        The changes in stiffness are applied to the factored stiffness matrix from the last call
+        to `Analyze` as a low rank update, using the Sherman-Morrison-Woodbury formula:
+
+            (K11 + E*C*E')⁻¹ = K11⁻¹ - K11⁻¹*E*(I + C*E'*K11⁻¹*E)⁻¹*C*E'*K11⁻¹
+
+        where 'C' holds the changes in stiffness at the 'r' unknown degrees of freedom of the
+        modified members and 'E' selects those degrees of freedom. The rank 'r' of the update
+        grows with the number of modified members, and so does the cost of the update. Once it
+        exceeds `max_rank` the model is analyzed again from scratch using `Analyze`.
+
+        The modified members are found by comparing the version of each member with its version
+        when the stiffness matrix was factored, so members modified before earlier calls to
+        `Reanalyze` remain part of the update until the model is analyzed from scratch again.
+        Only changes to member properties can be applied this way. If nodes, elements, supports
+        or enforced displacements have been added, removed, moved or modified since then, the
+        model is analyzed from scratch using `Analyze`. Results of a P-Delta analysis can't be
+        updated, so `Analyze_PDelta` is run again if it was the last analysis.
+
+        Parameters
+        ----------
+        members : list
+            The names of the members whose properties have changed since the last analysis.
+            Modified members are found automatically, so this is optional. Any members listed
+            are included in the update whether they have changed or not.
+        max_rank : number
+            The largest number of unknown degrees of freedom affected by the modified members
+            before the stiffness matrix is factored again. Defaults to 60.
+        check_statics : boolean
+            If True, the sums of the applied loads and the reactions are printed to the console.
+        '''
+
+        factored = self.__Factored
+        method, options = self.__LastAnalysis or ('Analyze', {})
+
+        # P-Delta results depend on the loads and can't be updated, so the P-Delta analysis is
+        # run again
+        if method == 'Analyze_PDelta':
+            print('...P-Delta results can\'t be updated by \'Reanalyze\'. Running the P-Delta analysis again.')
+            self.Analyze_PDelta(**options)
+            return
+
+        # Without a previous factorization there's nothing to update, so analyze the model
+        if factored is None:
+            self.Analyze(check_statics, **options)
+            return
+
+        # Find the members modified since the stiffness matrix was factored. If anything else has
+        # changed the factorization can't be updated, so analyze the model.
+        member_IDs = self.__ModifiedMembers(factored['state'])
+        if member_IDs is None:
+            print('...The model has changed in ways other than member properties. Analyzing the model again.')
+            self.Analyze(check_statics, **options)
+            return
+
+        print('**Reanalyzing**')
+
+        # Include any members listed as modified
+        if members is not None:
+            member_IDs = unique(concatenate([member_IDs, [self.GetMember(Name).ID for Name in members]]).astype(int))
+
+        # Get the global degrees of freedom affected by the modified members
+        member_DOFs = self.__MemberDOFs[member_IDs]
+        DOFs = unique(member_DOFs)
+
+        # Find which of those are unknown displacements (f) and which are known (k)
+        D1_indices, D2_indices, D2 = factored['D1_indices'], factored['D2_indices'], factored['D2']
+        f_DOFs = DOFs[isin(DOFs, D1_indices)]
+        k_DOFs = DOFs[isin(DOFs, D2_indices)]
+
+        # Factor the stiffness matrix again if the update has become too large to be worthwhile
+        if len(f_DOFs) > max_rank:
+            print('...Rank of the stiffness update (' + str(len(f_DOFs)) + ') exceeds ' + str(max_rank) + '. Refactoring the stiffness matrix.')
+            self.Analyze(check_statics, **options)
+            return
+
+        # Assemble the change in stiffness of the modified members at the affected degrees of freedom
+        print('...Calculating the change in stiffness')
+        dK = array([self.Members[ID].K() for ID in member_IDs]).reshape(-1, 12, 12) - factored['member_Ks'][member_IDs]
+        local = searchsorted(DOFs, member_DOFs)
+        num_DOFs = len(DOFs)
+        dK = bincount((local[:, :, None]*num_DOFs + local[:, None, :]).ravel(), weights=dK.ravel(),
+                      minlength=num_DOFs**2).reshape(num_DOFs, num_DOFs)
+
+        f_local = searchsorted(DOFs, f_DOFs)
+        k_local = searchsorted(DOFs, k_DOFs)
+        C = dK[f_local, :][:, f_local]
+
+        # Get the positions of the affected unknown displacements in D1. The indices from
+        # '__AuxList' are in ascending order.
+        f_rows = searchsorted(D1_indices, f_DOFs)
+
+        # Build the partitioned load vectors. The change in 'K12' changes the effect of the
+        # enforced displacements at the affected degrees of freedom.
+        cases = self.LoadCases()
+        combos = self.__LoadCombos()
+        RHS = concatenate([self.__CaseLoads(cases, D1_indices, D2_indices), -asarray(factored['K12'] @ D2)], axis=1)
+        if len(k_DOFs) > 0:
+            D2_k = asarray(D2)[searchsorted(D2_indices, k_DOFs), :]
+            RHS[f_rows, -1:] -= dK[f_local, :][:, k_local] @ D2_k
+
+        # Apply the change in stiffness to the partitions used to calculate reactions
+        K21, K22 = factored['K21'], factored['K22']
+        if len(k_DOFs) > 0:
+            k_rows = searchsorted(D2_indices, k_DOFs)
+            K21 = self.__AddBlock(K21, k_rows, f_rows, dK[k_local, :][:, f_local])
+            K22 = self.__AddBlock(K22, k_rows, k_rows, dK[k_local, :][:, k_local])
+        self.__Reactions = {'K21': K21, 'K22': K22, 'D1_indices': D1_indices, 'D2_indices': D2_indices}
+
+        # Solve using the previous factorization
+        print('...Calculating global displacement vectors')
+        Y = self.__Solve(factored['K11_solve'], RHS, D1_indices)
+        if Y is None:
+            return
+
+        # Get K11⁻¹*E. Columns already calculated by earlier reanalyses are reused.
+        missing = [row for row in f_rows if row not in factored['Z']]
+        if len(missing) > 0:
+            E = zeros((len(D1_indices), len(missing)))
+            E[missing, arange(len(missing))] = 1
+            Z_new = self.__Solve(factored['K11_solve'], E, D1_indices)
+            if Z_new is None:
+                return
+            for j, row in enumerate(missing):
+                factored['Z'][row] = Z_new[:, j]
+        Z = array([factored['Z'][row] for row in f_rows]).T.reshape(len(D1_indices), -1)
+
+        # Apply the Sherman-Morrison-Woodbury update
+        if len(f_rows) == 0:
+            X = Y
+        else:
+            try:
+                W = solve(eye(len(f_rows)) + C @ Z[f_rows, :], C @ Y[f_rows, :])
+            except LinAlgError:
+                print('The modified stiffness matrix is singular, which implies rigid body motion. The structure is unstable. Aborting analysis.')
+                return
+            X = Y - Z @ W
+
+        # Form and save the displacements for each load combination
+        self.__StoreCombos(X, D2, D1_indices, D2_indices, cases, combos)
 
-        # Store the calculated global nodal displacements into each node
-        for node in self.Nodes:
-            node.DX = D.item((node.ID*6 + 0, 0))
-            node.DY = D.item((node.ID*6 + 1, 0))
-            node.DZ = D.item((node.ID*6 + 2, 0))
-            node.RX = D.item((node.ID*6 + 3, 0))
-            node.RY = D.item((node.ID*6 + 4, 0))
-            node.RZ = D.item((node.ID*6 + 5, 0))
-        
-        # Segment all members in the model to make member results available
-        print('...Calculating member internal forces')
-        for member in self.Members:
-            member.SegmentMember()
-        
-        # Calculate reactions
-        self.__CalcReactions()
-    
         # Check statics if requested
         if check_statics == True:
-            self.__CheckStatics()
+            print(self.CheckStatics())
+
+#%%
+    def __CaseLoads(self, cases, D1_indices, D2_indices):
+        '''
+        Returns the partitioned load vector (P1 - FER1) for each load case, with one column per
+        load case.
+
+        Parameters
+        ----------
+        cases : list
+            The names of the load cases.
+        D1_indices : array
+            The global indices of the unknown displacements.
+        D2_indices : array
+            The global indices of the known displacements.
+        '''
+
+        columns = [zeros((len(D1_indices), 0))]
+        for case in cases:
+
+            # Get the partitioned global fixed end reaction vector and nodal force vector for the load case
+            case_combo = LoadCombo(case, {case: 1.0})
+            FER1, FER2 = self.__Partition(self.FER(case_combo), D1_indices, D2_indices)
+            P1, P2 = self.__Partition(self.P(case_combo), D1_indices, D2_indices)
+            columns.append(asarray(subtract(P1, FER1)))
+
+        return concatenate(columns, axis=1)
+
+#%%
+    def __StoreCombos(self, X, D2, D1_indices, D2_indices, cases, combos):
+        '''
+        Forms and saves the global displacement vector for each load combination from the
+        solutions for each load case, then makes the results for the first load combination
+        available.
+
+        Parameters
+        ----------
+        X : array
+            The unknown displacements for each load case, with one column per load case. The
+            last column holds the displacements caused by the enforced displacements.
+        D2 : matrix
+            The known displacements.
+        D1_indices : array
+            The global indices of the unknown displacements.
+        D2_indices : array
+            The global indices of the known displacements.
+        cases : list
+            The names of the load cases.
+        combos : list
+            The load combinations.
+        '''
+
+        # Form the unknown displacements D1 for each load combination by superposition of the load
+        # case results. Column 'j' of 'D1_combos' holds D1 for load combination 'j'.
+        factors = array([[combo.Factor(case) for combo in combos] for case in cases]).reshape(len(cases), len(combos))
+        D1_combos = X[:, :-1] @ factors + X[:, -1:]
+
+        # Form and save the global displacement vector for each load combination
+        self.__D = {}
+        self.__Combos = {}
+        for j, combo in enumerate(combos):
+            self.__D[combo.Name] = self.__FormD(D1_combos[:, j:j+1], D2, D1_indices, D2_indices)
+            self.__Combos[combo.Name] = combo
+
+        # Make the results for the first load combination available
+        self.ActivateCombo(combos[0].Name)
 
 #%%
-    def Analyze_PDelta(self, max_iter=30, tol=0.01):
+    def Analyze_PDelta(self, max_iter=30, tol=0.01, sparse=False, solver='auto', reorder=None, solver_options=None, method='fixed_point', aitken=False, processes=1):
         '''
         Runs a second order (P-Delta) analysis on the structure.
+
+        P-Delta effects depend on the loads, so load cases can't be superimposed. Each load
+        combination is iterated to convergence separately. The elastic stiffness matrix is
+        assembled, partitioned and factored once and reused for the first iteration of every load
+        combination. Later iterations only reassemble the geometric stiffness matrix, directly
+        into its partitions, from the member axial forces of the previous iteration.
+
+        Returns a dictionary with the convergence history of each load combination: the number of
+        iterations ('iterations'), whether the iterations converged ('converged'), the relative
+        norms of the displacement increments at each iteration ('displacement') and, for the
+        Newton methods, the relative norms of the out of balance forces at each iteration
+        ('residual'). Returns None if the structure is unstable.
+
+        Parameters
+        ----------
+        max_iter : number
+            The maximum number of iterations to try before giving up on convergence.
+        tol : number
+            The convergence tolerance.
+        sparse : boolean
+            If True, the global stiffness matrices are assembled and solved in `scipy.sparse`
+            format. Defaults to False.
+        solver : {'auto', 'dense', 'sparse', 'cholesky', 'banded', 'pcg'}
+            The linear solver used to calculate the displacements. See `Solvers.Factor` for a
+            description of each option. Defaults to 'auto'.
+        reorder : {None, 'rcm', 'amd'}
+            Renumbers the nodes internally to reduce the cost of factoring the stiffness matrix.
+            See `Analyze`. Defaults to None.
+        solver_options : dictionary
+            Options for the 'pcg' solver. See `Analyze`.
+        method : {'fixed_point', 'newton', 'modified_newton'}
+            The iteration used to find the second order displacements.
+                'fixed_point' = Each iteration solves the original loads with the geometric
+                                stiffness from the previous iteration. Converges when the largest
+                                ratio of the displacements of two iterations is within 'tol' of 1.
+                'newton' = Each iteration solves for a displacement increment from the out of
+                           balance forces, using the tangent stiffness matrix (K + Kg) of the
+                           current displacements. The tangent is factored every iteration.
+                'modified_newton' = The same as 'newton', but the tangent stiffness matrix is only
+                                    factored once, at the start of the second iteration. Cheaper
+                                    iterations, but more of them.
+            The Newton methods converge when the norms of the displacement increment and of the
+            out of balance forces are both within 'tol' of the norms of the displacements and
+            the loads. Defaults to 'fixed_point'.
+        aitken : boolean
+            If True, the displacement increments of the Newton methods are scaled by Aitken's
+            dynamic relaxation factor, which speeds up slowly converging iterations (particularly
+            'modified_newton'). Defaults to False.
+        processes : number
+            The number of processes used to analyze the load combinations in parallel. Each
+            process is sent a copy of the model and of the partitioned elastic stiffness matrix
+            once, and the results of each load combination are collected back into this model.
+            Defaults to 1 (the load combinations are analyzed one at a time in this process).
         '''
         
+        if method not in ('fixed_point', 'newton', 'modified_newton'):
+            raise ValueError("Unknown P-Delta method '" + str(method) + "'. Use 'fixed_point', 'newton' or 'modified_newton'.")
+
         print('**Running P-Delta analysis**')
 
+        # Keep the options so the analysis can be repeated by 'Reanalyze'
+        self.__LastAnalysis = ('Analyze_PDelta', {'max_iter': max_iter, 'tol': tol, 'sparse': sparse, 'solver': solver, 'reorder': reorder,
+                                                  'solver_options': solver_options, 'method': method, 'aitken': aitken, 'processes': processes})
+
         # Assign an ID to all nodes and elements in the model
-        self.__Renumber()
+        self.__Renumber(reorder)
 
         # Get the auxiliary list used to determine how the matrices will be partitioned
         D1_indices, D2_indices, D2 = self.__AuxList()
 
-        # Convert D2 from a list to a matrix
+        # Convert D2 to a column matrix
         D2 = matrix(D2).T    
 
+        # Get the load combinations to be solved
+        combos = self.__LoadCombos()
+
+        # Get the partitioned initial (elastic) stiffness matrix. It's the same for every load combination.
+        K11, K12, K21, K22 = self.__Partition(self.K(sparse), D1_indices, D2_indices)
+
+        # Reactions are calculated using the elastic stiffness matrix
+        self.__Reactions = {'K21': K21, 'K22': K22, 'D1_indices': D1_indices, 'D2_indices': D2_indices}
+
+        # Check for global stability while factoring the initial stiffness matrix
+        print('...Checking global stability')
+        K11_solve_initial = None
+        if K11.shape != (0, 0):
+            K11_solve_initial = self.__Factor(K11, D1_indices, solver, solver_options)
+
+            # Return out of the method if 'K' is singular
+            if K11_solve_initial is None:
+                return
+
+        # The geometry of the members is the same for every iteration
+        geometry = BatchGeometry(self.Members)
+
+        # Everything needed to iterate a load combination, other than the load combination itself
+        state = {'K11': K11, 'K12': K12, 'K11_solve': K11_solve_initial, 'D2': D2,
+                 'D1_indices': D1_indices, 'D2_indices': D2_indices, 'geometry': geometry,
+                 'method': method, 'aitken': aitken, 'max_iter': max_iter, 'tol': tol,
+                 'sparse': sparse, 'solver': solver, 'solver_options': solver_options}
+
+        if processes > 1 and len(combos) > 1:
+
+            # Analyze the load combinations in parallel. The model and the partitioned elastic
+            # stiffness matrix are sent to each worker process once, when it starts. After that
+            # only the load combinations and their results are passed back and forth. The factored
+            # stiffness matrix can't be sent between processes, so each worker factors it again.
+            print('...Analyzing ' + str(len(combos)) + ' load combinations in ' + str(processes) + ' processes')
+            with ProcessPoolExecutor(processes, initializer=_StartPDeltaWorker, initargs=(self, dict(state, K11_solve=None))) as pool:
+                results = list(pool.map(_RunPDeltaWorker, combos))
+
+        else:
+
+            # Analyze the load combinations one at a time
+            results = []
+            for combo in combos:
+                results.append(self.__PDeltaCombo(combo, state))
+
+                # Stop at the first load combination that finds the structure unstable
+                if results[-1] is None:
+                    break
+
+        # Return out of the method if the structure is unstable
+        if None in results:
+            return
+
+        # Collect the global displacement vector for each load combination
+        self.__D = {}
+        self.__Combos = {}
+        history = {}
+        for combo, (D, combo_history) in zip(combos, results):
+            self.__D[combo.Name] = D
+            self.__Combos[combo.Name] = combo
+            history[combo.Name] = combo_history
+
+        # Make the results for the first load combination available
+        self.ActivateCombo(combos[0].Name)
+
+        # Return the convergence history
+        return history
+
+#%%
+    def __PDeltaCombo(self, combo, state):
+        '''
+        Iterates a load combination to convergence in a P-Delta analysis, and returns its global
+        displacement vector and its convergence history. Returns None if the structure is
+        unstable. See `Analyze_PDelta`.
+
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination to analyze.
+        state : dictionary
+            The partitioned elastic stiffness matrix, its factorization ('K11_solve') and the
+            analysis options, shared by every load combination. If 'K11_solve' is None the
+            elastic stiffness matrix is factored, and the factorization is saved in 'state' for
+            the next load combination.
+        '''
+
+        K11, D2 = state['K11'], state['D2']
+        D1_indices, D2_indices = state['D1_indices'], state['D2_indices']
+
+        # Inform the user which load combination is being analyzed
+        print('...Analyzing load combination ' + str(combo.Name))
+
+        # Get the partitioned global fixed end reaction vector and nodal force vector for the load combination
+        FER1, FER2 = self.__Partition(self.FER(combo), D1_indices, D2_indices)
+        P1, P2 = self.__Partition(self.P(combo), D1_indices, D2_indices)
+        F1 = asarray(subtract(P1, FER1))
+
+        # If all displacements are known (D1 is an empty vector) there's nothing to iterate
+        if K11.shape == (0, 0):
+            D = self.__FormD(zeros((0, 1)), D2, D1_indices, D2_indices)
+            return D, {'iterations': 1, 'converged': True, 'displacement': [], 'residual': []}
+
+        # Factor the elastic stiffness matrix if this process hasn't factored it yet
+        if state['K11_solve'] is None:
+            print('...Checking global stability')
+            state['K11_solve'] = self.__Factor(K11, D1_indices, state['solver'], state['solver_options'])
+
+            # Return out of the method if 'K' is singular
+            if state['K11_solve'] is None:
+                return
+
+        # Iterate using Newton's method if requested
+        if state['method'] != 'fixed_point':
+            return self.__PDeltaNewton(K11, state['K12'], state['K11_solve'], F1, D2, D1_indices, D2_indices,
+                                       state['geometry'], state['method'], state['aitken'], state['max_iter'],
+                                       state['tol'], state['sparse'], state['solver'], state['solver_options'])
+
+        return self.__PDeltaFixedPoint(F1, state)
+
+#%%
+    def __PDeltaFixedPoint(self, F1, state):
+        '''
+        Iterates a load combination to convergence by solving its loads with the geometric
+        stiffness matrix of the previous iteration, and returns its global displacement vector and
+        its convergence history. Returns None if the structure is unstable. See `Analyze_PDelta`.
+
+        Parameters
+        ----------
+        F1 : array
+            The partitioned loads on the unknown displacements (P1 - FER1).
+        state : dictionary
+            The partitioned elastic stiffness matrix, its factorization and the analysis options.
+            See `__PDeltaCombo`.
+        '''
+
+        K11, K12, D2, geometry = state['K11'], state['K12'], state['D2'], state['geometry']
+        D1_indices, D2_indices = state['D1_indices'], state['D2_indices']
+        max_iter, tol, sparse = state['max_iter'], state['tol'], state['sparse']
+
         # Keep track of the number of iterations
         iter_count = 1
         convergence = False
         divergence = False
+        displacement_norms = []     # The relative norm of the change in displacements at each iteration
 
         # Iterate until convergence or divergence occurs
         while convergence == False and divergence == False:
@@ -975,85 +2079,43 @@ class FEModel3D():
             # Inform the user which iteration we're on
             print('...Beginning P-Delta iteration #' + str(iter_count))
 
-            # Get the partitioned global matrices
             if iter_count == 1:
-                
-                K11, K12, K21, K22 = self.__Partition(self.K(), D1_indices, D2_indices) # Initial stiffness matrix
-                FER1, FER2 = self.__Partition(self.FER(), D1_indices, D2_indices)       # Fixed end reactions
-                P1, P2 = self.__Partition(self.P(), D1_indices, D2_indices)             # Nodal forces
-
-            else:
 
-                # Calculate the global stiffness matrices (partitioned)
-                K11, K12, K21, K22 = self.__Partition(self.K(), D1_indices, D2_indices)      # Initial stiffness matrix
-                Kg11, Kg12, Kg21, Kg22 = self.__Partition(self.Kg(), D1_indices, D2_indices) # Geometric stiffness matrix
+                # The first iteration is a first order analysis using the initial stiffness matrix
+                K11_solve = state['K11_solve']
+                Kt12 = K12
 
-                # Combine the stiffness matrices
-                K11 = add(K11, Kg11)
-                K12 = add(K12, Kg12)
-                K21 = add(K21, Kg21)
-                K22 = add(K22, Kg22)                     
-
-            # Determine if 'K' is singular
-            print('...Checking global stability')
-            if K11.shape == (0, 0):
-                # All displacements are known, so D1 is an empty vector
-                D1 = []
-            elif matrix_rank(K11) < min(K11.shape):
-                # Return out of the method if 'K' is singular and provide an error message
-                print('The stiffness matrix is singular, which implies rigid body motion. The structure is unstable. Aborting analysis.')
-                return
             else:
-                # Calculate the global displacement vector
-                print('...Calculating global displacement vector')
-                D1 = solve(K11, subtract(subtract(P1, FER1), matmul(K12, D2)))
-            
-            D = zeros((len(self.Nodes)*6, 1))
 
-            for node in self.Nodes:
-                
-                if D2_indices.count(node.ID*6 + 0) == 1:
-                    D.itemset((node.ID*6 + 0, 0), D2[D2_indices.index(node.ID*6 + 0), 0])
-                else:
-                    D.itemset((node.ID*6 + 0, 0), D1[D1_indices.index(node.ID*6 + 0), 0]) 
-
-                if D2_indices.count(node.ID*6 + 1) == 1:
-                    D.itemset((node.ID*6 + 1, 0), D2[D2_indices.index(node.ID*6 + 1), 0])
-                else:
-                    D.itemset((node.ID*6 + 1, 0), D1[D1_indices.index(node.ID*6 + 1), 0]) 
-
-                if D2_indices.count(node.ID*6 + 2) == 1:
-                    D.itemset((node.ID*6 + 2, 0), D2[D2_indices.index(node.ID*6 + 2), 0])
-                else:
-                    D.itemset((node.ID*6 + 2, 0), D1[D1_indices.index(node.ID*6 + 2), 0]) 
-
-                if D2_indices.count(node.ID*6 + 3) == 1:
-                    D.itemset((node.ID*6 + 3, 0), D2[D2_indices.index(node.ID*6 + 3), 0])
-                else:
-                    D.itemset((node.ID*6 + 3, 0), D1[D1_indices.index(node.ID*6 + 3), 0]) 
+                # Calculate the partitioned global geometric stiffness matrix from the member axial
+                # forces of the last iteration. The elastic stiffness matrix was partitioned once,
+                # and only the geometric stiffness matrix changes.
+                print('...Adding member geometric stiffness terms to global geometric stiffness matrix')
+                member_Kgs = BatchKg(self.Members, self.__AxialForces(D, geometry), geometry)
+                Kg11, Kg12 = self.__AssemblePartitioned([(self.__MemberDOFs, member_Kgs)], D1_indices, D2_indices, sparse)
 
-                if D2_indices.count(node.ID*6 + 4) == 1:
-                    D.itemset((node.ID*6 + 4, 0), D2[D2_indices.index(node.ID*6 + 4), 0])
-                else:
-                    D.itemset((node.ID*6 + 4, 0), D1[D1_indices.index(node.ID*6 + 4), 0]) 
+                # Combine the stiffness matrices
+                Kt12 = K12 + Kg12
 
-                if D2_indices.count(node.ID*6 + 5) == 1:
-                    D.itemset((node.ID*6 + 5, 0), D2[D2_indices.index(node.ID*6 + 5), 0])
-                else:
-                    D.itemset((node.ID*6 + 5, 0), D1[D1_indices.index(node.ID*6 + 5), 0])
+                # Check for global stability while factoring the combined stiffness matrix
+                print('...Checking global stability')
+                K11_solve = self.__Factor(K11 + Kg11, D1_indices, state['solver'], state['solver_options'])
 
-            # Save the global displacement vector
-            self.__D = D
+                # Return out of the method if 'K' is singular
+                if K11_solve is None:
+                    return
 
-            # Store the calculated global nodal displacements into each node
-            for node in self.Nodes:
+            # Calculate the global displacement vector
+            print('...Calculating global displacement vector')
+            D1 = self.__Solve(K11_solve, asarray(subtract(F1, Kt12 @ D2)), D1_indices)
 
-                node.DX = D.item((node.ID*6 + 0, 0))
-                node.DY = D.item((node.ID*6 + 1, 0))
-                node.DZ = D.item((node.ID*6 + 2, 0))
-                node.RX = D.item((node.ID*6 + 3, 0))
-                node.RY = D.item((node.ID*6 + 4, 0))
-                node.RZ = D.item((node.ID*6 + 5, 0))
+            # Return out of the method if 'K' was found to be singular while solving
+            if D1 is None:
+                return
+            
+            # Form the global displacement vector. The geometric stiffness matrix for the next
+            # iteration is based on these displacements.
+            D = self.__FormD(D1, D2, D1_indices, D2_indices)
 
             if iter_count != 1:
                 
@@ -1064,14 +2126,20 @@ class FEModel3D():
                 # We'll be dealing with some 'nan' values due to division by zero at supports with zero deflection.
                 seterr(invalid='ignore')
 
+                # Keep track of the relative norm of the change in displacements
+                change = abs(1 - nanmax(divide(prev_results, D1)))
+                displacement_norms.append(float(Norm(D1 - prev_results)/max(Norm(D1), finfo(float).tiny)))
+
                 # Check for convergence
-                if abs(1 - nanmax(divide(prev_results, D1))) <= tol:
+                if change <= tol:
                     convergence = True
                     print('...P-Delta analysis converged after '+str(iter_count)+' iterations.')
                 # Check for divergence
                 elif iter_count > max_iter:
                     divergence = True
-                    print('...P-Delta analysis failed to converge after 30 iterations.')
+                    print('...P-Delta analysis failed to converge after ' + str(iter_count) + ' iterations (max_iter = ' + str(max_iter)
+                          + '). Largest displacement ratio change ' + '{:.3e}'.format(change) + ', relative displacement change norm '
+                          + '{:.3e}'.format(displacement_norms[-1]) + ' (tolerance ' + str(tol) + ').')
 
                 # Turn invalid value warnings back on
                 seterr(invalid='warn') 
@@ -1081,197 +2149,601 @@ class FEModel3D():
 
             # Increment the iteration count
             iter_count += 1
-        
-        # Calculate reactions
-        self.__CalcReactions()
-                
+
+        # Return the global displacement vector and the convergence history
+        return D, {'iterations': iter_count - 1, 'converged': convergence, 'displacement': displacement_norms, 'residual': []}
+
+#%%
+    def __PDeltaNewton(self, K11, K12, K11_solve, F1, D2, D1_indices, D2_indices, geometry, method, aitken, max_iter, tol, sparse, solver, solver_options):
+        '''
+        Iterates a load combination to convergence using Newton's method, and returns its global
+        displacement vector and its convergence history. See `Analyze_PDelta`. Returns None if the
+        structure is unstable.
+
+        Parameters
+        ----------
+        K11, K12 : array or scipy.sparse matrix
+            The partitioned elastic stiffness matrix.
+        K11_solve : function
+            The factored elastic stiffness matrix.
+        F1 : array
+            The partitioned loads on the unknown displacements (P1 - FER1).
+        D2 : matrix
+            The known displacements.
+        '''
+
+        history = {'iterations': 1, 'converged': False, 'displacement': [], 'residual': []}
+
+        # The first iteration is a first order analysis using the elastic stiffness matrix
+        print('...Beginning P-Delta iteration #1')
+        print('...Calculating global displacement vector')
+        D1 = self.__Solve(K11_solve, F1 - asarray(K12 @ D2), D1_indices)
+        if D1 is None:
+            return None
+
+        tangent_solve = None
+        delta_prev = None
+        omega = 1.0
+        for iter_count in range(2, max_iter + 2):
+
+            print('...Beginning P-Delta iteration #' + str(iter_count))
+
+            # Calculate the partitioned global geometric stiffness matrix from the member axial
+            # forces for the current displacements
+            D = self.__FormD(D1, D2, D1_indices, D2_indices)
+            print('...Adding member geometric stiffness terms to global geometric stiffness matrix')
+            member_Kgs = BatchKg(self.Members, self.__AxialForces(D, geometry), geometry)
+            Kg11, Kg12 = self.__AssemblePartitioned([(self.__MemberDOFs, member_Kgs)], D1_indices, D2_indices, sparse)
+
+            # Calculate the out of balance forces for the current displacements
+            Kt11 = K11 + Kg11
+            F = F1 - asarray((K12 + Kg12) @ D2)
+            residual = F - asarray(Kt11 @ D1)
+
+            # Factor the tangent stiffness matrix. Modified Newton keeps the first one.
+            if tangent_solve is None or method == 'newton':
+                print('...Checking global stability')
+                tangent_solve = self.__Factor(Kt11, D1_indices, solver, solver_options)
+                if tangent_solve is None:
+                    return None
+
+            # Solve for the displacement increment
+            print('...Calculating global displacement vector')
+            delta = self.__Solve(tangent_solve, residual, D1_indices)
+            if delta is None:
+                return None
+
+            # Scale the increment by Aitken's dynamic relaxation factor
+            if aitken == True and delta_prev is not None:
+                change = delta - delta_prev
+                if (change**2).sum() > 0:
+                    omega = -omega*float((delta_prev*change).sum()/(change**2).sum())
+            delta_prev = delta
+            delta = omega*delta
+
+            # Update the displacements
+            D1 = D1 + delta
+
+            # Check for convergence using the relative norms of the increment and the out of
+            # balance forces
+            displacement_norm = float(Norm(delta)/max(Norm(D1), finfo(float).tiny))
+            residual_norm = float(Norm(residual)/max(Norm(F), finfo(float).tiny))
+            history['displacement'].append(displacement_norm)
+            history['residual'].append(residual_norm)
+            history['iterations'] = iter_count
+
+            print('...Checking for convergence.')
+            if displacement_norm <= tol and residual_norm <= tol:
+                history['converged'] = True
+                print('...P-Delta analysis converged after ' + str(iter_count) + ' iterations.')
+                break
+        else:
+            print('...P-Delta analysis failed to converge after ' + str(iter_count) + ' iterations (max_iter = ' + str(max_iter) + '). Relative displacement norm '
+                  + '{:.3e}'.format(displacement_norm) + ', relative residual norm ' + '{:.3e}'.format(residual_norm)
+                  + ' (tolerance ' + str(tol) + ').')
+
+        # Return the global displacement vector and the convergence history
+        return self.__FormD(D1, D2, D1_indices, D2_indices), history
+
+#%%
+    def Analyze_Buckling(self, num_modes=5, combo_name=None, sparse=False, solver='auto', reorder=None, solver_options=None):
+        '''
+        Runs a linear buckling (eigenvalue) analysis on the structure.
+
+        The loads in a load combination are used as reference loads. A first order analysis
+        gives the member axial forces under the reference loads, and their geometric stiffness
+        matrix [Kg]. The structure buckles when the reference loads are multiplied by a critical
+        load factor λ that makes the combined stiffness matrix singular:
+
+            ([K] + λ[Kg]){φ} = {0}
+
+        The lowest critical load factors are found with a shift-invert eigensolver. Shifting
+        about λ = 0 only requires the factorization of the elastic stiffness matrix [K], which is
+        also used for the first order analysis. Geometric stiffness of plates and superelements
+        is not included.
+
+        The first order results for the reference load combination are stored in the model when
+        the analysis is complete.
+
+        Returns the critical load factors (lowest first) as an array, and the buckling mode
+        shapes as an array with one global displacement vector per column. Each mode shape is
+        scaled so its largest displacement is 1. The displacements of a node are in rows
+        `node.ID*6` to `node.ID*6 + 5` (DX, DY, DZ, RX, RY, RZ), as in `K`. Returns None if the
+        structure is unstable.
+
+        Parameters
+        ----------
+        num_modes : number
+            The number of buckling modes to find. Defaults to 5.
+        combo_name : string
+            The name of the load combination used as the reference loads. Defaults to None (the
+            first load combination).
+        sparse : boolean
+            If True, the global stiffness matrices are assembled and solved in `scipy.sparse`
+            format. Defaults to False.
+        solver : {'auto', 'dense', 'sparse', 'cholesky', 'banded', 'pcg'}
+            The linear solver used to factor the elastic stiffness matrix. See `Solvers.Factor`.
+            Defaults to 'auto'.
+        reorder : {None, 'rcm', 'amd'}
+            Renumbers the nodes internally to reduce the cost of factoring the stiffness matrix.
+            See `Analyze`. Defaults to None.
+        solver_options : dictionary
+            Options for the 'pcg' solver. See `Analyze`.
+        '''
+
+        print('**Running buckling analysis**')
+
+        # Get the reference load combination
+        combos = self.__LoadCombos()
+        if combo_name != None:
+            combos = [combo for combo in combos if combo.Name == combo_name]
+            if len(combos) == 0:
+                raise NameError("The model has no load combination named '" + str(combo_name) + "'.")
+        combo = combos[0]
+
+        # The first order results are stored in the model, so 'Reanalyze' repeats a first order
+        # analysis
+        self.__LastAnalysis = ('Analyze', {'sparse': sparse, 'solver': solver, 'reorder': reorder, 'solver_options': solver_options})
+
+        # Assign an ID to all nodes and elements in the model
+        self.__Renumber(reorder)
+
+        # Get the auxiliary list used to determine how the matrices will be partitioned
+        D1_indices, D2_indices, D2 = self.__AuxList()
+
+        # Convert D2 to a column matrix
+        D2 = matrix(D2).T
+
+        # Get the partitioned elastic stiffness matrix
+        K11, K12, K21, K22 = self.__Partition(self.K(sparse), D1_indices, D2_indices)
+        self.__Reactions = {'K21': K21, 'K22': K22, 'D1_indices': D1_indices, 'D2_indices': D2_indices}
+
+        # With every displacement known the structure can't buckle
+        if K11.shape == (0, 0):
+            print('...All displacements are known. There are no buckling modes.')
+            return zeros(0), zeros((len(self.Nodes)*6, 0))
+
+        # Check for global stability while factoring the elastic stiffness matrix
+        print('...Checking global stability')
+        K11_solve = self.__Factor(K11, D1_indices, solver, solver_options)
+
+        # Return out of the method if 'K' is singular
+        if K11_solve is None:
+            return
+
+        # Run a first order analysis for the reference loads
+        print('...Analyzing load combination ' + str(combo.Name))
+        FER1, FER2 = self.__Partition(self.FER(combo), D1_indices, D2_indices)
+        P1, P2 = self.__Partition(self.P(combo), D1_indices, D2_indices)
+        D1 = self.__Solve(K11_solve, asarray(subtract(subtract(P1, FER1), K12 @ D2)), D1_indices)
+
+        # Return out of the method if 'K' was found to be singular while solving
+        if D1 is None:
+            return
+
+        # Save the results of the first order analysis
+        D = self.__FormD(D1, D2, D1_indices, D2_indices)
+        self.__D = {combo.Name: D}
+        self.__Combos = {combo.Name: combo}
+
+        # Get the partitioned geometric stiffness matrix for the reference loads
+        print('...Adding member geometric stiffness terms to global geometric stiffness matrix')
+        geometry = BatchGeometry(self.Members)
+        member_Kgs = BatchKg(self.Members, self.__AxialForces(D, geometry), geometry)
+        Kg11, Kg12 = self.__AssemblePartitioned([(self.__MemberDOFs, member_Kgs)], D1_indices, D2_indices, sparse)
+
+        # The problem is solved for the inverse of the load factors, μ = 1/λ:
+        #     (-[Kg]){φ} = μ[K]{φ}
+        # which is the shift-invert form of the buckling problem about λ = 0. The largest values
+        # of μ are the lowest positive critical load factors. The sparse eigensolver can't find
+        # every mode of a small problem, so small problems (and problems the sparse eigensolver
+        # fails on) are solved densely instead.
+        print('...Calculating buckling modes')
+        n = K11.shape[0]
+        num_modes = min(num_modes, n)
+        if num_modes < n - 1:
+            try:
+                K11_inv = LinearOperator((n, n), lambda x: asarray(K11_solve(asarray(x).reshape(-1, 1))).ravel(), dtype=float)
+                mu, phi = eigsh(-Kg11, num_modes, M=K11, Minv=K11_inv, which='LA')
+            except ArpackError:
+                print('...The sparse eigensolver failed. Solving the full eigenvalue problem instead.')
+                mu = None
+        else:
+            mu = None
+
+        if mu is None:
+            mu, phi = eigh(-(Kg11.toarray() if issparse(Kg11) else asarray(Kg11)), K11.toarray() if issparse(K11) else asarray(K11))
+            mu, phi = mu[n - num_modes:], phi[:, n - num_modes:]
+
+        # Sort the modes from the lowest load factor to the highest. Modes with no positive load
+        # factor (μ <= 0) can't be reached by increasing the reference loads.
+        order = argsort(-mu)
+        mu, phi = mu[order], phi[:, order]
+        load_factors = where(mu > 0, 1/where(mu > 0, mu, 1), inf)
+        if not isfinite(load_factors).all():
+            print('...Warning: The reference loads do not cause buckling in every mode requested.')
+
+        # Form the mode shapes, and scale each one so its largest displacement is 1. Supports
+        # don't move in a buckling mode.
+        modes = zeros((len(self.Nodes)*6, num_modes))
+        modes[D1_indices, :] = phi
+        modes = modes/abs(modes).max(axis=0)
+
+        # Make the results for the reference load combination available
+        self.ActivateCombo(combo.Name)
+
+        # Return the critical load factors and the mode shapes
+        return load_factors, modes
+
+#%%
+    def ActivateCombo(self, combo_name):
+        '''
+        Stores the results of a load combination into the nodes and members of the model. Nodal
+        displacements, reactions and member internal forces will report values for this load
+        combination until another load combination is activated.
+
+        The model must be analyzed before a load combination can be activated.
+
+        Parameters
+        ----------
+        combo_name : string
+            The name of the load combination.
+        '''
+
+        # Get the load combination and its global displacement vector
+        combo = self.__Combos[combo_name]
+        D = self.__D[combo_name]
+
+        # Store the calculated global nodal displacements into each node
+        self.__StoreD(D)
+
         # Segment all members in the model to make member results available
         print('...Calculating member internal forces')
         for member in self.Members:
-            member.SegmentMember()
+            member.SegmentMember(combo)
+        
+        # Calculate reactions
+        self.__CalcReactions(combo)
+
+        # Keep track of which load combination's results are stored in the model
+        self.ActiveCombo = combo_name
+
+#%%
+    def Condense(self, boundary_nodes, sparse=False, solver='auto'):
+        '''
+        Condenses the model to the degrees of freedom of its boundary nodes (static condensation),
+        so it can be used as a superelement in other models. See `AddSuperElement`.
+
+        The stiffness matrix is partitioned into boundary (b) and interior (i) degrees of freedom,
+        and the interior degrees of freedom are eliminated:
+
+            Kc = Kbb - Kbi*Kii⁻¹*Kib
+            Qc = Fb - Kbi*Kii⁻¹*Fi
+
+        where 'F' are the loads on the model (P - FER) for each load case, and 'Qc' are the
+        equivalent loads on the boundary nodes. The factorization of 'Kii' is used once, with the
+        columns of 'Kib' and every load case solved together. Supports and enforced displacements
+        at interior nodes are kept in the condensed model.
+
+        Parameters
+        ----------
+        boundary_nodes : list
+            The names of the nodes that connect the substructure to the models it is used in.
+            Boundary nodes should not be supported in the substructure.
+        sparse : boolean
+            If True, the stiffness matrix is assembled in `scipy.sparse` format. Defaults to False.
+        solver : {'auto', 'dense', 'sparse', 'cholesky', 'banded'}
+            The linear solver used to factor the interior stiffness matrix. See `Solvers.Factor`.
+        '''
+
+        print('**Condensing**')
+
+        # Assign an ID to all nodes and elements in the model
+        self.__Renumber()
+
+        # Get the auxiliary list of known and unknown displacements
+        D1_indices, D2_indices, D2 = self.__AuxList()
+
+        # Sort the degrees of freedom into boundary degrees of freedom (b), interior degrees of
+        # freedom (i), and interior degrees of freedom with known displacements (k)
+        b_indices = (array([self.GetNode(Name).ID for Name in boundary_nodes], dtype=int).reshape(-1, 1)*6 + arange(6)).ravel()
+        i_indices = D1_indices[~isin(D1_indices, b_indices)]
+        k_known = ~isin(D2_indices, b_indices)
+        k_indices = D2_indices[k_known]
+        Dk = D2[k_known].reshape(-1, 1)
+
+        # Get the load cases
+        cases = self.LoadCases()
+
+        # Partition the global stiffness matrix
+        K = self.K(sparse)
+        Kbb = K[b_indices, :][:, b_indices]
+        Kbi = K[b_indices, :][:, i_indices]
+        Kib = K[i_indices, :][:, b_indices]
+        Kii = K[i_indices, :][:, i_indices]
+        Kbk = K[b_indices, :][:, k_indices]
+        Kik = K[i_indices, :][:, k_indices]
+        if sparse == True:
+            Kbb = Kbb.toarray()
+            Kib = Kib.toarray()
+
+        # Keep the partitions used to calculate reactions when results are recovered
+        K11, K12, K21, K22 = self.__Partition(K, D1_indices, D2_indices)
+        self.__Reactions = {'K21': K21, 'K22': K22, 'D1_indices': D1_indices, 'D2_indices': D2_indices}
+
+        # Build the load vector (P - FER) for each load case, with one column per load case
+        F = zeros((len(self.Nodes)*6, len(cases)))
+        for j, case in enumerate(cases):
+            case_combo = LoadCombo(case, {case: 1.0})
+            F[:, j:j+1] = subtract(self.P(case_combo), self.FER(case_combo))
+
+        # Solve [Kii]{X} = [Kib | Fi | -Kik*Dk] using a single factorization of 'Kii'
+        print('...Calculating condensed stiffness matrix')
+        RHS = concatenate([Kib, F[i_indices, :], -(Kik @ Dk)], axis=1)
+        if Kii.shape == (0, 0):
+            # There are no interior degrees of freedom to eliminate
+            X = zeros((0, RHS.shape[1]))
+        else:
+            Kii_solve = self.__Factor(Kii, i_indices, solver)
+
+            # Return out of the method if 'Kii' is singular
+            if Kii_solve is None:
+                return
+
+            X = self.__Solve(Kii_solve, RHS, i_indices)
+            if X is None:
+                return
+
+        num_b = len(b_indices)
+        num_cases = len(cases)
+        Xb = X[:, :num_b]                      # Kii⁻¹*Kib
+        XF = X[:, num_b:num_b + num_cases]     # Kii⁻¹*Fi for each load case
+        Xk = X[:, num_b + num_cases:]          # -Kii⁻¹*Kik*Dk
+
+        # Calculate the condensed stiffness matrix. It's symmetric, so any round off that made it
+        # slightly unsymmetric is averaged out.
+        Kc = Kbb - Kbi @ Xb
+        Kc = (Kc + Kc.T)/2
+
+        # Calculate the condensed loads for each load case, and for the enforced displacements
+        Qc = F[b_indices, :] - Kbi @ XF
+        Qk = -(Kbk @ Dk) - Kbi @ Xk
+
+        # Save the results. The solutions for the interior are needed to recover interior results.
+        self.BoundaryNodes = list(boundary_nodes)
+        self.__Condensed = {'K': Kc, 'Q': Qc, 'Qk': Qk, 'cases': cases,
+                            'Xb': Xb, 'XF': XF, 'Xk': Xk, 'Dk': Dk,
+                            'b': b_indices, 'i': i_indices, 'k': k_indices}
+
+#%%
+    def CondensedK(self):
+        '''
+        Returns the condensed stiffness matrix of a model that has been condensed using `Condense`.
+        '''
+
+        return self.__Condensed['K']
+
+#%%
+    def CondensedLoads(self, combo=None):
+        '''
+        Returns the equivalent loads on the boundary nodes of a model that has been condensed
+        using `Condense`.
+
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination used to factor the loads. If None, every load is used unfactored.
+        '''
+
+        # Get the load factor for each load case
+        condensed = self.__Condensed
+        if combo is None:
+            factors = array([1.0 for case in condensed['cases']])
+        else:
+            factors = array([combo.Factor(case) for case in condensed['cases']], dtype=float)
+
+        # Superimpose the load cases, and add the effect of the enforced displacements
+        return condensed['Q'] @ factors.reshape(-1, 1) + condensed['Qk']
+
+#%%
+    def __Expand(self, Db, combo):
+        '''
+        Recovers the results of a condensed model from the displacements of its boundary nodes.
+        The results are stored in the model's nodes and members.
+
+        Parameters
+        ----------
+        Db : array
+            The displacements of the boundary nodes.
+        combo : LoadCombo
+            The load combination used to factor the loads.
+        '''
+
+        # Get the load factor for each load case
+        condensed = self.__Condensed
+        factors = array([combo.Factor(case) for case in condensed['cases']], dtype=float).reshape(-1, 1)
+
+        # Calculate the interior displacements: Di = Kii⁻¹*(Fi - Kib*Db - Kik*Dk)
+        Di = condensed['XF'] @ factors + condensed['Xk'] - condensed['Xb'] @ Db
+
+        # Form the global displacement vector
+        D = zeros((len(self.Nodes)*6, 1))
+        D[condensed['b'], :] = Db
+        D[condensed['i'], :] = Di
+        D[condensed['k'], :] = condensed['Dk']
+
+        # Save the global displacement vector and make the results available
+        self.__D = {combo.Name: D}
+        self.__Combos = {combo.Name: combo}
+        self.ActivateCombo(combo.Name)
+
+#%%
+    def RecoverSuperElement(self, Name):
+        '''
+        Recovers the displacements, member internal forces, and reactions inside a superelement
+        for the active load combination. Returns the superelement's substructure model, where the
+        results can be found.
+
+        Copies of a substructure share the same model, so only the results of the most recently
+        recovered copy are available at any time.
+
+        Parameters
+        ----------
+        Name : string
+            The name of the superelement.
+        '''
+
+        # Get the superelement
+        SE = self.GetSuperElement(Name)
+
+        # Recover the results inside the superelement from the displacements of its boundary nodes
+        print('**Recovering superelement ' + str(Name) + '**')
+        SE.Model.__Expand(SE.D(), self.__Combos[self.ActiveCombo])
+
+        return SE.Model
 
 #%%
-    def __CalcReactions(self):
+    def __CalcReactions(self, combo):
         '''
         Calculates reactions once the model is solved.
+
+        The reactions at the known displacements (supports and enforced displacements) are
+        calculated directly from the partitioned stiffness matrix:
+
+            R2 = K21*D1 + K22*D2 + FER2 - P2
+
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination the reactions are being calculated for.
         '''
 
         # Print a status update to the console
         print('...Calculating reactions')
 
-        # Calculate the reactions, node by node
-        for node in self.Nodes:
-            
-            # Determine if the node has any supports
-            if isclose(node.DX, 0.0) or isclose(node.DY, 0.0) or isclose(node.DZ, 0.0) or isclose(node.RX, 0.0) or isclose(node.RY, 0) or isclose(node.RZ, 0):
-
-                # Sum the member end forces at the node
-                for member in self.Members:
-                    
-                    if member.iNode == node:
-                        
-                        # Get the member's global force matrix
-                        # Storing it as a local variable eliminates the need to rebuild it every time a term is needed                    
-                        member_F = member.F()
-
-                        node.RxnFX += member_F[0, 0]
-                        node.RxnFY += member_F[1, 0]
-                        node.RxnFZ += member_F[2, 0]
-                        node.RxnMX += member_F[3, 0]
-                        node.RxnMY += member_F[4, 0]
-                        node.RxnMZ += member_F[5, 0]
-
-                    elif member.jNode == node:
-                        
-                        # Get the member's global force matrix
-                        # Storing it as a local variable eliminates the need to rebuild it every time a term is needed                    
-                        member_F = member.F()
-                        
-                        node.RxnFX += member_F[6, 0]
-                        node.RxnFY += member_F[7, 0]
-                        node.RxnFZ += member_F[8, 0]
-                        node.RxnMX += member_F[9, 0]
-                        node.RxnMY += member_F[10, 0]
-                        node.RxnMZ += member_F[11, 0]
-
-                # Sum the plate forces at the node
-                for plate in self.Plates:
-
-                    if plate.iNode == node:
-
-                        # Get the plate's global force matrix
-                        # Storing it as a local variable eliminates the need to rebuild it every time a term is needed                    
-                        plate_F = plate.F()
-                    
-                        node.RxnFX += plate_F[0, 0]
-                        node.RxnFY += plate_F[1, 0]
-                        node.RxnFZ += plate_F[2, 0]
-                        node.RxnMX += plate_F[3, 0]
-                        node.RxnMY += plate_F[4, 0]
-                        node.RxnMZ += plate_F[5, 0]
-
-                    elif plate.jNode == node:
-
-                        # Get the plate's global force matrix
-                        # Storing it as a local variable eliminates the need to rebuild it every time a term is needed                    
-                        plate_F = plate.F()
-                    
-                        node.RxnFX += plate_F[6, 0]
-                        node.RxnFY += plate_F[7, 0]
-                        node.RxnFZ += plate_F[8, 0]
-                        node.RxnMX += plate_F[9, 0]
-                        node.RxnMY += plate_F[10, 0]
-                        node.RxnMZ += plate_F[11, 0]
-
-                    elif plate.mNode == node:
-
-                        # Get the plate's global force matrix
-                        # Storing it as a local variable eliminates the need to rebuild it every time a term is needed                    
-                        plate_F = plate.F()
-                    
-                        node.RxnFX += plate_F[12, 0]
-                        node.RxnFY += plate_F[13, 0]
-                        node.RxnFZ += plate_F[14, 0]
-                        node.RxnMX += plate_F[15, 0]
-                        node.RxnMY += plate_F[16, 0]
-                        node.RxnMZ += plate_F[17, 0]
-
-                    elif plate.nNode == node:
-
-                        # Get the plate's global force matrix
-                        # Storing it as a local variable eliminates the need to rebuild it every time a term is needed                    
-                        plate_F = plate.F()
-                    
-                        node.RxnFX += plate_F[18, 0]
-                        node.RxnFY += plate_F[19, 0]
-                        node.RxnFZ += plate_F[20, 0]
-                        node.RxnMX += plate_F[21, 0]
-                        node.RxnMY += plate_F[22, 0]
-                        node.RxnMZ += plate_F[23, 0]
-
-                # Sum the joint forces at the node
-                for load in node.NodeLoads:
-                    
-                    if load[0] == 'FX':
-                        node.RxnFX -= load[1]
-                    elif load[0] == 'FY':
-                        node.RxnFY -= load[1]
-                    elif load[0] == 'FZ':
-                        node.RxnFZ -= load[1]
-                    elif load[0] == 'MX':
-                        node.RxnMX -= load[1]
-                    elif load[0] == 'MY':
-                        node.RxnMY -= load[1]
-                    elif load[0] == 'MZ':
-                        node.RxnMZ -= load[1]
-
-#%%
-    def __CheckStatics(self):
-        '''
-        Sums global forces and reactions and prints them to the console.
+        # Get the partitions from the analysis and the displacements for the load combination
+        K21, K22 = self.__Reactions['K21'], self.__Reactions['K22']
+        D1_indices, D2_indices = self.__Reactions['D1_indices'], self.__Reactions['D2_indices']
+        D = self.__D[combo.Name]
+
+        # Get the net loads on the nodes (P - FER)
+        F = asarray(subtract(self.P(combo), self.FER(combo)))
+
+        # Calculate the reactions at the known displacements
+        R = zeros((len(self.Nodes)*6, 1))
+        if len(D2_indices) > 0:
+            R[D2_indices, :] = asarray(K21 @ D[D1_indices, :]) + asarray(K22 @ D[D2_indices, :]) - F[D2_indices, :]
+
+        # Keep the loads and reactions so statics can be checked without assembling them again
+        self.__Statics = {'combo': combo.Name, 'F': F.reshape(-1, 6), 'R': R.reshape(-1, 6)}
+
+        # Store the reactions in the model's node arrays, clearing out the reactions from any
+        # previously activated load combination. Unsupported nodes have no reactions.
+        self.__NodeArrays.Rxn[:len(self.Nodes)] = R.reshape(-1, 6)[self.__NodeIDs]
+
+#%%
+    def __AddBlock(self, M, rows, cols, block):
         '''
-        
+        Returns a copy of a dense or sparse matrix with a block of terms added to it.
+
+        Parameters
+        ----------
+        M : matrix or scipy.sparse matrix
+            The matrix.
+        rows, cols : array
+            The rows and columns of the matrix the terms are added to.
+        block : array
+            The (len(rows), len(cols)) terms to add.
+        '''
+
+        if issparse(M):
+            return M + coo_matrix((asarray(block).ravel(), (repeat(rows, len(cols)), tile(cols, len(rows)))), shape=M.shape)
+        else:
+            M = M.copy()
+            M[ix_(rows, cols)] += block
+            return M
+
+#%%
+    def CheckStatics(self, tol=1e-6):
+        '''
+        Checks that the applied loads and the reactions for the active load combination are in
+        equilibrium, and returns the results as a `StaticsCheck`.
+
+        The resultant forces and the resultant moments about the global origin are summed for the
+        applied loads and for the reactions, using the load vectors from the analysis. The model
+        passes the check (`StaticsCheck.OK`) if every term of the imbalance is no more than `tol`
+        times the sum of the absolute values of the terms that went into it.
+
+        Parameters
+        ----------
+        tol : number
+            The relative tolerance on the imbalance. Defaults to 1e-6.
+        '''
+
+        # The loads and reactions come from the analysis, so there's nothing to check without one
+        if self.__Statics is None:
+            raise RuntimeError('Analyze the model before checking statics.')
+
         # Print a status update to the console
-        print('...Checking statics')
+        print('...Checking statics for load combination ' + str(self.ActiveCombo))
 
-        # Initialize force and moment summations to zero
-        SumFX, SumFY, SumFZ = 0, 0, 0
-        SumMX, SumMY, SumMZ = 0, 0, 0
-        SumRFX, SumRFY, SumRFZ = 0, 0, 0
-        SumRMX, SumRMY, SumRMZ = 0, 0, 0
+        # Get the nodal loads and reactions from the analysis, with one row per node
+        F = self.__Statics['F']
+        R = self.__Statics['R']
 
-        # Get the global force vector and the global fixed end reaction vector
-        P = self.P()
-        FER = self.FER()
+        # Get the nodal coordinates, with one row per node
+        XYZ = empty((len(self.Nodes), 3))
+        XYZ[self.__NodeIDs] = self.__NodeArrays.XYZ[:len(self.Nodes)]
 
-        # Step through each node and sum its forces
-        for node in self.Nodes:
+        # Sum the forces, and the moments about the global origin
+        def resultant(F):
+            moments = cross(XYZ, F[:, 0:3])
+            return concatenate([F[:, 0:3].sum(axis=0), (F[:, 3:6] + moments).sum(axis=0)]), \
+                   concatenate([abs(F[:, 0:3]).sum(axis=0), (abs(F[:, 3:6]) + abs(moments)).sum(axis=0)])
 
-            # Get the node's coordinates
-            X = node.X
-            Y = node.Y
-            Z = node.Z
-
-            # Get the nodal forces
-            FX = P[node.ID*6+0][0] - FER[node.ID*6+0][0]
-            FY = P[node.ID*6+1][0] - FER[node.ID*6+1][0]
-            FZ = P[node.ID*6+2][0] - FER[node.ID*6+2][0]
-            MX = P[node.ID*6+3][0] - FER[node.ID*6+3][0]
-            MY = P[node.ID*6+4][0] - FER[node.ID*6+4][0]
-            MZ = P[node.ID*6+5][0] - FER[node.ID*6+5][0]
-
-            # Get the nodal reactions
-            RFX = node.RxnFX
-            RFY = node.RxnFY
-            RFZ = node.RxnFZ
-            RMX = node.RxnMX
-            RMY = node.RxnMY
-            RMZ = node.RxnMZ
-
-            # Sum the global forces
-            SumFX += FX
-            SumFY += FY
-            SumFZ += FZ
-            SumMX += MX - FY*Z + FZ*Y
-            SumMY += MY + FX*Z - FZ*X
-            SumMZ += MZ - FX*Y + FY*X
-
-            # Sum the global reactions
-            SumRFX += RFX
-            SumRFY += RFY
-            SumRFZ += RFZ
-            SumRMX += RMX - RFY*Z + RFZ*Y
-            SumRMY += RMY + RFX*Z - RFZ*X
-            SumRMZ += RMZ - RFX*Y + RFY*X   
-        
-        # Print the load summation
-        print('**Applied Loads**')
-        print('Sum Forces X: ', SumFX, ', Sum Forces Y: ', SumFY, ', Sum Forces Z: ', SumFZ)
-        print('Sum Moments MX: ', SumMX, ', Sum Moments MY: ', SumMY, ', Sum Moments MZ: ', SumMZ)
+        loads, load_scale = resultant(F)
+        reactions, reaction_scale = resultant(R)
+
+        return StaticsCheck(self.__Statics['combo'], loads, reactions, load_scale + reaction_scale, tol)
+
+#%%
+# The model and the P-Delta analysis state of a worker process. See `FEModel3D.Analyze_PDelta`.
+_PDeltaWorker = None
 
-        # Print the reaction summation
-        print('**Reactions**')
-        print('Sum Forces X: ', SumRFX, ', Sum Forces Y: ', SumRFY, ', Sum Forces Z: ', SumRFZ)
-        print('Sum Moments MX: ', SumRMX, ', Sum Moments MY: ', SumRMY, ', Sum Moments MZ: ', SumRMZ)
+def _StartPDeltaWorker(model, state):
+    '''
+    Stores the model and the P-Delta analysis state sent to a worker process when it starts, so
+    they don't have to be sent with every load combination.
+    '''
+
+    global _PDeltaWorker
+    _PDeltaWorker = (model, state)
+
+def _RunPDeltaWorker(combo):
+    '''
+    Analyzes a load combination in a worker process and returns its global displacement vector
+    and its convergence history.
+    '''
 
-        return SumFX, SumFY, SumFZ, SumMX, SumMY, SumMZ
+    model, state = _PDeltaWorker
+    return model._FEModel3D__PDeltaCombo(combo, state)
@@ -0,0 +1,53 @@
+# %%
+class LoadCombo():
+    '''
+    A class representing a load combination: a set of load cases and the factors they are multiplied by.
+    '''
+
+#%%
+    def __init__(self, Name, factors={}):
+        '''
+        Initializes a new load combination.
+
+        Parameters
+        ----------
+        Name : string
+            A unique user-defined name for the load combination.
+        factors : dictionary
+            A dictionary of load case names (keys) and the factors applied to them (values).
+            e.g. {'D': 1.2, 'L': 1.6}
+        '''
+
+        self.Name = Name              # A unique user-defined name for the load combination
+        self.factors = dict(factors)  # A dictionary of load case names and their load factors
+
+#%%
+    def AddLoadCase(self, case_name, factor):
+        '''
+        Adds a load case to the load combination, or changes its factor if it has already been added.
+
+        Parameters
+        ----------
+        case_name : string
+            The name of the load case.
+        factor : number
+            The factor applied to the load case.
+        '''
+
+        # Add the load case and its factor to the dictionary
+        self.factors[case_name] = factor
+
+#%%
+    def Factor(self, case_name):
+        '''
+        Returns the factor applied to a load case. Load cases that aren't part of the load
+        combination have a factor of zero.
+
+        Parameters
+        ----------
+        case_name : string
+            The name of the load case.
+        '''
+
+        # Look up the factor, returning zero for load cases that aren't in the combination
+        return self.factors.get(case_name, 0)
@@ -1,10 +1,16 @@
 # %%
-from numpy import zeros, matrix, transpose, add, subtract, matmul, insert, cross, divide
-from numpy.linalg import inv
+from numpy import zeros, matrix, add, matmul, array, asarray, eye, nan, concatenate, unique, floor, log10, where, around
+from numpy.linalg import solve
+from functools import lru_cache
 from math import isclose
 from PyNite.BeamSegZ import BeamSegZ
 from PyNite.BeamSegY import BeamSegY
 import PyNite.FixedEndReactions
+from PyNite.Node3D import Coordinates
+from PyNite.Transformation import MemberDirCos, TransformK, ToLocal, ToGlobal, BlockDiagonal, Norm
+
+# The end releases of a member without any. Members share this tuple rather than each storing a list.
+NoReleases = (False,)*12
 
 # %%
 class Member3D():
@@ -16,12 +22,20 @@ class Member3D():
     # us to defer importing it until it's actually needed.
     __plt = None
 
+    # Members are stored without a '__dict__' to keep large models compact
+    __slots__ = ('Name', 'ID', 'iNode', 'jNode', 'E', 'G', 'Iy', 'Iz', 'J', 'A', 'auxNode', 'PtLoads', 'DistLoads',
+                 'SegmentsZ', 'SegmentsY', 'SegmentsX', 'Releases', 'SharedCache', '__Results', '__ResultsState', 'Version')
+
 #%%
     def __init__(self, Name, iNode, jNode, E, G, Iy, Iz, J, A, auxNode=None):
         '''
         Initializes a new member.
         '''
         
+        # The number of times the member's stiffness properties have been changed. The model uses
+        # it to tell when the member's cached stiffness matrix is out of date.
+        self.Version = 0
+
         self.Name = Name    # A unique name for the member given by the user
         self.ID = None      # Unique index number for the member assigned by the program
         self.iNode = iNode  # The element's i-node
@@ -33,12 +47,92 @@ class Member3D():
         self.J = J  # The polar moment of inertia or torsional constant
         self.A = A  # The cross-sectional area
         self.auxNode = auxNode # Optional auxiliary node used to define the member's local z-axis
-        self.PtLoads = []   # A list of point loads & moments applied to the element (Direction, P, x) or (Direction, M, x)
-        self.DistLoads = [] # A list of linear distributed loads applied to the element (Direction, w1, w2, x1, x2)
+        self.PtLoads = []   # A list of point loads & moments applied to the element (Direction, P, x, case) or (Direction, M, x, case)
+        self.DistLoads = [] # A list of linear distributed loads applied to the element (Direction, w1, w2, x1, x2, case)
         self.SegmentsZ = [] # A list of mathematically continuous beam segments for z-bending
         self.SegmentsY = [] # A list of mathematically continuous beam segments for y-bending
         self.SegmentsX = [] # A list of mathematically continuous beam segments for torsion
-        self.Releases = [False, False, False, False, False, False, False, False, False, False, False, False]
+        self.Releases = NoReleases # Unreleased until 'Releases' is replaced with a new list of end releases
+        self.SharedCache = None # A dictionary of stiffness matrices shared with other members of the same model
+        self.__Results = {}     # Cached results for the member (length, transformation and stiffness matrices)
+        self.__ResultsState = None # The state of the member and its nodes the cached results were calculated for
+
+#%%
+    def __setattr__(self, name, value):
+        '''
+        Sets an attribute of the member, keeping track of changes to the member's stiffness.
+        '''
+
+        # Any change to the member's nodes, section properties or end releases changes its stiffness
+        if name in ('iNode', 'jNode', 'E', 'G', 'Iy', 'Iz', 'J', 'A', 'auxNode', 'Releases'):
+            object.__setattr__(self, 'Version', self.Version + 1)
+
+        object.__setattr__(self, name, value)
+
+#%%
+    def __setstate__(self, state):
+        '''
+        Restores the attributes of an unpickled member without counting them as changes.
+        '''
+
+        for attributes in state:
+            for name, value in (attributes or {}).items():
+                object.__setattr__(self, name, value)
+
+#%%
+    def __Memo(self, name, calculate, shared=False):
+        '''
+        Returns a cached result for the member, calculating it first if it hasn't been calculated
+        since the member or one of its nodes was last changed.
+
+        Parameters
+        ----------
+        name : string
+            The name of the result.
+        calculate : function
+            The function that calculates the result.
+        shared : boolean
+            If True, the result is also shared through 'SharedCache' with any other member of the
+            model that has the same stiffness key (see `StiffnessKey`). Shared results are made
+            read-only, so changing the result of one member can't change the others.
+        '''
+
+        # Discard the cached results if the member or its nodes have changed since they were calculated
+        state = (self.Version, self.iNode.Version, self.jNode.Version, None if self.auxNode is None else self.auxNode.Version)
+        if state != self.__ResultsState:
+            self.__Results = {}
+            self.__ResultsState = state
+
+        if name not in self.__Results:
+
+            # Look for the result among the members with the same stiffness
+            if shared == True and self.SharedCache is not None:
+                key = (name,) + self.StiffnessKey()
+                if key not in self.SharedCache:
+                    result = calculate()
+                    result.setflags(write=False)
+                    self.SharedCache[key] = result
+                self.__Results[name] = self.SharedCache[key]
+            else:
+                self.__Results[name] = calculate()
+
+        return self.__Results[name]
+
+#%%
+    def StiffnessKey(self):
+        '''
+        Returns a key identifying the member's stiffness. Members with the same properties, length,
+        end releases and direction cosines have the same key, and have the same local and global
+        stiffness matrices. Lengths and direction cosines are rounded to 12 significant figures so
+        that round off in the nodal coordinates of repeated bays doesn't change the key.
+        '''
+
+        def key():
+            dirCos = self.DirCos().ravel()
+            return (self.E, self.G, self.Iy, self.Iz, self.J, self.A, tuple(self.Releases)) \
+                   + tuple(float('%.12g' % value) for value in [self.L()] + list(dirCos))
+
+        return self.__Memo('StiffnessKey', key)
 
 #%%
     def L(self):
@@ -46,6 +140,14 @@ class Member3D():
         Returns the length of the member.
         '''
 
+        return self.__Memo('L', self.__L)
+
+#%%
+    def __L(self):
+        '''
+        Calculates the length of the member.
+        '''
+
         # Get the i-node and the j-node for the member
         iNode = self.iNode
         jNode = self.jNode
@@ -60,21 +162,59 @@ class Member3D():
 
         Returns
         -------
-        R1_indices : list
-            A list of the indices for the unreleased DOFs
-        R2_indices : list
-            A list of the indices for the released DOFs
+        R1_indices : array
+            An array of the indices for the unreleased DOFs
+        R2_indices : array
+            An array of the indices for the released DOFs
         '''
 
-        R1_indices = []
-        R2_indices = []
-        for i in range(12):
-            if self.Releases[i] == False:
-                R1_indices.append(i)
-            else:
-                R2_indices.append(i)
-        
-        return R1_indices, R2_indices
+        # The indices are calculated once for each pattern of end releases
+        return ReleaseIndices(tuple(self.Releases))
+
+#%%
+    def __Condense(self, m, k=None):
+        '''
+        Statically condenses the released degrees of freedom out of a local matrix or vector,
+        and expands the result back to 12 rows with zeros at the released degrees of freedom.
+
+        The released terms are eliminated by solving against the released partition (k22) of
+        the matrix rather than inverting it. A single released degree of freedom (e.g. a pin at
+        one end about one axis) is eliminated in closed form.
+
+        Parameters
+        ----------
+        m : matrix
+            The uncondensed 12x12 matrix or 12 row vector to be condensed.
+        k : matrix
+            The uncondensed 12x12 matrix used to condense a vector. Fixed end reaction vectors
+            are condensed using the stiffness matrix. If None, 'm' is used.
+        '''
+
+        R1, R2 = self.AuxList()
+        m = asarray(m)
+        k = m if k is None else asarray(k)
+
+        # Without end releases there is nothing to condense
+        if len(R2) == 0:
+            return matrix(m.copy())
+
+        # Solve for k22⁻¹*m2
+        k22 = k[R2[:, None], R2]
+        m2 = m[R2, :]
+        if len(R2) == 1:
+            X = m2/k22[0, 0]
+        else:
+            X = solve(k22, m2)
+
+        # Write the condensed terms into a preallocated array, leaving the released rows and
+        # columns as zeros
+        condensed = zeros(m.shape)
+        if m.shape[1] == 1:
+            condensed[R1, :] = m[R1, :] - k[R1[:, None], R2] @ X
+        else:
+            condensed[R1[:, None], R1] = m[R1[:, None], R1] - k[R1[:, None], R2] @ X[:, R1]
+
+        return matrix(condensed)
 
 #%%
     def k(self):
@@ -82,25 +222,16 @@ class Member3D():
         Returns the condensed (and expanded) local stiffness matrix for the member.
         '''
 
-        # Partition the local stiffness matrix as 4 submatrices in
-        # preparation for static condensation
-        k11, k12, k21, k22 = self.__Partition(self.__k_Unc())
-               
-        # Calculate the condensed local stiffness matrix
-        k_Condensed = subtract(k11, matmul(matmul(k12, inv(k22)), k21))
-        
-        # Expand the condensed local stiffness matrix
-        i=0
-        for DOF in self.Releases:
-            
-            if DOF == True:
-                k_Condensed = insert(k_Condensed, i, 0, axis = 0)
-                k_Condensed = insert(k_Condensed, i, 0, axis = 1)
-                
-            i += 1
+        return self.__Memo('k', self.__k, shared=True)
+
+#%%
+    def __k(self):
+        '''
+        Calculates the condensed (and expanded) local stiffness matrix for the member.
+        '''
 
-        # Return the local stiffness matrix, with end releases applied
-        return k_Condensed
+        # Condense the end releases out of the uncondensed local stiffness matrix, and return it
+        return self.__Condense(self.__k_Unc())
 
 #%%
     def __k_Unc(self):
@@ -108,31 +239,9 @@ class Member3D():
         Returns the uncondensed local stiffness matrix for the member.
         '''
 
-        # Get the properties needed to form the local stiffness matrix
-        E = self.E
-        G = self.G
-        Iy = self.Iy
-        Iz = self.Iz
-        J = self.J
-        A = self.A
-        L = self.L()
-        
-        # Create the uncondensed local stiffness matrix
-        k = matrix([[A*E/L,  0,             0,             0,      0,            0,            -A*E/L, 0,             0,             0,      0,            0],
-                    [0,      12*E*Iz/L**3,  0,             0,      0,            6*E*Iz/L**2,  0,      -12*E*Iz/L**3, 0,             0,      0,            6*E*Iz/L**2],
-                    [0,      0,             12*E*Iy/L**3,  0,      -6*E*Iy/L**2, 0,            0,      0,             -12*E*Iy/L**3, 0,      -6*E*Iy/L**2, 0],
-                    [0,      0,             0,             G*J/L,  0,            0,            0,      0,             0,             -G*J/L, 0,            0],
-                    [0,      0,             -6*E*Iy/L**2,  0,      4*E*Iy/L,     0,            0,      0,             6*E*Iy/L**2,   0,      2*E*Iy/L,     0],
-                    [0,      6*E*Iz/L**2,   0,             0,      0,            4*E*Iz/L,     0,      -6*E*Iz/L**2,  0,             0,      0,            2*E*Iz/L],
-                    [-A*E/L, 0,             0,             0,      0,            0,            A*E/L,  0,             0,             0,      0,            0],
-                    [0,      -12*E*Iz/L**3, 0,             0,      0,            -6*E*Iz/L**2, 0,      12*E*Iz/L**3,  0,             0,      0,            -6*E*Iz/L**2],
-                    [0,      0,             -12*E*Iy/L**3, 0,      6*E*Iy/L**2,  0,            0,      0,             12*E*Iy/L**3,  0,      6*E*Iy/L**2,  0],
-                    [0,      0,             0,             -G*J/L, 0,            0,            0,      0,             0,             G*J/L,  0,            0],
-                    [0,      0,             -6*E*Iy/L**2,  0,      2*E*Iy/L,     0,            0,      0,             6*E*Iy/L**2,   0,      4*E*Iy/L,     0],
-                    [0,      6*E*Iz/L**2,   0,             0,      0,            2*E*Iz/L,     0,      -6*E*Iz/L**2,  0,             0,      0,            4*E*Iz/L]])
-        
-        # Return the uncondensed local stiffness matrix
-        return k
+        # Create the uncondensed local stiffness matrix. It's needed for the fixed end reactions
+        # as well as the stiffness matrix, so it's cached.
+        return self.__Memo('k_Unc', lambda: matrix(k_Unc(self.E, self.G, self.Iy, self.Iz, self.J, self.A, self.L())[0]), shared=True)
 
 #%%
     def kg(self, P=0):
@@ -145,87 +254,42 @@ class Member3D():
             The axial force acting on the member (compression = +, tension = -)
         '''
 
-        # Get the properties needed to form the local geometric stiffness matrix
-        Ip = self.Iy + self.Iz
-        A = self.A
-        L = self.L()
-        
         # Create the uncondensed local geometric stiffness matrix
-        kg = matrix([[0, 0,    0,     0,     0,         0,         0, 0,     0,    0,     0,         0],
-                     [0, 6/5,  0,     0,     0,         L/10,      0, -6/5,  0,    0,     0,         L/10],
-                     [0, 0,    6/5,   0,     -L/10,     0,         0, 0,     -6/5, 0,     -L/10,     0],
-                     [0, 0,    0,     Ip/A,  0,         0,         0, 0,     0,    -Ip/A, 0,         0],
-                     [0, 0,    -L/10, 0,     2*L**2/15, 0,         0, 0,     L/10, 0,     -L**2/30,  0],
-                     [0, L/10, 0,     0,     0,         2*L**2/15, 0, -L/10, 0,    0,     0,         -L**2/30],
-                     [0, 0,    0,     0,     0,         0,         0, 0,     0,    0,     0,         0],
-                     [0, -6/5, 0,     0,     0,         -L/10,     0, 6/5,   0,    0,     0,         -L/10],
-                     [0, 0,    -6/5,  0,     L/10,      0,         0, 0,     6/5,  0,     L/10,      0],
-                     [0, 0,    0,     -Ip/A, 0,         0,         0, 0,     0,    Ip/A,  0,         0],
-                     [0, 0,    -L/10, 0,     -L**2/30,  0,         0, 0,     L/10, 0,     2*L**2/15, 0],
-                     [0, L/10, 0,     0,     0,         -L**2/30,  0, -L/10, 0,    0,     0,         2*L**2/15]])
-        
-        kg = kg*P/L
-
-        # Partition the geometric stiffness matrix as 4 submatrices in
-        # preparation for static condensation
-        kg11, kg12, kg21, kg22 = self.__Partition(kg)
-               
-        # Calculate the condensed local geometric stiffness matrix
-        kg_Condensed = subtract(kg11, matmul(matmul(kg12, inv(kg22)), kg21))
-        
-        # Expand the condensed local geometric stiffness matrix
-        i=0
-        for DOF in self.Releases:
-            
-            if DOF == True:
-                kg_Condensed = insert(kg_Condensed, i, 0, axis = 0)
-                kg_Condensed = insert(kg_Condensed, i, 0, axis = 1)
-                
-            i += 1
+        kg = matrix(kg_Unc(P, self.Iy, self.Iz, self.A, self.L())[0])
 
-        # Return the local geomtric stiffness matrix, with end releases applied
-        return kg_Condensed
+        # Condense the end releases out of the local geometric stiffness matrix, and return it
+        return self.__Condense(kg)
     
 #%%
-    def fer(self):
+    def fer(self, combo=None):
         '''
         Returns the condensed (and expanded) local fixed end reaction vector for the member.
-        '''
-        
-        # Get the lists of unreleased and released degree of freedom indices
-        R1_indices, R2_indices = self.AuxList()
 
-        # Partition the local stiffness matrix and local fixed end reaction vector
-        k11, k12, k21, k22 = self.__Partition(self.__k_Unc())
-        fer1, fer2 = self.__Partition(self.__fer_Unc())
-        
-        # Calculate the condensed fixed end reaction vector
-        ferCondensed = subtract(fer1, matmul(matmul(k12, inv(k22)), fer2))
-        
-        # Expand the condensed fixed end reaction vector
-        i=0
-        for DOF in self.Releases:
-            
-            if DOF == True:
-                ferCondensed = insert(ferCondensed, i, 0, axis = 0)
-                
-            i += 1
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination to apply to the member's loads. If None, every load is used unfactored.
+        '''
         
-        # Return the fixed end reaction vector        
-        return ferCondensed
+        # Condense the end releases out of the fixed end reaction vector using the uncondensed
+        # local stiffness matrix, and return it
+        return self.__Condense(self.__fer_Unc(combo), self.__k_Unc())
     
 #%%
-    def __fer_Unc(self):
+    def __fer_Unc(self, combo=None):
         '''
         Returns the member's local fixed end reaction vector, ignoring the effects of end releases.
         Needed to apply the slope-deflection equation properly.
         '''
         
+        # Get the member's loads, factored for the load combination
+        PtLoads, DistLoads = self.__FactoredLoads(combo)
+
         # Initialize the fixed end reaction vector
         fer = zeros((12,1))
         
         # Sum the fixed end reactions for the point loads & moments
-        for ptLoad in self.PtLoads:
+        for ptLoad in PtLoads:
 
             if ptLoad[0] == 'Fx':
                 fer = add(fer, PyNite.FixedEndReactions.FER_AxialPtLoad(ptLoad[1], ptLoad[2], self.L()))
@@ -241,7 +305,7 @@ class Member3D():
                 fer = add(fer, PyNite.FixedEndReactions.FER_Moment(ptLoad[1], ptLoad[2], self.L(), 'Mz'))
                 
         # Sum the fixed end reactions for the distributed loads
-        for distLoad in self.DistLoads:
+        for distLoad in DistLoads:
 
             if distLoad[0] == 'Fx':
                 fer = add(fer, PyNite.FixedEndReactions.FER_AxialLinLoad(distLoad[1], distLoad[2], distLoad[3], distLoad[4], self.L()))
@@ -252,34 +316,43 @@ class Member3D():
         return fer
 
 #%%
-    def __Partition(self, unp_matrix):
+    def __FactoredLoads(self, combo=None):
         '''
-        Partitions a matrix into sub-matrices based on unreleased and released degree of freedom indices.
+        Returns the member's point loads and distributed loads, multiplied by the factors a load
+        combination applies to their load cases. Loads in load cases that aren't part of the load
+        combination are left out.
+
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination. If None, the member's loads are returned unfactored.
         '''
 
-        # Create auxiliary lists of released/unreleased DOFs
-        R1_indices, R2_indices = self.AuxList()
+        # Without a load combination every load is used as is
+        if combo is None:
+            return self.PtLoads, self.DistLoads
 
-        # Partition the matrix by slicing
-        if unp_matrix.shape[1] == 1:
-            m1 = unp_matrix[R1_indices, :]
-            m2 = unp_matrix[R2_indices, :]
-            return m1, m2
-        else:
-            m11 = unp_matrix[R1_indices, :][:, R1_indices]
-            m12 = unp_matrix[R1_indices, :][:, R2_indices]
-            m21 = unp_matrix[R2_indices, :][:, R1_indices]
-            m22 = unp_matrix[R2_indices, :][:, R2_indices]
-            return  m11, m12, m21, m22
+        # Factor the point loads (Direction, P, x, case)
+        PtLoads = [(Direction, combo.Factor(case)*P, x, case) for Direction, P, x, case in self.PtLoads if combo.Factor(case) != 0]
+
+        # Factor the distributed loads (Direction, w1, w2, x1, x2, case)
+        DistLoads = [(Direction, combo.Factor(case)*w1, combo.Factor(case)*w2, x1, x2, case) for Direction, w1, w2, x1, x2, case in self.DistLoads if combo.Factor(case) != 0]
+
+        return PtLoads, DistLoads
 
 #%%   
-    def f(self):
+    def f(self, combo=None):
         '''
         Returns the member's local end force vector.
+
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination to apply to the member's loads. If None, every load is used unfactored.
         '''
         
         # Calculate and return the member's local end force vector
-        return add(matmul(self.k(), self.d()), self.fer())
+        return add(matmul(self.k(), self.d()), self.fer(combo))
 
 #%%
     def d(self):
@@ -288,7 +361,7 @@ class Member3D():
        '''
 
        # Calculate and return the local displacement vector
-       return matmul(self.T(), self.D())
+       return ToLocal(self.DirCos(), self.D())
         
 #%%  
     # Transformation matrix
@@ -297,127 +370,59 @@ class Member3D():
         Returns the transformation matrix for the member.
         '''
 
-        x1 = self.iNode.X
-        x2 = self.jNode.X
-        y1 = self.iNode.Y
-        y2 = self.jNode.Y
-        z1 = self.iNode.Z
-        z2 = self.jNode.Z
-        L = self.L()
-        
-        # Calculate the direction cosines for the local x-axis
-        x = [(x2-x1)/L, (y2-y1)/L, (z2-z1)/L]
-        
-        # Calculate the direction cosines for the local z-axis based on the auxiliary node
-        if self.auxNode != None:
-            
-            xa = self.auxNode.X
-            ya = self.auxNode.Y
-            za = self.auxNode.Z
-            
-            # Define a vector in the local xz plane using the auxiliary point 
-            z = [xa-x1, ya-y1, za-z1]
-            
-            # Find the direction cosines for the local y-axis
-            y = cross(z, x)
-            y = divide(y, (y[0]**2 + y[1]**2 + y[2]**2)**0.5)
-            
-            # Ensure the z-axis is perpendicular to the x-axis.
-            # If the vector from the i-node to the auxiliary node is not perpendicular to the member, this will ensure the local coordinate system is orthogonal
-            z = cross(x, y)
-            
-            # Turn the z-vector into a unit vector of direction cosines
-            z = divide(z, (z[0]**2 + z[1]**2 + z[2]**2)**0.5)
-        
-        # If no auxiliary node is specified the program will determine the member's local z-axis automatically
-        else:
-            
-            # Calculate the remaining direction cosines. The local z-axis will be kept parallel to the global XZ plane in all cases
-            # Vertical members
-            if isclose(x1, x2) and isclose(z1, z2):
-                
-                # For vertical members, keep the local y-axis in the XY plane to make 2D problems easier to solve in the XY plane
-                if y2 > y1:
-                    y = [-1, 0, 0]
-                    z = [0, 0, 1]
-                else:
-                    y = [1, 0, 0]
-                    z = [0, 0, 1]
-
-            # Horizontal members
-            elif isclose(y1, y2):
-            
-                # Find a vector in the direction of the local z-axis by taking the cross-product
-                # of the local x-axis and the local y-axis. This vector will be perpendicular to
-                # both the local x-axis and the local y-axis.
-                y = [0, 1, 0]
-                z = cross(x, y)
+        return self.__Memo('T', self.__T)
 
-                # Divide the z-vector by its magnitude to produce a unit vector of direction cosines
-                z = divide(z, (z[0]**2 + z[1]**2 + z[2]**2)**0.5)
+#%%
+    def __T(self):
+        '''
+        Calculates the transformation matrix for the member.
+        '''
 
-            # Members neither vertical or horizontal
-            else:
+        # The direction cosines are repeated along the diagonal for each 3 degrees of freedom
+        return BlockDiagonal(self.DirCos(), 12)
 
-                # Find the projection of x on the global XZ plane
-                proj = [x2-x1, 0, z2-z1]
-
-                # Find a vector in the direction of the local z-axis by taking the cross-product
-                # of the local x-axis and its projection on a plane parallel to the XZ plane. This
-                # produces a vector perpendicular to both the local x-axis and its projection. This
-                # vector will always be horizontal since it's parallel to the XZ plane. The order
-                # in which the vectors are 'crossed' has been selected to ensure the y-axis always
-                # has an upward component (i.e. the top of the beam is always on top).
-                if y2 > y1:
-                    z = cross(proj, x)
-                else:
-                    z = cross(x, proj)
-
-                # Divide the z-vector by its magnitude to produce a unit vector of direction cosines
-                z = divide(z, (z[0]**2 + z[1]**2 + z[2]**2)**0.5)
-                
-                # Find the direction cosines for the local y-axis
-                y = cross(z, x)
-                y = divide(y, (y[0]**2 + y[1]**2 + y[2]**2)**0.5)
-
-        # Create the direction cosines matrix
-        dirCos = matrix([x, y, z])
-      
-        # Build the transformation matrix
-        transMatrix = zeros((12, 12))
-        transMatrix[0:3, 0:3] = dirCos
-        transMatrix[3:6, 3:6] = dirCos
-        transMatrix[6:9, 6:9] = dirCos
-        transMatrix[9:12, 9:12] = dirCos
-        
-        return transMatrix
+#%%
+    def DirCos(self):
+        '''
+        Returns the member's 3x3 matrix of direction cosines. The rows are the member's local x, y
+        and z-axes. See `Transformation.MemberDirCos`.
+        '''
+
+        def dirCos():
+            iNode, jNode, auxNode = self.iNode, self.jNode, self.auxNode
+            aux = None if auxNode is None else [auxNode.X, auxNode.Y, auxNode.Z]
+            return MemberDirCos([iNode.X, iNode.Y, iNode.Z], [jNode.X, jNode.Y, jNode.Z], aux)[0]
+
+        return self.__Memo('DirCos', dirCos)
 
 #%%
     # Member global stiffness matrix
     def K(self):
-        
-        # Calculate and return the stiffness matrix in global coordinates
-        return matmul(matmul(transpose(self.T()), self.k()), self.T())
+
+        # Calculate and return the stiffness matrix in global coordinates. Members with the same
+        # stiffness key share the same global stiffness matrix.
+        return self.__Memo('K', lambda: matrix(TransformK(self.DirCos(), self.k())), shared=True)
 
 #%%
     # Member global geometric stiffness matrix
     def Kg(self, P=0):
         
         # Calculate and return the geometric stiffness matrix in global coordinates
-        return matmul(matmul(transpose(self.T()), self.kg(P)), self.T())
+        return matrix(TransformK(self.DirCos(), self.kg(P)))
 
 #%%
-    def F(self):
+    def F(self, combo=None):
         
-        # Calculate and return the global force vector
-        return matmul(inv(self.T()), self.f())
+        # Calculate and return the global force vector. The transformation matrix is orthogonal,
+        # so its inverse is its transpose.
+        return matrix(ToGlobal(self.DirCos(), self.f(combo)))
     
 #%% 
     # Global fixed end reaction vector
-    def FER(self):
+    def FER(self, combo=None):
         
         # Calculate and return the fixed end reaction vector
-        return matmul(inv(self.T()), self.fer())
+        return matrix(ToGlobal(self.DirCos(), self.fer(combo)))
 
 #%%
     def D(self):
@@ -1121,8 +1126,12 @@ class Member3D():
         
 #%%    
     # Divides the element up into mathematically continuous segments along each axis
-    def SegmentMember(self):
+    # 'combo' is the load combination to apply to the member's loads (None for unfactored loads)
+    def SegmentMember(self, combo=None):
         
+        # Get the member's loads, factored for the load combination
+        PtLoads, DistLoads = self.__FactoredLoads(combo)
+
         # Get the member's length and stiffness properties
         L = self.L()
         E = self.E
@@ -1136,10 +1145,10 @@ class Member3D():
         # Create a list of discontinuity locations
         disconts = [0, L] # Member ends
         
-        for load in self.PtLoads: 
+        for load in PtLoads: 
             disconts.append(load[2]) # Point load locations
         
-        for load in self.DistLoads: 
+        for load in DistLoads: 
             disconts.append(load[3]) # Distributed load start locations
             disconts.append(load[4]) # Distributed load end locations
         
@@ -1178,8 +1187,8 @@ class Member3D():
             SegmentsX.append(newSeg)      # Add the segment to the list
         
         # Get the member local end forces, local fixed end reactions, and local displacements
-        f = self.f()     # Member local end force vector
-        fer = self.__fer_Unc() # Member local fixed end reaction vector
+        f = self.f(combo)     # Member local end force vector
+        fer = self.__fer_Unc(combo) # Member local fixed end reaction vector
         d = self.d()     # Member local displacement vector
         
         # Get the local deflections and calculate the slope at the start of the member
@@ -1244,7 +1253,7 @@ class Member3D():
             SegmentsX[i].T1 = f[3, 0]
             
             # Add effects of point loads occuring prior to this segment
-            for ptLoad in self.PtLoads:
+            for ptLoad in PtLoads:
                 
                 if round(ptLoad[2],10) <= round(x,10):
                     
@@ -1264,7 +1273,7 @@ class Member3D():
                         SegmentsZ[i].M1 += ptLoad[1]
             
             # Add distributed loads to the segment
-            for distLoad in self.DistLoads:
+            for distLoad in DistLoads:
                 
                 # Get the parameters for the distributed load
                 Direction = distLoad[0]
@@ -1330,3 +1339,187 @@ class Member3D():
                         # Calculate the shear and moment at the start of the segment due to the load
                         SegmentsY[i].V1 += (w1 + w2)/2*(x2 - x1)
                         SegmentsY[i].M1 += (x1 - x2)*(2*w1*x1 - 3*w1*x + w1*x2 + w2*x1 - 3*w2*x + 2*w2*x2)/6
+
+# %%
+@lru_cache(maxsize=None)
+def ReleaseIndices(releases):
+    '''
+    Returns arrays of the unreleased (R1) and released (R2) degree of freedom indices for a
+    pattern of end releases. The arrays are cached, so each pattern is only worked out once.
+
+    Parameters
+    ----------
+    releases : tuple
+        12 booleans, True where the degree of freedom is released.
+    '''
+
+    R1 = array([i for i in range(12) if releases[i] == False], dtype=int)
+    R2 = array([i for i in range(12) if releases[i] == True], dtype=int)
+    return R1, R2
+
+#%%
+def k_Unc(E, G, Iy, Iz, J, A, L):
+    '''
+    Returns the uncondensed local stiffness matrices for any number of members, stacked into an
+    (n_members, 12, 12) array. Each argument is an array with one value per member.
+    '''
+
+    E, G, Iy, Iz, J, A, L = [asarray(value, dtype=float).reshape(-1) for value in (E, G, Iy, Iz, J, A, L)]
+    k = zeros((len(L), 12, 12))
+
+    # Axial and torsional terms
+    k[:, 0, 0] = k[:, 6, 6] = A*E/L
+    k[:, 0, 6] = -A*E/L
+    k[:, 3, 3] = k[:, 9, 9] = G*J/L
+    k[:, 3, 9] = -G*J/L
+
+    # Bending about the local z-axis
+    k[:, 1, 1] = k[:, 7, 7] = 12*E*Iz/L**3
+    k[:, 1, 7] = -12*E*Iz/L**3
+    k[:, 1, 5] = k[:, 1, 11] = 6*E*Iz/L**2
+    k[:, 5, 7] = k[:, 7, 11] = -6*E*Iz/L**2
+    k[:, 5, 5] = k[:, 11, 11] = 4*E*Iz/L
+    k[:, 5, 11] = 2*E*Iz/L
+
+    # Bending about the local y-axis
+    k[:, 2, 2] = k[:, 8, 8] = 12*E*Iy/L**3
+    k[:, 2, 8] = -12*E*Iy/L**3
+    k[:, 2, 4] = k[:, 2, 10] = -6*E*Iy/L**2
+    k[:, 4, 8] = k[:, 8, 10] = 6*E*Iy/L**2
+    k[:, 4, 4] = k[:, 10, 10] = 4*E*Iy/L
+    k[:, 4, 10] = 2*E*Iy/L
+
+    # Only the upper triangle has been filled in. Mirror it to the lower triangle.
+    return k + k.transpose(0, 2, 1)*(1 - eye(12))
+
+#%%
+def kg_Unc(P, Iy, Iz, A, L):
+    '''
+    Returns the uncondensed local geometric stiffness matrices for any number of members, stacked
+    into an (n_members, 12, 12) array. Each argument is an array with one value per member.
+
+    Parameters
+    ----------
+    P : array
+        The axial force acting on each member (compression = +, tension = -)
+    '''
+
+    P, Iy, Iz, A, L = [asarray(value, dtype=float).reshape(-1) for value in (P, Iy, Iz, A, L)]
+    Ip = Iy + Iz
+    kg = zeros((len(L), 12, 12))
+
+    # Torsional terms
+    kg[:, 3, 3] = kg[:, 9, 9] = Ip/A
+    kg[:, 3, 9] = -Ip/A
+
+    # Bending about the local z-axis
+    kg[:, 1, 1] = kg[:, 7, 7] = 6/5
+    kg[:, 1, 7] = -6/5
+    kg[:, 1, 5] = kg[:, 1, 11] = L/10
+    kg[:, 5, 7] = kg[:, 7, 11] = -L/10
+    kg[:, 5, 5] = kg[:, 11, 11] = 2*L**2/15
+    kg[:, 5, 11] = -L**2/30
+
+    # Bending about the local y-axis
+    kg[:, 2, 2] = kg[:, 8, 8] = 6/5
+    kg[:, 2, 8] = -6/5
+    kg[:, 2, 4] = kg[:, 2, 10] = -L/10
+    kg[:, 4, 8] = kg[:, 8, 10] = L/10
+    kg[:, 4, 4] = kg[:, 10, 10] = 2*L**2/15
+    kg[:, 4, 10] = -L**2/30
+
+    # Mirror the upper triangle to the lower triangle and scale by P/L
+    kg = kg + kg.transpose(0, 2, 1)*(1 - eye(12))
+    return kg*(P/L)[:, None, None]
+
+#%%
+def BatchK(members):
+    '''
+    Returns the global stiffness matrices for a list of members, stacked into an
+    (n_members, 12, 12) array. The local stiffness matrices of members without end releases
+    are calculated together using `k_Unc`.
+
+    Members with the same properties, end releases, length and direction cosines have the same
+    stiffness matrix (see `Member3D.StiffnessKey`). The matrix is only calculated once for each
+    group of such members, which saves most of the work in models with many repeated bays.
+    '''
+
+    # Get the lengths and direction cosines of all the members at once
+    L, dirCos = BatchGeometry(members)
+
+    # Form each member's stiffness key as a row of numbers, and find the unique keys. Lengths and
+    # direction cosines are rounded as in `StiffnessKey`.
+    properties = array([[getattr(member, name) for name in ('E', 'G', 'Iy', 'Iz', 'J', 'A')] for member in members], dtype=float).reshape(-1, 6)
+    releases = array([member.Releases for member in members], dtype=float).reshape(-1, 12)
+    keys = concatenate([properties, releases, Significant(L)[:, None], Significant(dirCos.reshape(-1, 9))], axis=1)
+    keys, first, inverse = unique(keys, axis=0, return_index=True, return_inverse=True)
+
+    # Calculate the local stiffness matrices of one member with each key, all at once
+    k = k_Unc(*properties[first].T, L[first])
+
+    # Members with end releases need to be condensed
+    for j, i in enumerate(first):
+        if True in members[i].Releases:
+            k[j] = members[i].k()
+
+    # Transform the local stiffness matrices to global coordinates, and give each member the
+    # matrix for its key
+    return TransformK(dirCos[first], k)[inverse.reshape(-1)]
+
+#%%
+def BatchKg(members, P, geometry=None):
+    '''
+    Returns the global geometric stiffness matrices for a list of members, stacked into an
+    (n_members, 12, 12) array.
+
+    Parameters
+    ----------
+    members : list
+        The members.
+    P : array
+        The axial force acting on each member (compression = +, tension = -)
+    geometry : tuple
+        The lengths and direction cosines of the members, as returned by `BatchGeometry`. If
+        None, they are calculated.
+    '''
+
+    # Get the lengths and direction cosines of all the members at once
+    if geometry is None:
+        geometry = BatchGeometry(members)
+    L, dirCos = geometry
+
+    # Calculate the local geometric stiffness matrices of all the members at once
+    kg = kg_Unc(P, *[[getattr(member, name) for member in members] for name in ('Iy', 'Iz', 'A')], L)
+
+    # Members with end releases need to be condensed
+    for i, member in enumerate(members):
+        if True in member.Releases:
+            kg[i] = member.kg(P[i])
+
+    # Transform the local geometric stiffness matrices to global coordinates
+    return TransformK(dirCos, kg)
+
+#%%
+def Significant(values, figures=12):
+    '''
+    Rounds an array of values to a number of significant figures.
+    '''
+
+    values = asarray(values, dtype=float)
+    scale = 10.0**(figures - 1 - floor(log10(where(values == 0, 1, abs(values)))))
+    return around(values*scale)/scale
+
+#%%
+def BatchGeometry(members):
+    '''
+    Returns the lengths of a list of members as an (n_members,) array and their direction
+    cosines as an (n_members, 3, 3) array, calculated for all the members at once.
+    '''
+
+    # Gather the coordinates of the nodes
+    iXYZ = Coordinates([member.iNode for member in members])
+    jXYZ = Coordinates([member.jNode for member in members])
+    auxXYZ = array([[nan, nan, nan] if member.auxNode is None else [member.auxNode.X, member.auxNode.Y, member.auxNode.Z]
+                    for member in members], dtype=float).reshape(-1, 3)
+
+    return Norm(jXYZ - iXYZ)[:, 0], MemberDirCos(iXYZ, jXYZ, auxXYZ)
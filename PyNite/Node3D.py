@@ -4,47 +4,271 @@ Created on Thu Nov  2 18:04:56 2017
 
 @author: D. Craig Brinck, SE
 """
-# %%      
+from numpy import zeros, full, nan, isnan, array
+
+# %%
+# The value each of the node arrays holds for a new node
+Fills = [('XYZ', 0), ('D', nan), ('Enforced', nan), ('Rxn', 0), ('Support', False)]
+
+# %%
+class NodeArrays():
+    """
+    Contiguous arrays holding the data of a group of nodes, one row per node. A model keeps its
+    nodes in one of these so that coordinates, displacements, supports and reactions can be read
+    and written for every node at once. Each `Node3D` is a view into its row.
+
+    Unknown displacements (not yet calculated, or free to move) are stored as NaN.
+    """
+
+    def __init__(self, capacity=0):
+        """
+        Initializes a new, empty set of node arrays.
+        """
+
+        self.Nodes = []     # The nodes, in row order
+
+        self.XYZ = zeros((capacity, 3))             # Global coordinates (X, Y, Z)
+        self.D = full((capacity, 6), nan)           # Calculated displacements (DX, DY, DZ, RX, RY, RZ)
+        self.Enforced = full((capacity, 6), nan)    # Supported or enforced displacements
+        self.Rxn = zeros((capacity, 6))             # Reactions (FX, FY, FZ, MX, MY, MZ)
+        self.Support = zeros((capacity, 6), dtype=bool) # Supported degrees of freedom, used for visualization
+
+    def __Reserve(self, size):
+        """
+        Makes room for at least 'size' rows. Room is added in proportion to the arrays' current
+        size, so adding nodes one at a time doesn't copy the arrays every time.
+        """
+
+        capacity = len(self.XYZ)
+        if size <= capacity:
+            return
+
+        capacity = max(size, 2*capacity, 16)
+        for name, fill in Fills:
+            old = getattr(self, name)
+            new = full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:len(self.Nodes)] = old[:len(self.Nodes)]
+            setattr(self, name, new)
+
+    def __Clear(self, start, stop):
+        """
+        Resets rows 'start' to 'stop' to the values of a new node, so a reused row doesn't carry
+        over the data of the node that used it before.
+        """
+
+        for name, fill in Fills:
+            getattr(self, name)[start:stop] = fill
+
+    def New(self, Names, XYZ):
+        """
+        Creates new nodes at the end of the arrays and returns them.
+
+        Parameters
+        ----------
+        Names : list
+            The names of the new nodes.
+        XYZ : array
+            The (n, 3) global coordinates of the new nodes.
+        """
+
+        start = len(self.Nodes)
+        self.__Reserve(start + len(Names))
+
+        # Rows freed by removed nodes may still hold their data
+        self.__Clear(start, start + len(Names))
+
+        # Store the coordinates
+        self.XYZ[start:start + len(Names)] = XYZ
+
+        # Create a view into each new row
+        nodes = [Node3D.View(Name, self, row) for row, Name in enumerate(Names, start)]
+        self.Nodes.extend(nodes)
+
+        return nodes
+
+    def Add(self, node):
+        """
+        Moves an existing node's data to the end of the arrays, and makes the node a view into its
+        new row.
+        """
+
+        old, old_row = node.Store, node.Row
+        row = len(self.Nodes)
+        self.__Reserve(row + 1)
+
+        for name in ('XYZ', 'D', 'Enforced', 'Rxn', 'Support'):
+            getattr(self, name)[row] = getattr(old, name)[old_row]
+
+        node.Store, node.Row = self, row
+        self.Nodes.append(node)
+
+    def Remove(self, node):
+        """
+        Removes a node from the arrays. The node keeps its data in arrays of its own, and the rows
+        after it move up to keep the arrays contiguous.
+        """
+
+        row = node.Row
+        n = len(self.Nodes)
+
+        # Give the node its own copy of its data
+        own = NodeArrays(1)
+        own.Add(node)
+
+        # Close the gap, and clear the row it leaves at the end
+        for name in ('XYZ', 'D', 'Enforced', 'Rxn', 'Support'):
+            values = getattr(self, name)
+            values[row:n - 1] = values[row + 1:n]
+        self.__Clear(n - 1, n)
+        del self.Nodes[row]
+        for other in self.Nodes[row:]:
+            other.Row -= 1
+
+# %%
+def _Coordinate(column):
+    """
+    Returns a property for one of a node's coordinates. Moving a node changes its version.
+    """
+
+    def get(self):
+        return float(self.Store.XYZ[self.Row, column])
+
+    def set(self, value):
+        self.Version = self.Version + 1
+        self.Store.XYZ[self.Row, column] = value
+
+    return property(get, set)
+
+def _Displacement(name, column):
+    """
+    Returns a property for one of a node's displacements, which is 'None' while it is unknown.
+    """
+
+    def get(self):
+        value = getattr(self.Store, name)[self.Row, column]
+        return None if isnan(value) else float(value)
+
+    def set(self, value):
+        getattr(self.Store, name)[self.Row, column] = nan if value is None else value
+
+    return property(get, set)
+
+def _Value(name, column, kind):
+    """
+    Returns a property for one of a node's reactions or support flags.
+    """
+
+    def get(self):
+        return kind(getattr(self.Store, name)[self.Row, column])
+
+    def set(self, value):
+        getattr(self.Store, name)[self.Row, column] = value
+
+    return property(get, set)
+
+# %%
 class Node3D():
     """
     A class representing a node in a 3D finite element model.
+
+    The node's coordinates, displacements, supports and reactions are stored in a row of a
+    `NodeArrays` shared with the other nodes of its model, and are read and written through the
+    attributes below.
     """
-    
+
+    # Nodes are stored without a '__dict__' to keep large models compact
+    __slots__ = ('Name', 'ID', 'NodeLoads', 'Store', 'Row', 'Version')
+
     def __init__(self, Name, X, Y, Z):
         """
         Initializes a new node.
         """
-        
+
         self.Name = Name    # A unique name for the node assigned by the user
         self.ID = None      # A unique index number for the node assigned by the program
-        
-        self.X = X          # Global X coordinate
-        self.Y = Y          # Global Y coordinate
-        self.Z = Z          # Global Z coordinate
-        
-        self.NodeLoads = []     # A list of loads applied to the node (Direction, P) or (Direction, M)
-        
-        # Initialize nodal displacements to 'None'
-        self.DX = None
-        self.DY = None
-        self.DZ = None
-        self.RX = None
-        self.RY = None
-        self.RZ = None
-        
-        # Initialize Reactions to zero
-        self.RxnFX = 0
-        self.RxnFY = 0
-        self.RxnFZ = 0
-        self.RxnMX = 0
-        self.RxnMY = 0
-        self.RxnMZ = 0
-
-        # Initialize support conditions to 'False'
-        # The values below are only used for visualization purposes
-        self.SupportDX = False
-        self.SupportDY = False
-        self.SupportDZ = False
-        self.SupportRX = False
-        self.SupportRY = False
-        self.SupportRZ = False
+
+        # The number of times the node's coordinates have been changed. Elements attached to the
+        # node use it to tell when their cached stiffness matrices are out of date.
+        self.Version = 0
+
+        self.NodeLoads = []     # A list of loads applied to the node (Direction, P, case) or (Direction, M, case)
+
+        # Until the node is added to a model, it keeps its data in arrays of its own
+        self.Store = NodeArrays(1)  # The arrays holding the node's data
+        self.Row = 0                # The node's row in the arrays
+        self.Store.Nodes.append(self)
+
+        # Global coordinates. Displacements and enforced displacements start out unknown ('None'),
+        # reactions start out at zero and support conditions start out 'False'.
+        self.Store.XYZ[0] = [X, Y, Z]
+
+    @classmethod
+    def View(cls, Name, Store, Row):
+        """
+        Returns a new node that is a view into a row of existing node arrays.
+        """
+
+        node = cls.__new__(cls)
+        node.Name = Name
+        node.ID = None
+        node.NodeLoads = []
+        node.Store = Store
+        node.Row = Row
+        node.Version = 0
+
+        return node
+
+    # Global coordinates
+    X = _Coordinate(0)
+    Y = _Coordinate(1)
+    Z = _Coordinate(2)
+
+    # Nodal displacements ('None' until they are calculated)
+    DX = _Displacement('D', 0)
+    DY = _Displacement('D', 1)
+    DZ = _Displacement('D', 2)
+    RX = _Displacement('D', 3)
+    RY = _Displacement('D', 4)
+    RZ = _Displacement('D', 5)
+
+    # Enforced displacements
+    # A displacement is known (supported or enforced) if its value is not 'None'
+    EnforcedDX = _Displacement('Enforced', 0)
+    EnforcedDY = _Displacement('Enforced', 1)
+    EnforcedDZ = _Displacement('Enforced', 2)
+    EnforcedRX = _Displacement('Enforced', 3)
+    EnforcedRY = _Displacement('Enforced', 4)
+    EnforcedRZ = _Displacement('Enforced', 5)
+
+    # Reactions
+    RxnFX = _Value('Rxn', 0, float)
+    RxnFY = _Value('Rxn', 1, float)
+    RxnFZ = _Value('Rxn', 2, float)
+    RxnMX = _Value('Rxn', 3, float)
+    RxnMY = _Value('Rxn', 4, float)
+    RxnMZ = _Value('Rxn', 5, float)
+
+    # Support conditions
+    # The values below are only used for visualization purposes
+    SupportDX = _Value('Support', 0, bool)
+    SupportDY = _Value('Support', 1, bool)
+    SupportDZ = _Value('Support', 2, bool)
+    SupportRX = _Value('Support', 3, bool)
+    SupportRY = _Value('Support', 4, bool)
+    SupportRZ = _Value('Support', 5, bool)
+
+# %%
+def Coordinates(nodes):
+    """
+    Returns the global coordinates of a list of nodes as an (n, 3) array. Nodes that share their
+    arrays (the nodes of one model) are gathered in a single step.
+    """
+
+    if len(nodes) == 0:
+        return zeros((0, 3))
+
+    store = nodes[0].Store
+    if all(node.Store is store for node in nodes):
+        return store.XYZ[[node.Row for node in nodes]]
+
+    return array([[node.X, node.Y, node.Z] for node in nodes], dtype=float)
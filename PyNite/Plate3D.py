@@ -1,11 +1,20 @@
-from numpy import zeros, delete, matrix, matmul, transpose, insert, cross, divide, add
+from numpy import zeros, delete, matrix, matmul, transpose, insert, cross, divide, add, array
 from numpy.linalg import inv
+from PyNite.Transformation import PlateDirCos, TransformK, ToLocal, ToGlobal, BlockDiagonal
+from PyNite.Node3D import Coordinates
 
 # A rectangular plate bending element
 class Plate3D():
 
+    # Plates are stored without a '__dict__' to keep large models compact
+    __slots__ = ('Name', 'ID', 'iNode', 'jNode', 'mNode', 'nNode', 't', 'E', 'nu', 'Version')
+
     def __init__(self, Name, iNode, jNode, mNode, nNode, t, E, nu):
 
+        # The number of times the plate's stiffness properties have been changed. The model uses
+        # it to tell when the plate's cached stiffness matrix is out of date.
+        self.Version = 0
+
         self.Name = Name
         self.ID = None
 
@@ -17,6 +26,20 @@ class Plate3D():
         self.t = t
         self.E = E
         self.nu = nu
+
+    def __setattr__(self, name, value):
+
+        # Any change to the plate's nodes or properties changes its stiffness
+        if name in ('iNode', 'jNode', 'mNode', 'nNode', 't', 'E', 'nu'):
+            object.__setattr__(self, 'Version', self.Version + 1)
+
+        object.__setattr__(self, name, value)
+
+    def __setstate__(self, state):
+        # Restore the attributes of an unpickled plate without counting them as changes
+        for attributes in state:
+            for name, value in (attributes or {}).items():
+                object.__setattr__(self, name, value)
     
     def width(self):
         return ((self.nNode.X - self.iNode.X)**2 + (self.nNode.Y - self.iNode.Y)**2 + (self.nNode.Z - self.iNode.Z)**2)**0.5
@@ -213,13 +236,14 @@ class Plate3D():
        """
 
        # Calculate and return the local displacement vector
-       return matmul(self.T(), self.D())
+       return ToLocal(self.DirCos(), self.D())
 
 #%%
     def F(self):
         
-        # Calculate and return the global force vector
-        return matmul(inv(self.T()), self.f())
+        # Calculate and return the global force vector. The transformation matrix is orthogonal,
+        # so its inverse is its transpose.
+        return matrix(ToGlobal(self.DirCos(), self.f()))
 
 #%%
     def D(self):
@@ -266,58 +290,25 @@ class Plate3D():
     # Transformation matrix
     def T(self):
 
-        # Calculate the direction cosines for the local x-axis
-        # The local x-axis will run from the i-node to the n-node
-        xi = self.iNode.X
-        xn = self.nNode.X
-        yi = self.iNode.Y
-        yn = self.nNode.Y
-        zi = self.iNode.Z
-        zn = self.nNode.Z
-        Lx = ((xn-xi)**2 + (yn-yi)**2 + (zn-zi)**2)**0.5
-        x = [(xn-xi)/Lx, (yn-yi)/Lx, (zn-zi)/Lx]
-        
-        # The local y-axis will be in the plane of the plate
-        # Find a vector in the plate's local xy plane
-        xj = self.jNode.X
-        yj = self.jNode.Y
-        zj = self.jNode.Z
-        xy = [xj-xi, yj-yi, zj-zi]
-
-        # Find a vector perpendicular to the plate surface to get the orientation of the local z-axis
-        z = cross(x, xy)
-        
-        # Divide the vector by its magnitude to produce a unit z-vector of direction cosines
-        z = divide(z, (z[0]**2 + z[1]**2 + z[2]**2)**0.5)
+        # The direction cosines are repeated along the diagonal for each 3 degrees of freedom
+        return BlockDiagonal(self.DirCos(), 24)
 
-        # Calculate the local y-axis as a vector perpendicular to the local z and x-axes
-        y = cross(z, x)
-        
-        # Divide the z-vector by its magnitude to produce a unit vector of direction cosines
-        y = divide(y, (y[0]**2 + y[1]**2 + y[2]**2)**0.5)
+#%%
+    def DirCos(self):
+        """
+        Returns the plate's 3x3 matrix of direction cosines. The rows are the plate's local x, y
+        and z-axes. See `Transformation.PlateDirCos`.
+        """
 
-        # Create the direction cosines matrix
-        dirCos = matrix([x, y, z])
-        
-        # Build the transformation matrix
-        transMatrix = zeros((24, 24))
-        transMatrix[0:3, 0:3] = dirCos
-        transMatrix[3:6, 3:6] = dirCos
-        transMatrix[6:9, 6:9] = dirCos
-        transMatrix[9:12, 9:12] = dirCos
-        transMatrix[12:15, 12:15] = dirCos
-        transMatrix[15:18, 15:18] = dirCos
-        transMatrix[18:21, 18:21] = dirCos
-        transMatrix[21:24, 21:24] = dirCos
-        
-        return transMatrix
+        iNode, jNode, nNode = self.iNode, self.jNode, self.nNode
+        return PlateDirCos([iNode.X, iNode.Y, iNode.Z], [jNode.X, jNode.Y, jNode.Z], [nNode.X, nNode.Y, nNode.Z])[0]
 
 #%%
     # Plate global stiffness matrix
     def K(self):
         
         # Calculate and return the stiffness matrix in global coordinates
-        return matmul(matmul(transpose(self.T()), self.k()), self.T())
+        return matrix(TransformK(self.DirCos(), self.k()))
 
 #%%
     # Calculates and returns the displacement coefficient matrix [C]
@@ -456,4 +447,21 @@ class Plate3D():
         # Return internal shears
         return matrix([[Qx], 
                        [Qy]])
-        
\ No newline at end of file
+        
+#%%
+def BatchK(plates):
+    """
+    Returns the global stiffness matrices for a list of plates, stacked into an
+    (n_plates, 24, 24) array. The direction cosines of all the plates are calculated and
+    applied together.
+    """
+
+    # Get the local stiffness matrices
+    k = array([plate.k() for plate in plates], dtype=float).reshape(-1, 24, 24)
+
+    # Get the direction cosines of all the plates at once
+    iXYZ, jXYZ, nXYZ = [Coordinates([getattr(plate, name) for plate in plates]) for name in ('iNode', 'jNode', 'nNode')]
+    dirCos = PlateDirCos(iXYZ, jXYZ, nXYZ)
+
+    # Transform the local stiffness matrices to global coordinates
+    return TransformK(dirCos, k)
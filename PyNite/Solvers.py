@@ -0,0 +1,589 @@
+# %%
+from numpy import asarray, count_nonzero, arange, argmin, nonzero, zeros, unique, argsort, bincount, cumsum, repeat, full, eye, tile, broadcast_to, sqrt, diff, searchsorted, int64
+from numpy.linalg import LinAlgError, inv, norm
+from scipy.linalg import lu_factor, lu_solve, cho_solve, cho_solve_banded
+from scipy.linalg.lapack import dpotrf, dpbtrf
+from scipy.sparse import issparse, csc_matrix, csr_matrix, coo_matrix, diags, tril
+from scipy.sparse.linalg import splu
+from warnings import warn
+
+# %%
+class SingularMatrixError(LinAlgError):
+    """
+    Raised when a stiffness matrix can't be factored because it has a zero or negative pivot.
+    This implies the structure is unstable.
+
+    Attributes
+    ----------
+    index : number
+        The row/column of the matrix where the offending pivot was found, or None if it is unknown.
+    """
+
+    def __init__(self, message, index=None):
+
+        super().__init__(message)
+        self.index = index
+
+# %%
+class ConvergenceWarning(UserWarning):
+    """
+    Issued when an iterative solver stops before reaching its tolerance. The solution it returns
+    is less accurate than requested.
+    """
+
+# %%
+def Factor(K, solver='auto', pivot_tol=1e-12, ordered=False, **options):
+    """
+    Factors a stiffness matrix and returns a function that solves [K]{x} = {b}.
+
+    The returned function accepts a (n, k) array of right hand sides, so several load
+    vectors can be solved using the same factorization.
+
+    The stability of the structure is checked during the factorization. A pivot that is zero or
+    negative, or that has lost nearly all of the stiffness on its diagonal to the pivots before
+    it, means the matrix is singular (or not positive-definite) and a `SingularMatrixError`
+    identifying the row of the offending pivot is raised.
+
+    Parameters
+    ----------
+    K : array or scipy.sparse matrix
+        The (partitioned) stiffness matrix to be factored.
+    solver : {'auto', 'dense', 'sparse', 'cholesky', 'banded'}
+        The linear solver backend:
+            'dense' = General LU factorization using LAPACK. Sparse matrices are converted to dense.
+            'sparse' = General sparse LU factorization using SuperLU. Dense matrices are converted to sparse.
+            'banded' = Banded Cholesky factorization using LAPACK. Only the terms within the
+                       bandwidth of the matrix are stored, so the cost depends on how the degrees
+                       of freedom are numbered. See `FEModel3D.Analyze`'s 'reorder' option.
+            'cholesky' = Cholesky factorization for symmetric positive-definite matrices. Dense
+                         matrices use LAPACK. Sparse matrices use CHOLMOD if `scikit-sparse` is
+                         installed, and SuperLU in symmetric mode otherwise.
+            'auto' = A Cholesky factorization, using a dense or sparse matrix depending on the
+                     size and sparsity of the matrix.
+            'pcg' = Preconditioned conjugate gradient iterative solver. Nothing is factored
+                    except (optionally) the preconditioner, so memory use stays close to that of
+                    the matrix itself. See `PCG` for the available options. Without a
+                    factorization, instability is only detected from zero diagonal terms or a
+                    breakdown of the iterations, so it is less reliably detected than with the
+                    direct solvers.
+    pivot_tol : number
+        A pivot smaller than `pivot_tol` times the original diagonal term it was formed from is
+        treated as zero.
+    ordered : boolean
+        If True, the rows and columns of the matrix have already been ordered to reduce fill-in
+        (see `MinimumDegree`), and the sparse Cholesky factorizations use them in their given
+        order rather than reordering them again. The general sparse LU factorization ('sparse')
+        always orders the matrix itself, since its row pivoting would undo the given order.
+        Defaults to False.
+    **options
+        Additional options passed to the 'pcg' solver. See `PCG`.
+    """
+
+    # Get the diagonal of the stiffness matrix. A degree of freedom with no stiffness at all is
+    # the most common cause of instability, and can be identified without factoring anything.
+    diagonal = K.diagonal()
+    if count_nonzero(diagonal > 0) < len(diagonal):
+        raise SingularMatrixError('The stiffness matrix is singular.', argmin(diagonal > 0))
+
+    # Pick a solver automatically. A supported structure has a symmetric positive-definite
+    # stiffness matrix, so a Cholesky factorization is always used. Small or densely populated
+    # matrices are factored in dense format, and large sparse ones in sparse format.
+    if solver == 'auto':
+        if SparseIsBetter(K):
+            K = csc_matrix(K)
+        elif issparse(K):
+            K = K.toarray()
+        solver = 'cholesky'
+
+    if solver == 'dense':
+
+        # Factor the matrix using LAPACK's LU factorization. Columns are not permuted, so the
+        # pivot in column 'j' belongs to degree of freedom 'j'.
+        K = K.toarray() if issparse(K) else asarray(K)
+        LU = lu_factor(K, check_finite=False)
+        CheckPivots(abs(LU[0].diagonal()), diagonal, arange(len(diagonal)), pivot_tol)
+        return lambda b: lu_solve(LU, b, check_finite=False)
+
+    elif solver == 'sparse':
+
+        # Factor the matrix using SuperLU's general sparse LU factorization
+        LU = SuperLU(csc_matrix(K), diagonal, pivot_tol, signed=False)
+        return LU.solve
+
+    elif solver == 'cholesky':
+
+        if issparse(K):
+
+            # Use CHOLMOD's sparse Cholesky factorization if it's available
+            try:
+                from sksparse.cholmod import cholesky, CholmodNotPositiveDefiniteError
+            except ImportError:
+                # Fall back on SuperLU without row pivoting, using a symmetric fill reducing ordering.
+                # For a symmetric positive-definite matrix this is equivalent to an LDL' factorization.
+                LU = SuperLU(csc_matrix(K), diagonal, pivot_tol, signed=True, permc_spec='NATURAL' if ordered else 'MMD_AT_PLUS_A',
+                             diag_pivot_thresh=0, options=dict(SymmetricMode=True))
+                return LU.solve
+
+            try:
+                L = cholesky(csc_matrix(K), ordering_method='natural' if ordered else 'default')
+            except CholmodNotPositiveDefiniteError:
+                raise SingularMatrixError('The stiffness matrix is not positive-definite.')
+
+            # CHOLMOD factors the matrix with its rows and columns reordered by 'P'. The pivots are
+            # the terms of D in the equivalent LDL' factorization.
+            CheckPivots(L.D(), diagonal, L.P(), pivot_tol)
+            return L
+
+        else:
+
+            # Factor the matrix using LAPACK's Cholesky factorization. LAPACK stops at the first
+            # pivot that isn't positive and reports its (1-based) position in 'info'.
+            L, info = dpotrf(asarray(K), lower=1, clean=1, overwrite_a=0)
+            if info > 0:
+                raise SingularMatrixError('The stiffness matrix is not positive-definite.', info - 1)
+            CheckPivots(L.diagonal()**2, diagonal, arange(len(diagonal)), pivot_tol)
+            return lambda b: cho_solve((L, True), b, check_finite=False)
+
+    elif solver == 'pcg':
+
+        # Iterative solvers don't factor the matrix, so there are no pivots to check
+        return PCG(csr_matrix(K), **options)
+
+    elif solver == 'banded':
+
+        # Store the lower band of the matrix in LAPACK's banded format. Row 'k' of 'ab' holds the
+        # k-th subdiagonal, so term (i, j) of the matrix is stored at ab[i - j, j].
+        K = coo_matrix(K)
+        lower = K.row >= K.col
+        bandwidth = (K.row[lower] - K.col[lower]).max()
+        ab = zeros((bandwidth + 1, K.shape[0]))
+        ab[K.row[lower] - K.col[lower], K.col[lower]] = K.data[lower]
+
+        # Factor the banded matrix using LAPACK's banded Cholesky factorization. As with the
+        # dense factorization, the (1-based) position of the first pivot that isn't positive is
+        # reported in 'info'.
+        cb, info = dpbtrf(ab, lower=1, overwrite_ab=1)
+        if info > 0:
+            raise SingularMatrixError('The stiffness matrix is not positive-definite.', info - 1)
+
+        # The first row of 'cb' is the diagonal of the Cholesky factor
+        CheckPivots(cb[0]**2, diagonal, arange(len(diagonal)), pivot_tol)
+        return lambda b: cho_solve_banded((cb, True), b, check_finite=False)
+
+    else:
+        raise ValueError("Unknown solver '" + str(solver) + "'. Use 'auto', 'dense', 'sparse', 'cholesky', 'banded' or 'pcg'.")
+
+# %%
+def MinimumDegree(graph):
+    '''
+    Returns a fill reducing ordering for a symmetric sparse matrix, using a compiled minimum
+    degree ordering. CHOLMOD's approximate minimum degree (AMD) ordering is used if
+    `scikit-sparse` is installed, and SuperLU's multiple minimum degree ordering otherwise.
+
+    Parameters
+    ----------
+    graph : array or scipy.sparse matrix
+        A symmetric matrix whose non-zero terms define the graph to be ordered.
+
+    Returns
+    -------
+    order : array
+        The rows of the matrix in the order they should be eliminated.
+    '''
+
+    # Form a symmetric positive-definite matrix with the same pattern as the graph (its graph
+    # Laplacian plus the identity), so both libraries can order it
+    graph = csr_matrix(graph, dtype=float)
+    graph.setdiag(0)
+    graph.eliminate_zeros()
+    graph.data[:] = -1
+    M = csc_matrix(graph + diags(1 - asarray(graph.sum(axis=1)).ravel()))
+
+    # Use CHOLMOD's AMD ordering if it's available
+    try:
+        from sksparse.cholmod import analyze
+    except ImportError:
+        # SuperLU only gives its ordering along with a factorization. 'perm_c[i]' is the position
+        # row 'i' is eliminated in.
+        LU = splu(M, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0, options=dict(SymmetricMode=True))
+        return argsort(LU.perm_c)
+
+    return analyze(M, ordering_method='amd').P()
+
+# %%
+def SparseIsBetter(K):
+    """
+    Returns True if a matrix is large and sparse enough that a sparse factorization will outperform
+    a dense one.
+
+    Parameters
+    ----------
+    K : array or scipy.sparse matrix
+        The matrix to be factored.
+    """
+
+    # Get the size of the matrix and the fraction of its terms that are non-zero
+    n = K.shape[0]
+    if issparse(K):
+        density = K.nnz/n**2
+    else:
+        density = count_nonzero(K)/n**2
+
+    # Dense LAPACK routines are very fast on small matrices, and on matrices with few zero terms
+    return n > 1000 and density < 0.05
+
+# %%
+def CheckPivots(pivots, diagonal, order, pivot_tol):
+    """
+    Raises a `SingularMatrixError` if any pivot of a factorization is zero, negative, or
+    effectively zero compared to the diagonal term it was formed from.
+
+    Parameters
+    ----------
+    pivots : array
+        The pivots of the factorization, in the order they were eliminated.
+    diagonal : array
+        The diagonal of the matrix before it was factored.
+    order : array
+        The row/column of the original matrix each pivot belongs to.
+    pivot_tol : number
+        The smallest ratio of pivot to diagonal term considered to be non-zero.
+    """
+
+    # Find the first pivot that has lost (nearly) all of its stiffness
+    bad_pivots = nonzero(pivots <= pivot_tol*diagonal[order])[0]
+    if len(bad_pivots) > 0:
+        raise SingularMatrixError('The stiffness matrix is singular.', order[bad_pivots[0]])
+
+# %%
+def SuperLU(K, diagonal, pivot_tol, signed, **kwargs):
+    """
+    Factors a sparse matrix using SuperLU and checks the factorization for zero or negative pivots.
+
+    Parameters
+    ----------
+    K : scipy.sparse.csc_matrix
+        The matrix to be factored.
+    diagonal : array
+        The diagonal of the matrix.
+    pivot_tol : number
+        The smallest ratio of pivot to diagonal term considered to be non-zero.
+    signed : boolean
+        If True, negative pivots are treated as a sign the matrix is not positive-definite. This is
+        only meaningful when SuperLU is run without row pivoting.
+    """
+
+    # SuperLU raises a 'RuntimeError' when a pivot is exactly zero
+    try:
+        LU = splu(K, **kwargs)
+    except RuntimeError:
+        raise SingularMatrixError('The stiffness matrix is singular.')
+
+    # SuperLU moves column 'i' of the original matrix to position 'perm_c[i]', so the pivot in
+    # column 'k' of U belongs to column 'argsort(perm_c)[k]' of the original matrix
+    pivots = LU.U.diagonal()
+    if signed == False:
+        pivots = abs(pivots)
+    CheckPivots(pivots, diagonal, argsort(LU.perm_c), pivot_tol)
+
+    return LU
+
+# %%
+class PCG():
+    """
+    A preconditioned conjugate gradient solver for symmetric positive-definite matrices.
+
+    Calling the solver with an (n, k) array of right hand sides solves each column in turn. The
+    number of iterations, the final relative residual ||b - Kx||/||b|| and whether it converged
+    are kept for each column in the `iterations`, `residuals` and `converged` lists. A
+    `ConvergenceWarning` is issued for each column that doesn't converge.
+    """
+
+    def __init__(self, K, preconditioner='jacobi', tol=1e-10, maxiter=None, blocks=None):
+        """
+        Sets up the solver and builds the preconditioner.
+
+        Parameters
+        ----------
+        K : scipy.sparse matrix
+            The symmetric positive-definite matrix.
+        preconditioner : {'jacobi', 'block-jacobi', 'ic', None}
+            The preconditioner:
+                'jacobi' = The inverse of the diagonal of the matrix.
+                'block-jacobi' = The inverse of the diagonal blocks of the matrix. With the
+                                 default 'blocks' the blocks are the (up to) 6x6 stiffness
+                                 matrices of each node.
+                'ic' = A zero fill-in incomplete Cholesky factorization of the matrix. It costs
+                       more to build and apply than the Jacobi preconditioners, but usually
+                       needs fewer iterations on poorly conditioned models.
+                None = No preconditioning.
+        tol : number
+            The relative residual ||b - Kx||/||b|| at which the solution is considered converged.
+        maxiter : number
+            The maximum number of iterations for each right hand side. Defaults to the size of
+            the matrix.
+        blocks : array
+            The block each row of the matrix belongs to, for the 'block-jacobi' preconditioner.
+            Defaults to consecutive groups of 6 rows.
+        """
+
+        self.K = K
+        self.tol = tol
+        self.maxiter = K.shape[0] if maxiter == None else maxiter
+        self.iterations = []  # The number of iterations used for each right hand side solved
+        self.residuals = []   # The final relative residual for each right hand side solved
+        self.converged = []   # Whether each right hand side solved converged to 'tol'
+
+        # Build the preconditioner as a function that returns M⁻¹r
+        if preconditioner == 'jacobi':
+            inv_diagonal = 1/K.diagonal()
+            self.M = lambda r: inv_diagonal*r
+        elif preconditioner == 'block-jacobi':
+            if blocks is None:
+                blocks = arange(K.shape[0])//6
+            M = BlockInverse(K, blocks)
+            self.M = lambda r: M @ r
+        elif preconditioner == 'ic':
+            # Scale the matrix to a unit diagonal before factoring it. Stiffness matrices mix
+            # translational and rotational terms of very different magnitudes.
+            scale = 1/sqrt(K.diagonal())
+            L = IncompleteCholesky(diags(scale) @ K @ diags(scale))
+            self.M = lambda r: scale*L.solve(L.solve(scale*r), trans='T')
+        elif preconditioner == None:
+            self.M = lambda r: r
+        else:
+            raise ValueError("Unknown preconditioner '" + str(preconditioner) + "'. Use 'jacobi', 'block-jacobi', 'ic' or None.")
+
+    def __call__(self, b):
+        """
+        Solves [K]{x} = {b} for each column of 'b'.
+        """
+
+        # Solve each right hand side in turn
+        b = asarray(b, dtype=float)
+        x = zeros(b.shape)
+        for j in range(b.shape[1]):
+            x[:, j] = self.Solve(b[:, j])
+
+        return x
+
+    def Solve(self, b):
+        """
+        Solves [K]{x} = {b} for a single right hand side using the preconditioned conjugate
+        gradient method. Returns the solution vector.
+        """
+
+        K = self.K
+        M = self.M
+
+        # Start from x = 0, so the initial residual is b itself
+        x = zeros(len(b))
+        r = b.copy()
+        norm_b = norm(b)
+
+        # A zero load vector has a zero solution
+        if norm_b == 0:
+            self.iterations.append(0)
+            self.residuals.append(0.0)
+            self.converged.append(True)
+            return x
+
+        z = M(r)
+        p = z.copy()
+        rz = r @ z
+        residual = 1.0
+
+        for iteration in range(1, self.maxiter + 1):
+
+            # Step along the search direction
+            Kp = K @ p
+            pKp = p @ Kp
+
+            # A search direction with no stiffness means the matrix isn't positive-definite
+            if pKp <= 0:
+                raise SingularMatrixError('The stiffness matrix is not positive-definite.')
+
+            alpha = rz/pKp
+            x += alpha*p
+            r -= alpha*Kp
+
+            # Check for convergence
+            residual = norm(r)/norm_b
+            if residual <= self.tol:
+                break
+
+            # Pick the next search direction, conjugate to the previous ones
+            z = M(r)
+            rz_new = r @ z
+
+            # Stop if the preconditioner has broken down
+            if not rz_new > 0:
+                break
+            p = z + (rz_new/rz)*p
+            rz = rz_new
+
+        # Record and report the results
+        self.iterations.append(iteration)
+        self.residuals.append(residual)
+        self.converged.append(bool(residual <= self.tol))
+        if self.converged[-1]:
+            print('...PCG converged in ' + str(iteration) + ' iterations (relative residual ' + '{:.3e}'.format(residual) + ')')
+        else:
+            warn('PCG failed to converge after ' + str(iteration) + ' iterations (relative residual ' + '{:.3e}'.format(residual)
+                 + ', tolerance ' + '{:.3e}'.format(self.tol) + '). Try a better preconditioner or a larger \'maxiter\'.', ConvergenceWarning)
+
+        return x
+
+# %%
+def BlockInverse(K, blocks):
+    """
+    Returns the inverse of the block diagonal part of a matrix, as a sparse matrix.
+
+    Parameters
+    ----------
+    K : scipy.sparse matrix
+        The matrix.
+    blocks : array
+        The block each row (and column) of the matrix belongs to. Terms of the matrix whose row
+        and column are in the same block form that block's diagonal block.
+    """
+
+    # Number the blocks 0, 1, 2... and find the position of each row within its block
+    n = K.shape[0]
+    IDs, block = unique(asarray(blocks), return_inverse=True)
+    counts = bincount(block)
+    order = argsort(block, kind='stable')
+    position = zeros(n, dtype=int)
+    position[order] = arange(n) - repeat(cumsum(counts) - counts, counts)
+    size = counts.max()
+
+    # Gather the diagonal blocks into an (n_blocks, size, size) array. Blocks smaller than 'size'
+    # are padded with an identity matrix so every block can be inverted.
+    B = tile(eye(size), (len(IDs), 1, 1))
+    K = csr_matrix(K).tocoo()
+    same_block = block[K.row] == block[K.col]
+    rows, cols = K.row[same_block], K.col[same_block]
+    B[block[rows], position[rows], position[cols]] = K.data[same_block]
+
+    # Invert every block at once
+    B_inv = inv(B)
+
+    # Scatter the inverted blocks back into a sparse matrix, skipping the padding
+    index = full((len(IDs), size), -1)
+    index[block, position] = arange(n)
+    rows = broadcast_to(index[:, :, None], B_inv.shape)
+    cols = broadcast_to(index[:, None, :], B_inv.shape)
+    valid = (rows >= 0) & (cols >= 0)
+
+    return csr_matrix((B_inv[valid], (rows[valid], cols[valid])), shape=(n, n))
+
+# %%
+def IncompleteCholesky(K):
+    """
+    Returns a zero fill-in incomplete Cholesky factorization, K ≈ LL', of a symmetric
+    positive-definite sparse matrix. Terms of L are only calculated where K has non-zero terms.
+
+    The factorization is calculated a column at a time:
+
+        L[j, j] = sqrt(K[j, j] - sum(L[j, k]²))
+        L[i, j] = (K[i, j] - sum(L[i, k]*L[j, k]))/L[j, j]
+
+    summed over the columns 'k' left of 'j'. Column 'j' only depends on the columns 'k' where
+    L[j, k] isn't zero, so the columns are grouped into levels of columns that don't depend on
+    each other, and each level is calculated at once using arrays. The products that go into the
+    sums are found once, before anything is calculated.
+
+    An incomplete factorization can break down (find a negative pivot) even if the matrix is
+    positive-definite. When that happens the diagonal of the matrix is increased by a small
+    fraction and the factorization is calculated again, reusing the levels and products.
+
+    The factor is returned as a SuperLU object so its triangular solves run in compiled code.
+    L⁻¹b is `L.solve(b)` and L'⁻¹b is `L.solve(b, trans='T')`.
+
+    Parameters
+    ----------
+    K : scipy.sparse matrix
+        The matrix to be factored.
+    """
+
+    # Get the lower triangle of the matrix by columns. Rows are sorted, so the diagonal term is
+    # the first term of each column.
+    K = csc_matrix(tril(K))
+    K.sort_indices()
+    n = K.shape[0]
+    indptr, rows, values = K.indptr, K.indices, K.data
+    cols = repeat(arange(n), diff(indptr))
+    diagonal = indptr[:-1]
+
+    # Find every product L[i, k]*L[j, k] that goes into a term L[i, j], where 'i' and 'j' are
+    # rows of column 'k' below the diagonal, and L[i, j] is one of the terms being calculated.
+    # 'a' and 'b' are the positions of L[i, k] and L[j, k], and 'target' is the position of
+    # L[i, j].
+    below = arange(len(rows))[rows != cols]
+    counts = indptr[cols[below] + 1] - below
+    b = repeat(below, counts)
+    a = b + arange(len(b)) - repeat(cumsum(counts) - counts, counts)
+    keys = cols.astype(int64)*n + rows
+    wanted = rows[b].astype(int64)*n + rows[a]
+    target = searchsorted(keys, wanted).clip(max=len(keys) - 1)
+    found = keys[target] == wanted
+    a, b, target = a[found], b[found], target[found]
+
+    # Group the columns into levels. A column's level is one more than the highest level of the
+    # columns it depends on.
+    level = zeros(n, dtype=int)
+    waiting = bincount(rows[below], minlength=n)    # The number of columns each column depends on
+    ready = nonzero(waiting == 0)[0]
+    depth = 0
+    while len(ready) > 0:
+        level[ready] = depth
+        depth += 1
+
+        # Terms below the diagonal of the columns just leveled
+        counts = indptr[ready + 1] - indptr[ready] - 1
+        terms = repeat(indptr[ready] + 1, counts) + arange(counts.sum()) - repeat(cumsum(counts) - counts, counts)
+        dependents = rows[terms]
+        waiting -= bincount(dependents, minlength=n)
+        ready = unique(dependents[waiting[dependents] == 0])
+
+    # Sort the terms and the products by level
+    term_order = argsort(level[cols], kind='stable')
+    term_bounds = searchsorted(level[cols][term_order], arange(depth + 1))
+    product_order = argsort(level[cols[target]], kind='stable')
+    a, b, target = a[product_order], b[product_order], target[product_order]
+    product_bounds = searchsorted(level[cols[target]], arange(depth + 1))
+
+    # The position of each term within its level
+    local = zeros(len(rows), dtype=int)
+    local[term_order] = arange(len(rows)) - repeat(term_bounds[:-1], diff(term_bounds))
+
+    shift = 0
+    while True:
+
+        # Factor the matrix one level at a time
+        L = zeros(len(rows))
+        for depth in range(len(term_bounds) - 1):
+
+            # Sum the products for each term in the level. Every product comes from columns in
+            # earlier levels.
+            terms = term_order[term_bounds[depth]:term_bounds[depth + 1]]
+            products = slice(product_bounds[depth], product_bounds[depth + 1])
+            sums = bincount(local[target[products]], L[a[products]]*L[b[products]], minlength=len(terms))
+
+            # Calculate the diagonal terms first, then the terms below them
+            is_diagonal = rows[terms] == cols[terms]
+            pivots = values[terms[is_diagonal]]*(1 + shift) - sums[is_diagonal]
+            if (pivots <= 0).any():
+                break
+            L[terms[is_diagonal]] = sqrt(pivots)
+            L[terms[~is_diagonal]] = (values[terms[~is_diagonal]] - sums[~is_diagonal])/L[diagonal[cols[terms[~is_diagonal]]]]
+
+        else:
+
+            # Wrap L in a SuperLU object. L is already triangular, so with no reordering or
+            # pivoting SuperLU's factorization of L is L itself and no fill-in is created.
+            L = csc_matrix((L, rows, indptr), shape=(n, n))
+            return splu(L, permc_spec='NATURAL', diag_pivot_thresh=0, options=dict(SymmetricMode=True))
+
+        # The factorization broke down, so shift the diagonal and start over
+        shift = 1e-3 if shift == 0 else 2*shift
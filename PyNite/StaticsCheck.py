@@ -0,0 +1,63 @@
+# %%
+class StaticsCheck():
+    '''
+    The results of a statics check: the resultants of the applied loads and of the reactions for
+    a load combination, and whether they are in equilibrium. See `FEModel3D.CheckStatics`.
+
+    Resultants are given as arrays of 6 terms (FX, FY, FZ, MX, MY, MZ). Moments are taken about
+    the global origin.
+    '''
+
+#%%
+    def __init__(self, Combo, Loads, Reactions, Scale, tol):
+        '''
+        Initializes a new statics check.
+
+        Parameters
+        ----------
+        Combo : string
+            The name of the load combination that was checked.
+        Loads : array
+            The resultant of the applied loads (nodal loads and member loads).
+        Reactions : array
+            The resultant of the reactions.
+        Scale : array
+            The sums of the absolute values of every term that went into the resultants. The
+            imbalance is compared to these to decide if the model is in equilibrium.
+        tol : number
+            The largest acceptable imbalance, relative to 'Scale'.
+        '''
+
+        self.Combo = Combo                    # The name of the load combination
+        self.Loads = Loads                    # The resultant of the applied loads
+        self.Reactions = Reactions            # The resultant of the reactions
+        self.Imbalance = Loads + Reactions    # The out of balance resultant (zero for a model in equilibrium)
+        self.Scale = Scale                    # The size of the terms that went into each resultant
+        self.tol = tol                        # The relative tolerance on the imbalance
+
+        # The model is in equilibrium if each term of the imbalance is small compared to the terms
+        # that were summed to get it
+        self.OK = bool((abs(self.Imbalance) <= tol*Scale).all())
+
+#%%
+    def __str__(self):
+        '''
+        Returns the statics check formatted for printing to the console.
+        '''
+
+        FX, FY, FZ, MX, MY, MZ = self.Loads
+        RFX, RFY, RFZ, RMX, RMY, RMZ = self.Reactions
+
+        lines = ['**Applied Loads**',
+                 'Sum Forces X: ' + str(FX) + ', Sum Forces Y: ' + str(FY) + ', Sum Forces Z: ' + str(FZ),
+                 'Sum Moments MX: ' + str(MX) + ', Sum Moments MY: ' + str(MY) + ', Sum Moments MZ: ' + str(MZ),
+                 '**Reactions**',
+                 'Sum Forces X: ' + str(RFX) + ', Sum Forces Y: ' + str(RFY) + ', Sum Forces Z: ' + str(RFZ),
+                 'Sum Moments MX: ' + str(RMX) + ', Sum Moments MY: ' + str(RMY) + ', Sum Moments MZ: ' + str(RMZ)]
+
+        if self.OK:
+            lines.append('Statics check passed (tolerance ' + str(self.tol) + ')')
+        else:
+            lines.append('Warning: Statics check failed (tolerance ' + str(self.tol) + '). Imbalance: ' + str(list(self.Imbalance)))
+
+        return '\n'.join(lines)
@@ -0,0 +1,92 @@
+# %%
+from numpy import array
+
+# %%
+class SuperElement3D():
+    '''
+    A class representing a superelement in a finite element model: a substructure that has been
+    condensed to the degrees of freedom of its boundary nodes.
+
+    The substructure is an `FEModel3D` that has been condensed using `FEModel3D.Condense`. The
+    condensation is done once, and the same condensed model can be used by any number of
+    superelements, as long as each copy of the substructure has the same orientation as the
+    original (only translated).
+    '''
+
+#%%
+    def __init__(self, Name, Model, Nodes):
+        '''
+        Initializes a new superelement.
+
+        Parameters
+        ----------
+        Name : string
+            A unique user-defined name for the superelement.
+        Model : FEModel3D
+            The condensed substructure.
+        Nodes : list
+            The nodes of the parent model the superelement is connected to. Node 'i' of the list
+            is connected to the substructure's boundary node 'i' (see `FEModel3D.BoundaryNodes`).
+        '''
+
+        self.Name = Name    # A unique name for the superelement given by the user
+        self.ID = None      # Unique index number for the superelement assigned by the program
+        self.Model = Model  # The condensed substructure
+        self.Nodes = Nodes  # The parent model's nodes, in the order of the substructure's boundary nodes
+
+#%%
+    def K(self):
+        '''
+        Returns the superelement's condensed global stiffness matrix.
+        '''
+
+        # The condensed stiffness matrix is shared by every copy of the substructure
+        return self.Model.CondensedK()
+
+#%%
+    def FER(self, combo=None):
+        '''
+        Returns the superelement's global fixed end reaction vector: the boundary forces needed to
+        hold the boundary nodes in place against the loads applied to the substructure.
+
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination used to factor the substructure's loads. If None, every load is
+            used unfactored.
+        '''
+
+        # The condensed loads act on the boundary nodes. Holding the nodes in place takes an
+        # equal and opposite force.
+        return -self.Model.CondensedLoads(combo)
+
+#%%
+    def D(self):
+        '''
+        Returns the superelement's global displacement vector (the displacements of its boundary
+        nodes).
+        '''
+
+        # Read in the global displacements from the nodes
+        Dvector = []
+        for node in self.Nodes:
+            Dvector += [node.DX, node.DY, node.DZ, node.RX, node.RY, node.RZ]
+
+        # Return the global displacement vector
+        return array(Dvector, dtype=float).reshape(-1, 1)
+
+#%%
+    def F(self, combo=None):
+        '''
+        Returns the superelement's global end force vector: the forces the superelement applies
+        to its boundary nodes.
+
+        Parameters
+        ----------
+        combo : LoadCombo
+            The load combination used to factor the substructure's loads. If None, every load is
+            used unfactored.
+        '''
+
+        # Calculate and return the global end force vector
+        return self.K() @ self.D() + self.FER(combo)
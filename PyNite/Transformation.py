@@ -0,0 +1,214 @@
+# %%
+"""
+Coordinate transformations for members and plates.
+
+An element's transformation matrix [T] is block diagonal, with the element's 3x3 matrix of
+direction cosines repeated once for every 3 degrees of freedom. Rather than forming [T] and
+multiplying by it, the functions below apply the 3x3 blocks directly. Every function accepts
+either a single element (a (3, 3) matrix of direction cosines) or any number of elements
+stacked into (n, 3, 3) arrays.
+
+Since the direction cosines are orthogonal, the inverse of [T] is its transpose.
+"""
+from numpy import asarray, zeros, cross, where, abs, maximum, einsum, sqrt, isnan, eye, kron
+
+# %%
+def MemberDirCos(iXYZ, jXYZ, auxXYZ=None):
+    """
+    Returns the direction cosines for any number of members, stacked into an (n, 3, 3) array.
+    Row 0 of each matrix is the member's local x-axis, row 1 its local y-axis and row 2 its
+    local z-axis.
+
+    Parameters
+    ----------
+    iXYZ : array
+        The (n, 3) global coordinates of each member's i-node.
+    jXYZ : array
+        The (n, 3) global coordinates of each member's j-node.
+    auxXYZ : array
+        The (n, 3) global coordinates of each member's auxiliary node, used to define the local
+        z-axis. Members without an auxiliary node have a row of NaN's. If None, no member has an
+        auxiliary node.
+    """
+
+    iXYZ = asarray(iXYZ, dtype=float).reshape(-1, 3)
+    jXYZ = asarray(jXYZ, dtype=float).reshape(-1, 3)
+    n = len(iXYZ)
+
+    x1, y1, z1 = iXYZ.T
+    x2, y2, z2 = jXYZ.T
+
+    # Calculate the direction cosines for the local x-axis
+    x = (jXYZ - iXYZ)/Norm(jXYZ - iXYZ)
+
+    y = zeros((n, 3))
+    z = zeros((n, 3))
+
+    # Members with an auxiliary node
+    if auxXYZ is None:
+        aux = zeros(n, dtype=bool)
+    else:
+        auxXYZ = asarray(auxXYZ, dtype=float).reshape(-1, 3)
+        aux = ~isnan(auxXYZ).any(axis=1)
+    if aux.any():
+
+        # Define a vector in the local xz plane using the auxiliary point
+        za = auxXYZ[aux] - iXYZ[aux]
+
+        # Find the direction cosines for the local y-axis
+        ya = cross(za, x[aux])
+        ya = ya/Norm(ya)
+
+        # Ensure the z-axis is perpendicular to the x-axis
+        za = cross(x[aux], ya)
+        y[aux] = ya
+        z[aux] = za/Norm(za)
+
+    # Without an auxiliary node the local z-axis is kept parallel to the global XZ plane
+    # Vertical members keep their local y-axis in the XY plane
+    vertical = ~aux & IsClose(x1, x2) & IsClose(z1, z2)
+    y[vertical] = where((y2 > y1)[vertical, None], [-1, 0, 0], [1, 0, 0])
+    z[vertical] = [0, 0, 1]
+
+    # Horizontal members
+    horizontal = ~aux & ~vertical & IsClose(y1, y2)
+    y[horizontal] = [0, 1, 0]
+    zh = cross(x[horizontal], y[horizontal])
+    z[horizontal] = zh/Norm(zh)
+
+    # Members neither vertical or horizontal. The order in which the vectors are 'crossed' keeps
+    # the local y-axis pointing upward.
+    other = ~aux & ~vertical & ~horizontal
+    proj = (jXYZ - iXYZ)[other]*[1, 0, 1]
+    zo = where((y2 > y1)[other, None], cross(proj, x[other]), cross(x[other], proj))
+    zo = zo/Norm(zo)
+    yo = cross(zo, x[other])
+    y[other] = yo/Norm(yo)
+    z[other] = zo
+
+    # Stack the axes into direction cosine matrices
+    dirCos = zeros((n, 3, 3))
+    dirCos[:, 0, :] = x
+    dirCos[:, 1, :] = y
+    dirCos[:, 2, :] = z
+
+    return dirCos
+
+# %%
+def PlateDirCos(iXYZ, jXYZ, nXYZ):
+    """
+    Returns the direction cosines for any number of plates, stacked into an (n, 3, 3) array.
+    The local x-axis runs from the i-node to the n-node, and the local z-axis is normal to the
+    plate.
+
+    Parameters
+    ----------
+    iXYZ, jXYZ, nXYZ : array
+        The (n, 3) global coordinates of each plate's i-node, j-node and n-node.
+    """
+
+    iXYZ = asarray(iXYZ, dtype=float).reshape(-1, 3)
+    jXYZ = asarray(jXYZ, dtype=float).reshape(-1, 3)
+    nXYZ = asarray(nXYZ, dtype=float).reshape(-1, 3)
+
+    # Calculate the direction cosines for the local x-axis
+    x = (nXYZ - iXYZ)/Norm(nXYZ - iXYZ)
+
+    # Find a vector perpendicular to the plate surface to get the local z-axis
+    z = cross(x, jXYZ - iXYZ)
+    z = z/Norm(z)
+
+    # Calculate the local y-axis as a vector perpendicular to the local z and x-axes
+    y = cross(z, x)
+    y = y/Norm(y)
+
+    dirCos = zeros((len(iXYZ), 3, 3))
+    dirCos[:, 0, :] = x
+    dirCos[:, 1, :] = y
+    dirCos[:, 2, :] = z
+
+    return dirCos
+
+# %%
+def TransformK(dirCos, k):
+    """
+    Transforms local stiffness matrices to global coordinates: [K] = [T]'[k][T].
+
+    Parameters
+    ----------
+    dirCos : array
+        The (3, 3) or (n, 3, 3) direction cosines.
+    k : array
+        The (size, size) or (n, size, size) local stiffness matrices.
+    """
+
+    dirCos = asarray(dirCos)
+    k = asarray(k)
+    size = k.shape[-1]
+
+    # View the matrix as a grid of 3x3 blocks and rotate each block on both sides
+    blocks = k.reshape(k.shape[:-2] + (size//3, 3, size//3, 3))
+    K = einsum('...pi,...apbq->...aibq', dirCos, blocks)
+    K = einsum('...aibq,...qj->...aibj', K, dirCos)
+
+    return K.reshape(k.shape)
+
+# %%
+def ToLocal(dirCos, D):
+    """
+    Transforms global vectors to local coordinates: {d} = [T]{D}.
+
+    Parameters
+    ----------
+    dirCos : array
+        The (3, 3) or (n, 3, 3) direction cosines.
+    D : array
+        The (size, columns) or (n, size, columns) global vectors.
+    """
+
+    D = asarray(D)
+    blocks = D.reshape(D.shape[:-2] + (-1, 3, D.shape[-1]))
+    return einsum('...ij,...ajc->...aic', asarray(dirCos), blocks).reshape(D.shape)
+
+# %%
+def ToGlobal(dirCos, d):
+    """
+    Transforms local vectors to global coordinates: {D} = [T]'{d}. The transpose of [T] is its
+    inverse.
+
+    Parameters
+    ----------
+    dirCos : array
+        The (3, 3) or (n, 3, 3) direction cosines.
+    d : array
+        The (size, columns) or (n, size, columns) local vectors.
+    """
+
+    d = asarray(d)
+    blocks = d.reshape(d.shape[:-2] + (-1, 3, d.shape[-1]))
+    return einsum('...ji,...ajc->...aic', asarray(dirCos), blocks).reshape(d.shape)
+
+# %%
+def BlockDiagonal(dirCos, size):
+    """
+    Returns the full (size, size) transformation matrix [T] for a single element, with its
+    direction cosines repeated along the diagonal.
+    """
+
+    return kron(eye(size//3), asarray(dirCos))
+
+# %%
+def Norm(vectors):
+    """
+    Returns the lengths of an (n, 3) array of vectors as an (n, 1) array.
+    """
+
+    return sqrt((vectors**2).sum(axis=1, keepdims=True))
+
+# %%
+def IsClose(a, b):
+    """
+    An element-wise version of `math.isclose` with its default tolerances.
+    """
+
+    return abs(a - b) <= 1e-9*maximum(abs(a), abs(b))
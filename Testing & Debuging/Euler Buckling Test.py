@@ -0,0 +1,45 @@
+# This test checks the critical load factors from a buckling analysis of a pinned column against
+# Euler's buckling load, Pcr = π²EI/L². The column is loaded with a unit axial load, so the load
+# factors are the buckling loads. It buckles first about its weak axis, then about its strong axis.
+# Units used in this test are inches and kips
+
+# Import 'FEModel3D' from 'PyNite'
+from PyNite import FEModel3D
+from math import pi, isclose
+
+# Column properties
+L = 20*12   # Length (in)
+E = 29000   # Modulus of elasticity (ksi)
+Iy = 100    # Weak axis moment of inertia (in^4)
+Iz = 150    # Strong axis moment of inertia (in^4)
+
+# The first two buckling loads: single curvature about each axis
+expected = [pi**2*E*Iy/L**2, pi**2*E*Iz/L**2]
+
+for sparse in [False, True]:
+
+    # Create a new finite element model
+    column = FEModel3D()
+
+    # Model the column with 10 members, so it is free to bow between its ends
+    for i in range(11):
+        column.AddNode('N' + str(i), 0, i*L/10, 0)
+    for i in range(10):
+        column.AddMember('M' + str(i), 'N' + str(i), 'N' + str(i + 1), E, 11200, Iy, Iz, 250, 20)
+
+    # Pin both ends. The base is also restrained against twisting.
+    column.DefineSupport('N0', True, True, True, False, True, False)
+    column.DefineSupport('N10', True, False, True, False, False, False)
+
+    # Apply a unit axial load to the top of the column
+    column.AddNodeLoad('N10', 'FY', -1)
+
+    # Find the first two buckling modes
+    load_factors, modes = column.Analyze_Buckling(num_modes=2, sparse=sparse)
+
+    # Check the load factors against Euler's buckling loads
+    for load_factor, Pcr in zip(load_factors, expected):
+        print('Load factor: ' + str(load_factor) + ', Euler buckling load: ' + str(Pcr))
+        assert isclose(load_factor, Pcr, rel_tol=1e-4)
+
+print('Euler buckling test passed')
@@ -0,0 +1,79 @@
+# This test checks that load combinations solved together in one analysis give the same results
+# as separate analyses of each load combination's factored loads. A support settlement is
+# included, which is applied unfactored in every load combination.
+# Units used in this test are inches and kips
+
+# Import 'FEModel3D' from 'PyNite'
+from PyNite import FEModel3D
+from math import isclose
+
+def Frame(D=0, L=0, W=0):
+    '''
+    Returns a portal frame. If the load factors D, L and W are given, the factored loads are
+    applied in a single load case. Otherwise the loads are applied in separate load cases 'D',
+    'L' and 'W', with two load combinations.
+    '''
+
+    frame = FEModel3D()
+
+    # Add nodes (frame is 15 ft wide x 12 ft tall)
+    frame.AddNode('N1', 0, 0, 0)
+    frame.AddNode('N2', 0, 12*12, 0)
+    frame.AddNode('N3', 15*12, 12*12, 0)
+    frame.AddNode('N4', 15*12, 0, 0)
+
+    # Add columns and a beam
+    frame.AddMember('M1', 'N1', 'N2', 29000, 11400, 100, 150, 250, 10)
+    frame.AddMember('M2', 'N4', 'N3', 29000, 11400, 100, 150, 250, 10)
+    frame.AddMember('M3', 'N2', 'N3', 29000, 11400, 100, 250, 250, 15)
+
+    # Fix the bases, and let the right support settle
+    frame.DefineSupport('N1', True, True, True, True, True, True)
+    frame.DefineSupport('N4', True, -0.1, True, True, True, True)
+
+    if D == L == W == 0:
+
+        # Apply the loads in separate load cases
+        frame.AddMemberPtLoad('M3', 'Fz', 3, 60, case='D')
+        frame.AddMemberDistLoad('M3', 'Fy', -0.1, -0.2, case='L')
+        frame.AddNodeLoad('N2', 'FX', 50, case='W')
+
+        # Define the load combinations
+        frame.AddLoadCombo('1.2D+1.6L', {'D': 1.2, 'L': 1.6})
+        frame.AddLoadCombo('D+W', {'D': 1.0, 'W': 1.0})
+
+    else:
+
+        # Apply the factored loads in a single load case
+        frame.AddMemberPtLoad('M3', 'Fz', 3*D, 60)
+        frame.AddMemberDistLoad('M3', 'Fy', -0.1*L, -0.2*L)
+        frame.AddNodeLoad('N2', 'FX', 50*W)
+
+    return frame
+
+def Results(frame):
+    '''
+    Returns a list of results to compare.
+    '''
+
+    N1, N2 = frame.GetNode('N1'), frame.GetNode('N2')
+    M3 = frame.GetMember('M3')
+
+    return [N2.DX, N2.DY, N2.DZ, N2.RZ, N1.RxnFX, N1.RxnFY, N1.RxnMZ,
+            M3.MaxMoment('Mz'), M3.MinMoment('Mz'), M3.MaxMoment('My'), M3.MaxShear('Fy')]
+
+# Analyze both load combinations at once
+combined = Frame()
+combined.Analyze()
+
+# Analyze each load combination separately, and compare the results
+for combo, factors in [('1.2D+1.6L', {'D': 1.2, 'L': 1.6}), ('D+W', {'D': 1.0, 'W': 1.0})]:
+
+    separate = Frame(**factors)
+    separate.Analyze()
+
+    combined.ActivateCombo(combo)
+    for a, b in zip(Results(combined), Results(separate)):
+        assert isclose(a, b, rel_tol=1e-9, abs_tol=1e-9), combo
+
+print('Load combination test passed')
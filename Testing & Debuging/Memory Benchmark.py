@@ -0,0 +1,73 @@
+# Measures the memory used by each node, member, plate and beam segment in a large model.
+# Python objects carry a lot of overhead, and on models with hundreds of thousands of elements
+# the objects alone can take up more memory than the stiffness matrix. Run this script before and
+# after changing the element classes to see the effect on the per-element footprint.
+
+import tracemalloc
+from numpy import arange, zeros, c_
+
+# Import 'FEModel3D' from 'PyNite'
+from PyNite import FEModel3D
+
+# The number of bays in each direction of a grid of members and plates
+n = 100
+
+# Measures the memory allocated by a function, per item created
+def footprint(function, count):
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    result = function()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return result, used/count
+
+# Create a new model
+model = FEModel3D()
+
+# Define a grid of nodes
+num_nodes = (n + 1)**2
+x, y = arange(num_nodes) % (n + 1), arange(num_nodes)//(n + 1)
+names = ['N' + str(i) for i in range(num_nodes)]
+_, node_bytes = footprint(lambda: [model.AddNode(names[i], x[i]*12.0, 0, y[i]*12.0) for i in range(num_nodes)], num_nodes)
+
+# Define a member along the bottom edge of each plate
+ids = arange(num_nodes).reshape(n + 1, n + 1)
+i_nodes, j_nodes = ids[:-1, :-1].ravel(), ids[:-1, 1:].ravel()
+_, member_bytes = footprint(lambda: [model.AddMember('M' + str(k), names[i], names[j], 29000, 11200, 100, 150, 250, 20)
+                                     for k, (i, j) in enumerate(zip(i_nodes, j_nodes))], n*n)
+
+# Define a grid of plates
+m_nodes, n_nodes = ids[1:, 1:].ravel(), ids[1:, :-1].ravel()
+_, plate_bytes = footprint(lambda: [model.AddPlate('P' + str(k), names[i], names[j], names[m], names[p], 0.5, 29000, 0.3)
+                                    for k, (i, j, m, p) in enumerate(zip(i_nodes, n_nodes, m_nodes, j_nodes))], n*n)
+
+# Support the bottom edge of the grid, and the plates against rotation about their normals
+model.DefineSupports(ids[0], [[True]*6]*(n + 1), by_index=True)
+model.DefineSupports(ids[1:].ravel(), [[False, False, False, False, True, False]]*(n*(n + 1)), by_index=True)
+
+# Load each member and analyze the model
+for member in model.Members:
+    model.AddMemberPtLoad(member.Name, 'Fy', -5, 6)
+    model.AddMemberDistLoad(member.Name, 'Fy', -0.1, -0.1)
+model.Analyze(check_statics=False, sparse=True)
+
+# Break each member into segments. Each member has 3 sets of segments (one each for torsion, and
+# bending about the local y and z-axes) split at each load discontinuity.
+for member in model.Members:
+    member.SegmentsZ.clear()
+    member.SegmentsY.clear()
+    member.SegmentsX.clear()
+
+def segment():
+    for member in model.Members:
+        member.SegmentMember()
+    return sum(len(member.SegmentsZ) + len(member.SegmentsY) + len(member.SegmentsX) for member in model.Members)
+
+num_segments, segment_bytes = footprint(segment, 1)
+segment_bytes = segment_bytes/num_segments
+
+# Report the memory used by each object
+print('Nodes:    ' + str(num_nodes) + ' at ' + str(round(node_bytes)) + ' bytes each')
+print('Members:  ' + str(n*n) + ' at ' + str(round(member_bytes)) + ' bytes each')
+print('Plates:   ' + str(n*n) + ' at ' + str(round(plate_bytes)) + ' bytes each')
+print('Segments: ' + str(num_segments) + ' at ' + str(round(segment_bytes)) + ' bytes each')
@@ -0,0 +1,41 @@
+# This test checks that a node added after another node was removed starts out with no supports,
+# displacements or reactions. Nodes are stored in rows of arrays shared by the model, and a new
+# node may be given the row a removed node left behind.
+# Units used in this test are inches and kips
+
+# Import 'FEModel3D' from 'PyNite'
+from PyNite import FEModel3D
+
+# Create a new finite element model for a cantilever
+beam = FEModel3D()
+
+# Add nodes
+beam.AddNodes(['A', 'B', 'C'], [[0, 0, 0], [10*12, 0, 0], [20*12, 0, 0]])
+
+# Add members
+beam.AddMember('AB', 'A', 'B', 29000, 11400, 100, 150, 250, 10)
+beam.AddMember('BC', 'B', 'C', 29000, 11400, 100, 150, 250, 10)
+
+# Provide supports at both ends
+beam.DefineSupport('A', True, True, True, True, True, True)
+beam.DefineSupport('C', True, True, True, True, True, True)
+
+# Load and analyze the beam so every node has displacements and reactions
+beam.AddNodeLoad('B', 'FY', -10)
+beam.Analyze()
+
+# Remove the node at the far end, and add a new node in its place
+beam.RemoveNode('C')
+beam.AddNodes(['D'], [[20*12, 0, 0]])
+D = beam.GetNode('D')
+
+# The new node must not inherit the removed node's support, displacements or reactions
+assert not any([D.SupportDX, D.SupportDY, D.SupportDZ, D.SupportRX, D.SupportRY, D.SupportRZ])
+assert [D.EnforcedDX, D.EnforcedDY, D.EnforcedDZ, D.EnforcedRX, D.EnforcedRY, D.EnforcedRZ] == [None]*6
+assert [D.DX, D.DY, D.DZ, D.RX, D.RY, D.RZ] == [None]*6
+assert [D.RxnFX, D.RxnFY, D.RxnFZ, D.RxnMX, D.RxnMY, D.RxnMZ] == [0]*6
+
+# The remaining nodes keep their data
+assert beam.GetNode('A').SupportDY and beam.GetNode('A').RxnFY != 0
+
+print('Node reuse test passed')
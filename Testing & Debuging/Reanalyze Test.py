@@ -0,0 +1,117 @@
+# This test checks that 'Reanalyze' gives the same results as a fresh call to 'Analyze' after
+# changes to a model. 'Reanalyze' updates the factored stiffness matrix when only member
+# properties have changed, and analyzes the model again when anything else has changed.
+# Units used in this test are inches and kips
+
+# Import 'FEModel3D' from 'PyNite'
+from PyNite import FEModel3D
+from math import isclose
+
+def Frame():
+    '''
+    Returns a two bay, two story moment frame with lateral and gravity loads.
+    '''
+
+    frame = FEModel3D()
+
+    # Add nodes (each bay is 20 ft wide, each story is 12 ft tall)
+    for i in range(3):
+        for j in range(3):
+            frame.AddNode('N' + str(i) + str(j), i*20*12, j*12*12, 0)
+
+    # Add columns and beams with the following properties:
+    # E = 29000 ksi, G = 11400 ksi, Iy = 100 in^4, Iz = 150 in^4, J = 250 in^4, A = 10 in^2
+    for i in range(3):
+        for j in range(2):
+            frame.AddMember('C' + str(i) + str(j), 'N' + str(i) + str(j), 'N' + str(i) + str(j + 1), 29000, 11400, 100, 150, 250, 10)
+    for i in range(2):
+        for j in range(1, 3):
+            frame.AddMember('B' + str(i) + str(j), 'N' + str(i) + str(j), 'N' + str(i + 1) + str(j), 29000, 11400, 100, 150, 250, 10)
+
+    # Fix the bases of the columns
+    for i in range(3):
+        frame.DefineSupport('N' + str(i) + '0', True, True, True, True, True, True)
+
+    # Brace the frame out of its plane
+    for i in range(3):
+        for j in range(1, 3):
+            frame.DefineSupport('N' + str(i) + str(j), False, False, True, True, True, False)
+
+    # Add loads
+    frame.AddNodeLoad('N02', 'FX', 10)
+    frame.AddNodeLoad('N01', 'FX', 5)
+    frame.AddMemberDistLoad('B02', 'Fy', -0.1, -0.1)
+    frame.AddMemberDistLoad('B12', 'Fy', -0.1, -0.1)
+
+    return frame
+
+def Compare(a, b):
+    '''
+    Checks that two models have the same displacements and reactions at every node.
+    '''
+
+    for node in a.Nodes:
+        other = b.GetNode(node.Name)
+        for name in ('DX', 'DY', 'DZ', 'RX', 'RY', 'RZ', 'RxnFX', 'RxnFY', 'RxnFZ', 'RxnMX', 'RxnMY', 'RxnMZ'):
+            assert isclose(getattr(node, name), getattr(other, name), rel_tol=1e-6, abs_tol=1e-9), node.Name + ' ' + name
+
+# Each change is made to a model that has been analyzed, which is then reanalyzed, and to a new
+# model, which is then analyzed from scratch
+def ChangeProperties(frame):
+    frame.GetMember('B12').Iz *= 3
+    frame.GetMember('C10').A *= 2
+
+def MoveNode(frame):
+    frame.GetNode('N22').X += 24
+
+def AddSupport(frame):
+    frame.DefineSupport('N21', True, True, True, True, True, True)
+
+def AddMember(frame):
+    frame.AddMember('D', 'N00', 'N11', 29000, 11400, 100, 150, 250, 10)
+
+changes = [ChangeProperties, MoveNode, AddSupport, AddMember]
+
+for change in changes:
+
+    # Analyze a frame, change it and reanalyze it. The members that were changed are not passed
+    # to 'Reanalyze', so it has to find them itself.
+    reanalyzed = Frame()
+    reanalyzed.Analyze(check_statics=False)
+    change(reanalyzed)
+    reanalyzed.Reanalyze(check_statics=False)
+
+    # Change a new frame and analyze it
+    analyzed = Frame()
+    change(analyzed)
+    analyzed.Analyze(check_statics=False)
+
+    Compare(reanalyzed, analyzed)
+
+# Changes made between two calls to 'Reanalyze' add to the earlier changes
+reanalyzed = Frame()
+reanalyzed.Analyze(check_statics=False)
+reanalyzed.GetMember('B12').Iz *= 3
+reanalyzed.Reanalyze(check_statics=False)
+reanalyzed.GetMember('C10').A *= 2
+reanalyzed.Reanalyze(check_statics=False)
+
+analyzed = Frame()
+ChangeProperties(analyzed)
+analyzed.Analyze(check_statics=False)
+
+Compare(reanalyzed, analyzed)
+
+# Reanalyzing after a P-Delta analysis gives P-Delta results
+reanalyzed = Frame()
+reanalyzed.Analyze_PDelta()
+ChangeProperties(reanalyzed)
+reanalyzed.Reanalyze(check_statics=False)
+
+analyzed = Frame()
+ChangeProperties(analyzed)
+analyzed.Analyze_PDelta()
+
+Compare(reanalyzed, analyzed)
+
+print('Reanalyze test passed')
@@ -0,0 +1,91 @@
+# This test checks that a model built from superelements gives the same results as the same
+# structure modelled in full. A braced frame is condensed to its two base nodes and used twice,
+# side by side, on top of a row of cantilevered columns.
+# Units used in this test are inches and kips
+
+# Import 'FEModel3D' from 'PyNite'
+from PyNite import FEModel3D
+from math import isclose
+
+def AddFrame(model, prefix, x, left, right):
+    '''
+    Adds a braced frame to a model, between two existing nodes at its base.
+    '''
+
+    # Add the interior nodes
+    model.AddNode(prefix + 'I1', x, 100, 0)
+    model.AddNode(prefix + 'I2', x + 100, 100, 0)
+    model.AddNode(prefix + 'I3', x + 50, 50, 0)
+
+    # Add the members
+    model.AddMember(prefix + 'S1', left, prefix + 'I1', 29000, 11400, 100, 150, 250, 10)
+    model.AddMember(prefix + 'S2', right, prefix + 'I2', 29000, 11400, 100, 150, 250, 10)
+    model.AddMember(prefix + 'S3', prefix + 'I1', prefix + 'I2', 29000, 11400, 100, 250, 250, 15)
+    model.AddMember(prefix + 'S4', prefix + 'I1', prefix + 'I3', 29000, 11400, 100, 250, 250, 15)
+
+    # Restrain the interior node out of plane
+    model.DefineSupport(prefix + 'I3', False, False, True, False, False, False)
+
+    # Add loads in three load cases
+    model.AddNodeLoad(prefix + 'I1', 'FX', 5, 'W')
+    model.AddMemberDistLoad(prefix + 'S3', 'Fy', -0.1, -0.2, case='D')
+    model.AddMemberPtLoad(prefix + 'S3', 'Fz', 3, 60, case='L')
+
+def AddColumns(model):
+    '''
+    Adds a row of three cantilevered columns and the load combinations to a model.
+    '''
+
+    for i, x in enumerate([0, 100, 200]):
+        model.AddNode('G' + str(i), x, -50, 0)
+        model.AddNode('T' + str(i), x, 0, 0)
+        model.AddMember('C' + str(i), 'G' + str(i), 'T' + str(i), 29000, 11400, 100, 150, 250, 10)
+        model.DefineSupport('G' + str(i), True, True, True, True, True, True)
+
+    model.AddNodeLoad('T2', 'FY', -7, 'D')
+    model.AddLoadCombo('1.2D+1.6L', {'D': 1.2, 'L': 1.6})
+    model.AddLoadCombo('0.9D+W', {'D': 0.9, 'W': 1.0})
+
+# Create the substructure and condense it to its base nodes
+frame = FEModel3D()
+frame.AddNode('B1', 0, 0, 0)
+frame.AddNode('B2', 100, 0, 0)
+AddFrame(frame, '', 0, 'B1', 'B2')
+frame.Condense(['B1', 'B2'])
+
+# Create the model with two copies of the substructure as superelements
+model = FEModel3D()
+AddColumns(model)
+model.AddSuperElement('A', frame, ['T0', 'T1'])
+model.AddSuperElement('B', frame, ['T1', 'T2'])
+model.Analyze()
+
+# Create the same structure modelled in full
+full = FEModel3D()
+AddColumns(full)
+AddFrame(full, 'A', 0, 'T0', 'T1')
+AddFrame(full, 'B', 100, 'T1', 'T2')
+full.Analyze()
+
+for combo in ['1.2D+1.6L', '0.9D+W']:
+
+    model.ActivateCombo(combo)
+    full.ActivateCombo(combo)
+
+    # Compare the displacements and reactions of the nodes outside the superelements
+    for node in model.Nodes:
+        other = full.GetNode(node.Name)
+        for name in ('DX', 'DY', 'DZ', 'RX', 'RY', 'RZ', 'RxnFX', 'RxnFY', 'RxnFZ', 'RxnMX', 'RxnMY', 'RxnMZ'):
+            assert isclose(getattr(node, name), getattr(other, name), rel_tol=1e-6, abs_tol=1e-9), combo + ' ' + node.Name + ' ' + name
+
+    # Compare the results recovered inside each superelement
+    for SE in ['A', 'B']:
+        substructure = model.RecoverSuperElement(SE)
+        for member in substructure.Members:
+            other = full.GetMember(SE + member.Name)
+            assert isclose(member.MaxMoment('Mz'), other.MaxMoment('Mz'), rel_tol=1e-6, abs_tol=1e-6)
+            assert isclose(member.MinMoment('Mz'), other.MinMoment('Mz'), rel_tol=1e-6, abs_tol=1e-6)
+            assert isclose(member.MaxAxial(), other.MaxAxial(), rel_tol=1e-6, abs_tol=1e-6)
+        assert isclose(substructure.GetNode('I3').RxnFZ, full.GetNode(SE + 'I3').RxnFZ, rel_tol=1e-6, abs_tol=1e-6)
+
+print('Superelement test passed')
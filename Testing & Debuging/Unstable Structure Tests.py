@@ -29,4 +29,30 @@ MomentFrame.DefineSupport("N1", True, False, True, True, True, True)
 MomentFrame.AddNodeLoad("N2", "FX", 50)
 
 # Analyze the frame - we should see an error message that the structure is unstable
-MomentFrame.Analyze()
\ No newline at end of file
+MomentFrame.Analyze()
+# A cantilever with a hinge partway along its length is also unstable. The part of the cantilever
+# beyond the hinge at node N6 is free to rotate about it, and the error message should point to one
+# of the degrees of freedom that move with it (N6 RZ, or DY/RZ at nodes N7 to N13). Degrees of
+# freedom between the fixed end and the hinge (nodes N1 to N5) are stable.
+Cantilever = FEModel3D()
+
+# Add 13 nodes along a 12 ft cantilever
+for i in range(13):
+    Cantilever.AddNode('N' + str(i + 1), i*12, 0, 0)
+
+# Add 12 members, one per foot
+for i in range(12):
+    Cantilever.AddMember('M' + str(i + 1), 'N' + str(i + 1), 'N' + str(i + 2), 29000, 11400, 100, 150, 250, 10)
+
+# Release the moment at the far end of member M5, which creates a hinge at node N6
+Cantilever.DefineReleases('M5', Rzj=True)
+
+# Fix the cantilever at node N1
+Cantilever.DefineSupport('N1', True, True, True, True, True, True)
+
+# Add a tip load
+Cantilever.AddNodeLoad('N13', 'FY', -1)
+
+# Analyze the cantilever with the sparse Cholesky solver - we should see an error message that
+# the structure is unstable at or beyond the hinge
+Cantilever.Analyze(sparse=True, solver='cholesky')